@@ -4,7 +4,7 @@ from pathlib import Path
 
 from PySide6.QtCore import QObject, QTimer
 
-from simple_python_app_qt.property import PropertyMeta, Property
+from simple_python_app_qt.property import EQUALITY, PropertyMeta, Property
 from simple_python_app_qt.qml_application import QmlApplication
 
 
@@ -12,7 +12,7 @@ FILE_DIR = Path(__file__).parent
 
 
 class ExampleModel(QObject, metaclass=PropertyMeta):
-    headline = Property(str)
+    headline = Property(str, compare=EQUALITY)
     counter = Property(int)
 
     def __init__(self, headline: str, parent: QObject | None = None):
@@ -2,6 +2,7 @@
 import QtQuick 2.15
 import QtQuick.Window 2.15
 import QtQuick.Controls 2.15
+import SimplePythonAppQt 1.0
 
 ApplicationWindow {
     id: window
@@ -33,7 +34,7 @@ ApplicationWindow {
         id: counter
 
         anchors.top: headline.bottom
-        anchors.bottom: scrollView.top
+        anchors.bottom: logConsole.top
         anchors.left: parent.left
         anchors.right: parent.right
 
@@ -49,53 +50,19 @@ ApplicationWindow {
         }
     }
 
-    ScrollView {
-        id: scrollView
+    LogConsole {
+        id: logConsole
 
         anchors.left: parent.left
         anchors.right: parent.right
         anchors.bottom: parent.bottom
 
         height: parent.height * 0.4
-        contentHeight: log.height
 
-        clip: true
-
-        ScrollBar.vertical.policy: ScrollBar.AlwaysOn
-        ScrollBar.vertical.position: 1.0
-
-        function scrollToBottom() {
-            scrollView.ScrollBar.vertical.position = 1.0 - scrollView.ScrollBar.vertical.size
-        }
-
-        TextArea {
-            id: log
-
-            anchors.fill: parent
-
-            color: "white"
-            readOnly: true
-            selectByMouse : true
-            font.pixelSize: 12
-
-            background: Rectangle {
-                color: "#ff2e2f30"
-            }
-
-            onTextChanged: scrollView.scrollToBottom()
-        }
-    }
-
-    Connections {
-        target: log_model
-
-        function onLogLineAdded(levelno, header, msg) {
-            log.append(header + msg)
-        }
+        logModel: log_model
     }
 
     Component.onCompleted: {
         console.info("Frontend started!")
-        log_model.requestPrebuffer()
     }
 }
@@ -0,0 +1,63 @@
+# Copyright (C) 2024 twyleg
+import logging
+from typing import Dict, Generic, Iterator, List, TypeVar
+
+
+T = TypeVar("T")
+
+
+class LogRingBuffer(Generic[T]):
+    """Fixed-capacity FIFO for log entries.
+
+    Once the capacity is reached, every append overwrites the oldest entry. Overwritten
+    entries are accounted per log level so the loss can be reported later on.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        if capacity <= 0:
+            raise ValueError(f"Ring buffer capacity must be positive (capacity={capacity})")
+        self.capacity = capacity
+        self.dropped_counts: Dict[int, int] = {}
+        self._entries: List[T | None] = [None] * capacity
+        self._levels: List[int] = [logging.NOTSET] * capacity
+        self._start = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self) -> Iterator[T]:
+        for i in range(self._size):
+            yield self._entries[(self._start + i) % self.capacity]  # type: ignore[misc]
+
+    @property
+    def dropped_count(self) -> int:
+        return sum(self.dropped_counts.values())
+
+    def append(self, levelno: int, entry: T) -> None:
+        if self._size < self.capacity:
+            pos = (self._start + self._size) % self.capacity
+            self._size += 1
+        else:
+            pos = self._start
+            dropped_levelno = self._levels[pos]
+            self.dropped_counts[dropped_levelno] = self.dropped_counts.get(dropped_levelno, 0) + 1
+            self._start = (self._start + 1) % self.capacity
+        self._entries[pos] = entry
+        self._levels[pos] = levelno
+
+    def popleft(self) -> T:
+        """Removes and returns the oldest entry without accounting it as dropped."""
+        if not self._size:
+            raise IndexError("pop from empty ring buffer")
+        entry = self._entries[self._start]
+        self._entries[self._start] = None
+        self._start = (self._start + 1) % self.capacity
+        self._size -= 1
+        return entry  # type: ignore[return-value]
+
+    def clear(self) -> None:
+        self._entries = [None] * self.capacity
+        self._start = 0
+        self._size = 0
+        self.dropped_counts.clear()
@@ -0,0 +1,116 @@
+# Copyright (C) 2024 twyleg
+import gzip
+import json
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import Sequence
+
+from PySide6.QtCore import QObject, Signal
+
+from simple_python_app_qt.log_formatter import UiLogEntry
+from simple_python_app_qt.log_history import LogHistory
+
+
+logm = logging.getLogger(__name__)
+
+
+class LogExporter(QObject):
+    """Writes log entries to a file on a worker thread.
+
+    The format follows the file name: ".jsonl" writes JSON Lines, anything else plain text
+    lines as displayed. A trailing ".gz" compresses the output. Characters that can't be encoded
+    as UTF-8 (lone surrogates, e.g. from undecodable file names) are written as backslash escapes.
+    The file is written under a temporary ".part" name and only renamed once complete, a
+    cancelled or failed export leaves no file behind. progress and finished are emitted on the
+    worker thread, connected slots of GUI objects get them queued.
+    """
+
+    PROGRESS_INTERVAL_S = 0.1
+
+    progress = Signal(int, int, arguments=["written", "total"])
+    finished = Signal(bool, str, arguments=["success", "path"])
+
+    def __init__(self, parent: QObject | None = None) -> None:
+        super().__init__(parent)
+        self.worker_thread: threading.Thread | None = None
+        self.cancelled = threading.Event()
+
+    @property
+    def running(self) -> bool:
+        return self.worker_thread is not None and self.worker_thread.is_alive()
+
+    def start(self, entries: LogHistory | Sequence[UiLogEntry], path: Path) -> bool:
+        if self.running:
+            return False
+        self.cancelled.clear()
+        self.worker_thread = threading.Thread(target=self._export, args=(entries, path), name="LogExporter", daemon=True)
+        self.worker_thread.start()
+        return True
+
+    def cancel(self) -> None:
+        self.cancelled.set()
+
+    def wait(self, timeout: float | None = None) -> None:
+        if self.worker_thread is not None:
+            self.worker_thread.join(timeout)
+
+    @staticmethod
+    def format_text(entry: UiLogEntry) -> str:
+        header, msg = entry.render()
+        return header + msg
+
+    @staticmethod
+    def format_json(entry: UiLogEntry) -> str:
+        header, msg = entry.render()
+        return json.dumps(
+            {
+                "sequence": entry.sequence,
+                "created": entry.created,
+                "levelno": entry.levelno,
+                "levelname": logging.getLevelName(entry.levelno),
+                "name": entry.name,
+                "header": header,
+                "message": msg,
+                "repeat_count": entry.repeat_count,
+            },
+            ensure_ascii=False,
+        )
+
+    def _export(self, entries: LogHistory | Sequence[UiLogEntry], path: Path) -> None:
+        suffixes = path.suffixes
+        compressed = bool(suffixes) and suffixes[-1] == ".gz"
+        format_line = self.format_json if ".jsonl" in suffixes else self.format_text
+        part_path = path.with_name(path.name + ".part")
+        total = len(entries)
+
+        success = False
+        try:
+            if compressed:
+                f = gzip.open(part_path, "wt", encoding="utf-8", errors="backslashreplace")
+            else:
+                f = open(part_path, "w", encoding="utf-8", errors="backslashreplace")
+            with f:
+                last_progress = time.monotonic()
+                for i in range(total):
+                    if self.cancelled.is_set():
+                        break
+                    f.write(format_line(entries[i]))
+                    f.write("\n")
+                    if time.monotonic() - last_progress >= self.PROGRESS_INTERVAL_S:
+                        last_progress = time.monotonic()
+                        self.progress.emit(i + 1, total)
+                else:
+                    success = True
+            if success:
+                part_path.replace(path)
+                self.progress.emit(total, total)
+        except OSError as e:
+            logm.error("Unable to export log to %s: %s", path, e)
+        except Exception:
+            logm.exception("Unable to export log to %s", path)
+        finally:
+            if not success:
+                part_path.unlink(missing_ok=True)
+            self.finished.emit(success, str(path))
@@ -0,0 +1,213 @@
+# Copyright (C) 2024 twyleg
+import logging
+import mmap
+import re
+import threading
+import time
+from array import array
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Tuple
+
+from PySide6.QtCore import QAbstractListModel, QByteArray, QModelIndex, QPersistentModelIndex, QObject, Qt, QUrl, Property, Signal, Slot
+
+from simple_python_app_qt.log_list_model import LogListModel
+
+
+logm = logging.getLogger(__name__)
+
+
+class LogFileModel(QAbstractListModel):
+    """List model view on a log file, with the roles of LogListModel (e.g. for LogConsole.sourceModel).
+
+    The file is memory-mapped and never read as a whole. A background thread indexes the line
+    start offsets, rows are inserted as the index grows. A row is decoded and split into header
+    and message only when requested. Lines not matching header_pattern (e.g. tracebacks) are
+    shown as message without a header. The file is indexed with the size it had when opened.
+    """
+
+    LevelnoRole = LogListModel.LevelnoRole
+    HeaderRole = LogListModel.HeaderRole
+    MessageRole = LogListModel.MessageRole
+    RepeatCountRole = LogListModel.RepeatCountRole
+
+    DEFAULT_HEADER_PATTERN = r"\[[^\]]*\]\[(?P<levelname>[A-Z]+)\]\[[^\]]*\]: "
+    INDEX_CHUNK_SIZE = 1 << 20
+    INDEX_PUBLISH_INTERVAL_S = 0.1
+    ROW_CACHE_SIZE = 1024
+
+    _indexGrown = Signal()
+
+    def __init__(self, header_pattern: str = DEFAULT_HEADER_PATTERN, parent: QObject | None = None) -> None:
+        super().__init__(parent)
+        self.header_pattern = re.compile(header_pattern)
+        self.path: Path | None = None
+        self.file_size = 0
+        self.file_map: mmap.mmap | None = None
+        self.line_starts = array("Q")
+        self.row_count = 0
+        self.indexed_size = 0
+        self.index_complete = False
+        self.index_thread: threading.Thread | None = None
+        self.stop_indexing = threading.Event()
+        self.parse_row = lru_cache(maxsize=self.ROW_CACHE_SIZE)(self._parse_row)
+        self._indexGrown.connect(self._on_index_grown, Qt.ConnectionType.QueuedConnection)
+
+    def roleNames(self) -> Dict[int, QByteArray]:
+        return LogListModel.roleNames(self)  # type: ignore[arg-type]
+
+    def rowCount(self, parent: QModelIndex | QPersistentModelIndex = QModelIndex()) -> int:
+        if parent.isValid():
+            return 0
+        return self.row_count
+
+    def data(self, index: QModelIndex | QPersistentModelIndex, role: int = Qt.ItemDataRole.DisplayRole) -> Any:
+        if not index.isValid() or not 0 <= index.row() < self.row_count:
+            return None
+
+        levelno, header, msg = self.parse_row(index.row())
+        match role:
+            case self.LevelnoRole:
+                return levelno
+            case Qt.ItemDataRole.DisplayRole:
+                return header + msg
+            case self.HeaderRole:
+                return header
+            case self.MessageRole:
+                return msg
+            case self.RepeatCountRole:
+                return 1
+        return None
+
+    def line(self, row: int) -> str:
+        assert self.file_map is not None
+        start = self.line_starts[row]
+        end = self.line_starts[row + 1] - 1 if row + 1 < len(self.line_starts) else self.file_size
+        return self.file_map[start:end].decode("utf-8", "replace").rstrip("\r\n")
+
+    def _parse_row(self, row: int) -> Tuple[int, str, str]:
+        line = self.line(row)
+        match = self.header_pattern.match(line)
+        if match is None:
+            return logging.NOTSET, "", line
+        levelno = logging.getLevelName(match.group("levelname"))
+        return levelno if isinstance(levelno, int) else logging.NOTSET, match.group(0), line[match.end() :]
+
+    @Slot(str, result=bool)
+    def open(self, path_or_url: str) -> bool:
+        """Opens a log file by path or file:// URL (e.g. as selected by a FileDialog)."""
+        self.close()
+        path = Path(QUrl(path_or_url).toLocalFile() if path_or_url.startswith("file:") else path_or_url)
+        try:
+            with open(path, "rb") as f:
+                file_size = path.stat().st_size
+                # Mapping an empty file fails, there is nothing to index anyway
+                file_map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if file_size else None
+        except OSError as e:
+            logm.error("Unable to open log file %s: %s", path, e)
+            return False
+
+        self.beginResetModel()
+        self.path = path
+        self.file_size = file_size
+        self.file_map = file_map
+        self.line_starts = array("Q", [0]) if self.file_size else array("Q")
+        self.index_complete = not self.file_size
+        self.endResetModel()
+        self.path_changed.emit()
+        self.index_progress_changed.emit()
+
+        if self.file_map is not None:
+            self.stop_indexing.clear()
+            self.index_thread = threading.Thread(target=self._index_lines, args=(self.file_map, self.line_starts), name="LogFileIndexer", daemon=True)
+            self.index_thread.start()
+        return True
+
+    @Slot()
+    def close(self) -> None:
+        if self.index_thread is not None:
+            self.stop_indexing.set()
+            self.index_thread.join()
+            self.index_thread = None
+
+        self.beginResetModel()
+        if self.file_map is not None:
+            self.file_map.close()
+            self.file_map = None
+        self.path = None
+        self.file_size = 0
+        self.line_starts = array("Q")
+        self.row_count = 0
+        self.indexed_size = 0
+        self.index_complete = False
+        self.parse_row.cache_clear()
+        self.endResetModel()
+
+    def wait_for_index(self, timeout: float | None = None) -> bool:
+        if self.index_thread is not None:
+            self.index_thread.join(timeout)
+        return self.index_complete or self.indexed_size == self.file_size
+
+    def _index_lines(self, file_map: mmap.mmap, line_starts: array) -> None:
+        # Runs on the indexer thread. Only appends to line_starts, the GUI thread never reads
+        # beyond the row count published with _indexGrown.
+        file_size = len(file_map)
+        last_publish = time.monotonic()
+        for chunk_start in range(0, file_size, self.INDEX_CHUNK_SIZE):
+            if self.stop_indexing.is_set():
+                return
+            chunk = file_map[chunk_start : chunk_start + self.INDEX_CHUNK_SIZE]
+            find = chunk.find
+            pos = find(b"\n")
+            while pos >= 0:
+                line_starts.append(chunk_start + pos + 1)
+                pos = find(b"\n", pos + 1)
+            self.indexed_size = min(chunk_start + self.INDEX_CHUNK_SIZE, file_size)
+            if time.monotonic() - last_publish >= self.INDEX_PUBLISH_INTERVAL_S:
+                last_publish = time.monotonic()
+                self._indexGrown.emit()
+            # Let the GUI thread have the GIL between chunks
+            time.sleep(0)
+        self._indexGrown.emit()
+
+    @Slot()
+    def _on_index_grown(self) -> None:
+        if self.file_map is None:
+            return
+        line_starts = self.line_starts
+        complete = self.indexed_size == self.file_size
+        if complete and not self.index_complete and line_starts[-1] == self.file_size:
+            # The file ends with a newline, there is no line after it
+            line_starts.pop()
+        row_count = len(line_starts) if complete else len(line_starts) - 1
+        if row_count > self.row_count:
+            self.beginInsertRows(QModelIndex(), self.row_count, row_count - 1)
+            self.row_count = row_count
+            self.endInsertRows()
+        if complete and not self.index_complete:
+            self.index_complete = True
+            logm.debug("Indexed %d lines of %s", row_count, self.path)
+        self.index_progress_changed.emit()
+
+    def get_path(self) -> str:
+        return str(self.path) if self.path else ""
+
+    @Signal  # type: ignore
+    def path_changed(self):
+        pass
+
+    filePath = Property(str, get_path, notify=path_changed)  # type: ignore
+
+    def index_progress(self) -> float:
+        return self.indexed_size / self.file_size if self.file_size else 1.0
+
+    @Signal  # type: ignore
+    def index_progress_changed(self):
+        pass
+
+    indexProgress = Property(float, index_progress, notify=index_progress_changed)  # type: ignore
+
+    def get_indexing(self) -> bool:
+        return self.file_map is not None and not self.index_complete
+
+    indexing = Property(bool, get_indexing, notify=index_progress_changed)  # type: ignore
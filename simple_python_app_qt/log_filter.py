@@ -0,0 +1,58 @@
+# Copyright (C) 2024 twyleg
+import logging
+from typing import Dict
+
+
+def to_levelno(level: int | str) -> int:
+    if isinstance(level, int):
+        return level
+    levelno = logging.getLevelName(level.upper())
+    if not isinstance(levelno, int):
+        raise ValueError(f"Unknown log level: {level}")
+    return levelno
+
+
+class LoggerLevelFilter(logging.Filter):
+    """Filters records by a table of logger name prefixes and minimum levels.
+
+    A prefix matches the logger itself and all of its children ("foo" matches "foo" and
+    "foo.bar" but not "foobar"). The longest matching prefix wins, "" matches every logger.
+    The resolved level is cached per logger name, so a lookup costs a single dict access.
+    Tables are replaced instead of modified, which keeps filter() safe on any thread.
+    """
+
+    def __init__(self, logger_levels: Dict[str, int | str] | None = None) -> None:
+        super().__init__()
+        self.logger_levels: Dict[str, int] = {}
+        self.resolved_levels: Dict[str, int] = {}
+        if logger_levels:
+            self.set_levels(logger_levels)
+
+    def set_levels(self, logger_levels: Dict[str, int | str]) -> None:
+        self.logger_levels = {prefix: to_levelno(level) for prefix, level in logger_levels.items()}
+        self.resolved_levels = {}
+
+    def set_level(self, prefix: str, level: int | str) -> None:
+        self.set_levels({**self.logger_levels, prefix: level})
+
+    def remove_level(self, prefix: str) -> None:
+        self.set_levels({name: level for name, level in self.logger_levels.items() if name != prefix})
+
+    def resolve_level(self, name: str) -> int:
+        resolved_levels = self.resolved_levels
+        levelno = resolved_levels.get(name)
+        if levelno is None:
+            levelno = self._lookup_level(name)
+            resolved_levels[name] = levelno
+        return levelno
+
+    def _lookup_level(self, name: str) -> int:
+        logger_levels = self.logger_levels
+        while name:
+            if name in logger_levels:
+                return logger_levels[name]
+            name = name.rpartition(".")[0]
+        return logger_levels.get("", logging.NOTSET)
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return not self.logger_levels or record.levelno >= self.resolve_level(record.name)
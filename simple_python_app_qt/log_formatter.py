@@ -0,0 +1,219 @@
+# Copyright (C) 2024 twyleg
+import logging
+import re
+import string
+import time
+from copy import copy
+from collections import ChainMap
+from functools import lru_cache
+from string import Template
+from typing import Any, Callable, Dict, List, Mapping, Tuple
+
+
+_MISSING = object()
+
+
+class _HeaderRecordView(Mapping):
+    """Read-only mapping view on a record with an empty message and a cached asctime."""
+
+    __slots__ = ("record", "asctime", "defaults")
+
+    def __init__(self, record: logging.LogRecord, asctime: str, defaults: Dict[str, Any]) -> None:
+        self.record = record
+        self.asctime = asctime
+        self.defaults = defaults
+
+    def __getitem__(self, key: str) -> Any:
+        if key == "message":
+            return ""
+        if key == "asctime":
+            return self.asctime
+        try:
+            return getattr(self.record, key)
+        except AttributeError:
+            if key in self.defaults:
+                return self.defaults[key]
+            raise KeyError(key)
+
+    def __iter__(self):
+        return iter(self.record.__dict__)
+
+    def __len__(self) -> int:
+        return len(self.record.__dict__)
+
+
+class UiLogEntry:
+    """Log line as stored by the UI pipeline.
+
+    Lazy entries only keep the raw message template, its arguments and the record fields
+    referenced by the header format. Header and message are rendered on first display by
+    the UiLogFormatter that created the entry. Like with logging.handlers.MemoryHandler, the
+    arguments are referenced and not copied. Mutating them after logging changes the
+    displayed message.
+
+    repeat_count counts the records coalesced into the entry, sequence is the position in the
+    history assigned by LogListModel (-1 as long as the entry wasn't delivered).
+    """
+
+    # fmt: off
+    __slots__ = (
+        "levelno", "name", "created", "msecs", "msg", "args", "header_values", "exc_text", "header_text", "message_text", "formatter",
+        "repeat_count", "sequence"
+    )
+    # fmt: on
+
+    def __init__(self, levelno: int, header_text: str | None = None, message_text: str | None = None) -> None:
+        self.levelno = levelno
+        self.name = ""
+        self.created = 0.0
+        self.msecs = 0.0
+        self.msg: Any = ""
+        self.args: Any = None
+        self.header_values: Tuple[Any, ...] = ()
+        self.exc_text: str | None = None
+        self.header_text = header_text
+        self.message_text = message_text
+        self.formatter: UiLogFormatter | None = None
+        self.repeat_count = 1
+        self.sequence = -1
+
+    def render(self) -> Tuple[str, str]:
+        if self.formatter is None:
+            return self.header_text or "", self.message_text or ""
+        return self.formatter.render(self)
+
+    @property
+    def header(self) -> str:
+        return self.render()[0]
+
+    @property
+    def message(self) -> str:
+        return self.render()[1]
+
+
+class UiLogFormatter:
+    """Splits a record into the header and the message as displayed by the UI.
+
+    The header is rendered straight from the record attributes with the format string of the
+    wrapped formatter, without copying the record and without running Formatter.format() a
+    second time. The asctime string is cached per second. Formatters that override format()
+    or formatTime() fall back to formatting a shallow copy of the record.
+    """
+
+    DEFAULT_RENDER_CACHE_SIZE = 4096
+
+    def __init__(self, formatter: logging.Formatter | None = None, render_cache_size: int = DEFAULT_RENDER_CACHE_SIZE) -> None:
+        self.formatter = formatter if formatter else logging.Formatter()
+        self.render_header = self._get_fast_path_renderer(self.formatter)
+        self.header_fields = self._get_header_fields(self.formatter._style)
+        self.uses_time = self.formatter.usesTime()
+        self.defaults: Dict[str, Any] = getattr(self.formatter._style, "_defaults", None) or {}
+        self.asctime_cache: Tuple[int, str] = (-1, "")
+        self.render = lru_cache(maxsize=render_cache_size)(self._render)
+
+    @staticmethod
+    def _get_header_fields(style: logging.PercentStyle) -> List[str]:
+        match type(style):
+            case logging.PercentStyle:
+                fields = re.findall(r"%\((\w+)\)", style._fmt)
+            case logging.StrFormatStyle:
+                fields = [re.split(r"[.\[]", field)[0] for _, field, _, _ in string.Formatter().parse(style._fmt) if field]
+            case logging.StringTemplateStyle:
+                fields = [named or braced for _, named, braced, _ in Template.pattern.findall(style._fmt) if named or braced]
+            case _:
+                fields = []
+        return [field for field in dict.fromkeys(fields) if field not in ("message", "asctime")]
+
+    @staticmethod
+    def _get_fast_path_renderer(formatter: logging.Formatter) -> Callable[[Mapping], str] | None:
+        formatter_type = type(formatter)
+        if formatter_type.format is not logging.Formatter.format or formatter_type.formatTime is not logging.Formatter.formatTime:
+            return None
+
+        style = formatter._style
+        match type(style):
+            case logging.PercentStyle:
+                return style._fmt.__mod__
+            case logging.StrFormatStyle:
+                return style._fmt.format_map
+            case logging.StringTemplateStyle:
+                return Template(style._fmt).substitute
+        return None
+
+    def format_asctime(self, record: logging.LogRecord | UiLogEntry) -> str:
+        formatter = self.formatter
+        second = int(record.created)
+        cached_second, cached_time = self.asctime_cache
+        if second != cached_second:
+            cached_time = time.strftime(formatter.datefmt or formatter.default_time_format, formatter.converter(record.created))
+            self.asctime_cache = (second, cached_time)
+        if formatter.datefmt or not formatter.default_msec_format:
+            return cached_time
+        return formatter.default_msec_format % (cached_time, record.msecs)
+
+    def format_header(self, record: logging.LogRecord) -> str:
+        if self.render_header is None:
+            header_record = copy(record)
+            header_record.msg = ""
+            header_record.args = None
+            header_record.exc_info = None
+            header_record.exc_text = None
+            header_record.stack_info = None
+            return self.formatter.format(header_record)
+
+        asctime = self.format_asctime(record) if self.uses_time else ""
+        return self.render_header(_HeaderRecordView(record, asctime, self.defaults))
+
+    def create_entry(self, record: logging.LogRecord) -> UiLogEntry:
+        """Captures everything needed to render the record later on, without rendering it."""
+        entry = UiLogEntry(record.levelno)
+        entry.name = record.name
+        entry.created = record.created
+        entry.msecs = record.msecs
+        if self.render_header is None:
+            entry.header_text = self.format_header(record)
+            entry.message_text = self.format_message(record)
+            return entry
+
+        entry.msg = record.msg
+        entry.args = record.args
+        entry.header_values = tuple(getattr(record, field, _MISSING) for field in self.header_fields)
+        if record.exc_info or record.exc_text or record.stack_info:
+            # Tracebacks reference whole frames, render them right away instead of keeping them alive.
+            entry.exc_text = self.format_exception_text(record)
+        entry.formatter = self
+        return entry
+
+    def _render(self, entry: UiLogEntry) -> Tuple[str, str]:
+        try:
+            header_values = {field: value for field, value in zip(self.header_fields, entry.header_values) if value is not _MISSING}
+            header_values["message"] = ""
+            header_values["asctime"] = self.format_asctime(entry) if self.uses_time else ""
+            header = self.render_header(ChainMap(header_values, self.defaults))  # type: ignore[misc]
+        except Exception as e:
+            header = f"<header formatting failed: {e!r}> "
+
+        try:
+            msg = str(entry.msg)
+            if entry.args:
+                msg = msg % entry.args
+        except Exception as e:
+            msg = f"<message formatting failed: {e!r}> msg={entry.msg!r} args={entry.args!r}"
+        if entry.exc_text:
+            msg = f"{msg}\n{entry.exc_text}" if msg else entry.exc_text
+        return header, msg
+
+    def format_exception_text(self, record: logging.LogRecord) -> str:
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatter.formatException(record.exc_info)
+        parts = [record.exc_text] if record.exc_text else []
+        if record.stack_info:
+            parts.append(self.formatter.formatStack(record.stack_info))
+        return "\n".join(parts)
+
+    def format_message(self, record: logging.LogRecord) -> str:
+        msg = record.getMessage()
+        exception_text = self.format_exception_text(record)
+        if exception_text:
+            msg = f"{msg}\n{exception_text}" if msg else exception_text
+        return msg
@@ -0,0 +1,308 @@
+# Copyright (C) 2024 twyleg
+import json
+import logging
+import multiprocessing.util
+import os
+import socket
+import struct
+import threading
+import time
+import uuid
+from typing import Any, BinaryIO, Dict, List, Set, Tuple
+
+from PySide6.QtCore import QObject, Slot
+from PySide6.QtNetwork import QLocalServer, QLocalSocket
+
+
+logm = logging.getLogger(__name__)
+
+FRAME_HEADER = struct.Struct(">I")
+
+FORWARDED_RECORD_FIELDS = (
+    "name",
+    "levelno",
+    "levelname",
+    "msg",
+    "created",
+    "msecs",
+    "relativeCreated",
+    "pathname",
+    "filename",
+    "module",
+    "lineno",
+    "funcName",
+    "process",
+    "processName",
+    "thread",
+    "threadName",
+)
+
+
+def encode_frame(records: List[Dict[str, Any]]) -> bytes:
+    # Lone surrogates (e.g. surrogateescape-decoded file names) are passed through, the server decodes the same way
+    payload = json.dumps(records, ensure_ascii=False).encode("utf-8", "surrogatepass")
+    return FRAME_HEADER.pack(len(payload)) + payload
+
+
+class LogForwardingHandler(logging.Handler):
+    """Sends the records of a child process to the LogForwardingServer of the application.
+
+    Records are rendered on the emitting thread (message and traceback, same as
+    QueueHandler.prepare()) and sent in batches: once batch_size records are buffered, when a
+    record of flush_level or above arrives, or flush_interval_s after the first buffered record.
+    A frame is a 4-byte big-endian length followed by a UTF-8 JSON array of record fields.
+    Records that can't be sent are dropped and reported with the next batch that gets through,
+    sending never raises into the logging call site.
+    Create the handler in the child process (e.g. with init_log_forwarding() as pool initializer).
+    """
+
+    # fmt: off
+    def __init__(self,
+                 address: str,
+                 batch_size: int = 100,
+                 flush_interval_s: float = 0.05,
+                 flush_level: int = logging.WARNING
+                 ):
+        super().__init__()
+    # fmt: on
+        self.address = address
+        self.batch_size = batch_size
+        self.flush_interval_s = flush_interval_s
+        self.flush_level = flush_level
+        self.batch: List[Dict[str, Any]] = []
+        self.dropped_count = 0
+        self.connection: socket.socket | BinaryIO | None = None
+        self.flush_requested = threading.Event()
+        self.closed = False
+        self.flush_thread: threading.Thread | None = None
+
+    def prepare(self, record: logging.LogRecord) -> Dict[str, Any]:
+        fields = {field: getattr(record, field, None) for field in FORWARDED_RECORD_FIELDS}
+        fields["msg"] = self.format(record)
+        return fields
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            fields = self.prepare(record)
+        except Exception:
+            self.handleError(record)
+            return
+
+        # emit() is serialized by the handler lock
+        self.batch.append(fields)
+        if len(self.batch) >= self.batch_size or record.levelno >= self.flush_level or self.closed:
+            self._send_batch()
+        elif len(self.batch) == 1:
+            self._start_flush_thread()
+            self.flush_requested.set()
+
+    def _start_flush_thread(self) -> None:
+        if self.flush_thread is None:
+            self.flush_thread = threading.Thread(target=self._flush_periodically, name="LogForwardingFlush", daemon=True)
+            self.flush_thread.start()
+
+    def _flush_periodically(self) -> None:
+        while not self.closed:
+            self.flush_requested.wait()
+            self.flush_requested.clear()
+            if self.closed:
+                return
+            time.sleep(self.flush_interval_s)
+            self.flush()
+
+    def _connect(self) -> socket.socket | BinaryIO:
+        if os.name == "nt":
+            # QLocalServer listens on a named pipe on Windows
+            return open(self.address, "wb", buffering=0)
+        connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            connection.connect(self.address)
+        except OSError:
+            connection.close()
+            raise
+        return connection
+
+    def _send(self, frame: bytes) -> None:
+        if self.connection is None:
+            self.connection = self._connect()
+        if isinstance(self.connection, socket.socket):
+            self.connection.sendall(frame)
+        else:
+            self.connection.write(frame)
+
+    def _send_batch(self) -> None:
+        if not self.batch:
+            return
+        records = self.batch
+        record_count = len(records)
+        self.batch = []
+        if self.dropped_count:
+            msg = f"{self.dropped_count} log records dropped, unable to send them to the log forwarding server"
+            records.insert(0, self.prepare(logm.makeRecord(logm.name, logging.WARNING, __file__, 0, msg, (), None)))
+        try:
+            self._send(encode_frame(records))
+            self.dropped_count = 0
+        except OSError:
+            self.dropped_count += record_count
+            self._disconnect()
+        except Exception:
+            # E.g. a record field that can't be serialized, the connection is still usable
+            self.dropped_count += record_count
+
+    def _disconnect(self) -> None:
+        if self.connection is not None:
+            try:
+                self.connection.close()
+            except OSError:
+                pass
+            self.connection = None
+
+    def flush(self) -> None:
+        self.acquire()
+        try:
+            self._send_batch()
+        finally:
+            self.release()
+
+    def close(self) -> None:
+        self.acquire()
+        try:
+            if not self.closed:
+                self.closed = True
+                self.flush_requested.set()
+                self._send_batch()
+                self._disconnect()
+        finally:
+            self.release()
+        super().close()
+
+
+def init_log_forwarding(address: str, level: int | str | None = None) -> LogForwardingHandler:
+    """
+    Routes all logging of the current (child) process to the LogForwardingServer at address.
+
+    Intended as initializer of a multiprocessing.Pool or as first call of a Process target. The
+    handlers inherited from the parent are removed from all loggers, records propagate to the
+    forwarding handler on the root logger and are routed by the parent's configuration. level
+    defaults to the root level the process inherited (fork), spawned processes get the parent's
+    level passed with LogForwardingServer.initargs(). The remaining records are sent when the
+    process exits, including pool workers that skip logging.shutdown().
+    """
+    handler = LogForwardingHandler(address)
+    root = logging.getLogger()
+    for logger in [root, *logging.Logger.manager.loggerDict.values()]:
+        if isinstance(logger, logging.Logger):
+            for existing_handler in list(logger.handlers):
+                logger.removeHandler(existing_handler)
+            logger.propagate = True
+    root.addHandler(handler)
+    if level is not None:
+        root.setLevel(level)
+    multiprocessing.util.Finalize(handler, handler.close, exitpriority=10)
+    return handler
+
+
+class LogForwardingServer(QObject):
+    """Receives records from LogForwardingHandlers of child processes on a local socket.
+
+    Runs on the event loop of the thread it lives in: every connection is a QLocalSocket that is
+    read when data arrives, so there is no thread per child. Received records get their source
+    process prepended to the message and are handled by the logger they were logged with
+    (and with that the ui handler), or by handler if given.
+    """
+
+    MAX_FRAME_SIZE = 16 << 20
+    SOURCE_TAG_FORMAT = "[{processName}:{process}] "
+
+    def __init__(self, handler: logging.Handler | None = None, parent: QObject | None = None) -> None:
+        super().__init__(parent)
+        self.handler = handler
+        self.server = QLocalServer(self)
+        self.server.setSocketOptions(QLocalServer.SocketOption.UserAccessOption)
+        self.server.newConnection.connect(self._on_new_connection)
+        self.connections: Set[QLocalSocket] = set()
+        self.buffers: Dict[QLocalSocket, bytearray] = {}
+        self.received_count = 0
+
+    @property
+    def address(self) -> str:
+        """Address to pass to LogForwardingHandler/init_log_forwarding(), empty while not listening."""
+        return self.server.fullServerName()
+
+    def initargs(self) -> Tuple[str, int]:
+        """init_log_forwarding() arguments for child processes: the address and the effective root level of this process."""
+        return self.address, logging.getLogger().getEffectiveLevel()
+
+    def listen(self, name: str | None = None) -> str:
+        if name is None:
+            name = f"simple_python_app_qt-log-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        QLocalServer.removeServer(name)
+        if not self.server.listen(name):
+            raise RuntimeError(f"Unable to listen for forwarded log records on '{name}': {self.server.errorString()}")
+        logm.debug("Listening for forwarded log records on %s", self.address)
+        return self.address
+
+    def close(self) -> None:
+        self.server.close()
+        for connection in list(self.connections):
+            self._read(connection)
+            self._remove_connection(connection)
+            connection.abort()
+
+    @Slot()
+    def _on_new_connection(self) -> None:
+        while self.server.hasPendingConnections():
+            connection = self.server.nextPendingConnection()
+            self.connections.add(connection)
+            self.buffers[connection] = bytearray()
+            connection.readyRead.connect(lambda connection=connection: self._read(connection))
+            connection.disconnected.connect(lambda connection=connection: self._on_disconnected(connection))
+
+    def _on_disconnected(self, connection: QLocalSocket) -> None:
+        self._read(connection)
+        self._remove_connection(connection)
+
+    def _remove_connection(self, connection: QLocalSocket) -> None:
+        if connection in self.connections:
+            self.connections.discard(connection)
+            del self.buffers[connection]
+            connection.deleteLater()
+
+    def _read(self, connection: QLocalSocket) -> None:
+        buffer = self.buffers.get(connection)
+        if buffer is None:
+            return
+        buffer += connection.readAll().data()
+
+        offset = 0
+        while len(buffer) - offset >= FRAME_HEADER.size:
+            (frame_size,) = FRAME_HEADER.unpack_from(buffer, offset)
+            if frame_size > self.MAX_FRAME_SIZE:
+                logm.error("Closing log forwarding connection: frame of %d bytes exceeds the limit", frame_size)
+                self._remove_connection(connection)
+                connection.abort()
+                return
+            frame_end = offset + FRAME_HEADER.size + frame_size
+            if len(buffer) < frame_end:
+                break
+            try:
+                records = json.loads(buffer[offset + FRAME_HEADER.size : frame_end].decode("utf-8", "surrogatepass"))
+            except ValueError as e:
+                logm.error("Closing log forwarding connection: malformed frame (%s)", e)
+                self._remove_connection(connection)
+                connection.abort()
+                return
+            offset = frame_end
+            self.handle_records(records)
+        del buffer[:offset]
+
+    def handle_records(self, records: List[Dict[str, Any]]) -> None:
+        for fields in records:
+            record = logging.makeLogRecord(fields)
+            record.msg = self.SOURCE_TAG_FORMAT.format(processName=record.processName, process=record.process) + str(record.msg)
+            self.received_count += 1
+            if self.handler is not None:
+                if record.levelno >= self.handler.level:
+                    self.handler.handle(record)
+            else:
+                logging.getLogger(record.name).handle(record)
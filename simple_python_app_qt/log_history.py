@@ -0,0 +1,307 @@
+# Copyright (C) 2024 twyleg
+import copy
+import logging
+import threading
+import zlib
+from array import array
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterator, List, Sequence, Tuple
+
+from simple_python_app_qt.log_formatter import UiLogEntry, UiLogFormatter
+
+
+compaction_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="LogHistoryCompaction")
+
+
+class CompactLogSegment:
+    """Columnar storage of a fixed run of log entries.
+
+    Levels are packed into a uint8 array (custom levels above 255 are clamped), logger names
+    and formatters into ids of the tables owned by LogHistory. Messages, and headers that can't
+    be rebuilt from the stored fields, are appended to UTF-8 buffers with an offset index and
+    compressed once the segment is sealed and read from the decompressed text() afterwards.
+    Only repeat counts other than 1 are stored. search_index holds what the
+    segment indexer of the history built from the rendered lines, if one is installed.
+    """
+
+    COMPRESSION_LEVEL = 1
+
+    def __init__(self, first_sequence: int) -> None:
+        self.first_sequence = first_sequence
+        self.levels = array("B")
+        self.name_ids = array("I")
+        self.formatter_ids = array("H")
+        self.created = array("d")
+        self.msecs = array("H")
+        self.repeat_counts: Dict[int, int] = {}
+        self.message_offsets = array("I", [0])
+        self.messages = bytearray()
+        self.header_offsets: array | None = None
+        self.headers = bytearray()
+        self.compressed_text: bytes | None = None
+        self.search_index: Any = None
+
+    def __len__(self) -> int:
+        return len(self.levels)
+
+    def seal(self) -> None:
+        """Compresses messages and headers, no entries can be appended afterwards."""
+        self.compressed_text = zlib.compress(self.messages + self.headers, self.COMPRESSION_LEVEL)
+        # Header offsets continue after the messages in the decompressed text
+        if self.header_offsets is not None:
+            self.header_offsets = array("I", (offset + len(self.messages) for offset in self.header_offsets))
+        self.messages = bytearray()
+        self.headers = bytearray()
+
+    def text(self) -> bytes:
+        """Decompresses messages and headers of the sealed segment."""
+        assert self.compressed_text is not None
+        return zlib.decompress(self.compressed_text)
+
+    @staticmethod
+    def _text(buffer: bytes, offsets: array, i: int) -> str:
+        return buffer[offsets[i] : offsets[i + 1]].decode("utf-8", "surrogatepass")
+
+    def message(self, text: bytes, i: int) -> str:
+        return self._text(text, self.message_offsets, i)
+
+    def header(self, text: bytes, i: int) -> str:
+        if not self.header_offsets:
+            return ""
+        return self._text(text, self.header_offsets, i)
+
+    def repeat_count(self, i: int) -> int:
+        return self.repeat_counts.get(i, 1)
+
+    def append(self, levelno: int, name_id: int, formatter_id: int, created: float, msecs: float, repeat_count: int, header: str | None, msg: str) -> None:
+        i = len(self.levels)
+        self.levels.append(min(levelno, 255))
+        self.name_ids.append(name_id)
+        self.formatter_ids.append(formatter_id)
+        self.created.append(created)
+        self.msecs.append(int(msecs))
+        if repeat_count != 1:
+            self.repeat_counts[i] = repeat_count
+        self.messages += msg.encode("utf-8", "surrogatepass")
+        self.message_offsets.append(len(self.messages))
+        if header is not None:
+            if self.header_offsets is None:
+                self.header_offsets = array("I", [0] * (i + 1))
+            self.headers += header.encode("utf-8", "surrogatepass")
+        if self.header_offsets is not None:
+            self.header_offsets.append(len(self.headers))
+
+
+class LogHistory:
+    """Retained log history, used by LogListModel in place of a ring buffer of entries.
+
+    The most recent entries are kept as UiLogEntry objects. Every SEGMENT_SIZE entries, they are
+    rendered once and compacted into a CompactLogSegment, which takes a fraction of the memory
+    of the entry objects. Compaction runs on a background thread, until it is done the segment
+    is served from the entry list. Headers of formatters that only reference the stored fields
+    (level, logger name and time) are not stored at all, but rebuilt on access.
+
+    Entries of compacted rows are materialized on access as pre-rendered UiLogEntry objects. The
+    most recently accessed ones are cached, so a row keeps its entry while it is displayed, as is
+    the decompressed text of the most recently read segments. Both caches are dropped when
+    segments are evicted.
+    """
+
+    SEGMENT_SIZE = 1024
+    MATERIALIZED_CACHE_SIZE = 1024
+    DECOMPRESSED_CACHE_SIZE = 16
+    REBUILDABLE_HEADER_FIELDS = frozenset(("levelname", "levelno", "name", "created", "msecs"))
+
+    def __init__(self, capacity: int) -> None:
+        if capacity <= 0:
+            raise ValueError(f"History capacity must be positive (capacity={capacity})")
+        self.capacity = capacity
+        self.segments: List[CompactLogSegment | List[UiLogEntry]] = []
+        self.recent_entries: List[UiLogEntry] = []
+        self.names: List[str] = []
+        self.name_ids: Dict[str, int] = {}
+        self.formatters: List[UiLogFormatter | None] = [None]
+        self.formatter_ids: Dict[UiLogFormatter | None, int] = {None: 0}
+        self._start = 0
+        self._size = 0
+        self.materialize = lru_cache(maxsize=self.MATERIALIZED_CACHE_SIZE)(self._materialize)
+        self.decompressed_text = lru_cache(maxsize=self.DECOMPRESSED_CACHE_SIZE)(CompactLogSegment.text)
+        # Guards the segment list and the repeat counts against the compaction thread
+        self.lock = threading.Lock()
+        self.last_compaction: Future | None = None
+        self.segment_indexer: Callable[[List[Tuple[str, str]]], Any] | None = None
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __getitem__(self, index: int) -> UiLogEntry:
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError("history index out of range")
+        segment_index, i = divmod(self._start + index, self.SEGMENT_SIZE)
+        if segment_index < len(self.segments):
+            segment = self.segments[segment_index]
+            if isinstance(segment, CompactLogSegment):
+                return self.materialize(segment, i, segment.repeat_count(i))
+            return segment[i]
+        return self.recent_entries[self._start + index - len(self.segments) * self.SEGMENT_SIZE]
+
+    def __iter__(self) -> Iterator[UiLogEntry]:
+        for i in range(self._size):
+            yield self[i]
+
+    def is_entry(self, index: int, entry: UiLogEntry) -> bool:
+        """Whether the row at index holds entry, also after the entry got compacted."""
+        segment_index, i = divmod(self._start + index, self.SEGMENT_SIZE)
+        if segment_index < len(self.segments):
+            segment = self.segments[segment_index]
+            if isinstance(segment, CompactLogSegment):
+                return segment.first_sequence + i == entry.sequence
+            return segment[i] is entry
+        return self.recent_entries[self._start + index - len(self.segments) * self.SEGMENT_SIZE] is entry
+
+    def set_repeat_count(self, index: int, repeat_count: int) -> None:
+        segment_index, i = divmod(self._start + index, self.SEGMENT_SIZE)
+        with self.lock:
+            if segment_index < len(self.segments):
+                segment = self.segments[segment_index]
+                # Entries waiting for compaction hold their repeat count themselves
+                if isinstance(segment, CompactLogSegment):
+                    segment.repeat_counts[i] = repeat_count
+
+    def append(self, levelno: int, entry: UiLogEntry) -> None:
+        self.recent_entries.append(entry)
+        self._size += 1
+        if len(self.recent_entries) == self.SEGMENT_SIZE:
+            entries = self.recent_entries
+            with self.lock:
+                self.segments.append(entries)
+            self.recent_entries = []
+            self.last_compaction = compaction_executor.submit(self._compact_in_background, entries)
+
+    def _compact_in_background(self, entries: List[UiLogEntry]) -> None:
+        segment = self.compact(entries)
+        with self.lock:
+            segment_index = next((segment_index for segment_index, pending in enumerate(self.segments) if pending is entries), None)
+            if segment_index is None:
+                # Evicted or cleared meanwhile
+                return
+            for i, entry in enumerate(entries):
+                if entry.repeat_count != segment.repeat_count(i):
+                    segment.repeat_counts[i] = entry.repeat_count
+            self.segments[segment_index] = segment
+
+    def set_segment_indexer(self, segment_indexer: Callable[[List[Tuple[str, str]]], Any]) -> None:
+        """
+        Installs segment_indexer(lines), called with the rendered (header, message) lines of every compacted
+        segment on the compaction thread. Its result is kept as the search_index of the segment. Segments
+        compacted before are indexed on the compaction thread as well.
+        """
+        self.segment_indexer = segment_indexer
+        self.last_compaction = compaction_executor.submit(self._index_compacted_segments)
+
+    def _index_compacted_segments(self) -> None:
+        # Runs after all compactions queued before the indexer was installed, later ones index themselves
+        assert self.segment_indexer
+        with self.lock:
+            segments = [segment for segment in self.segments if isinstance(segment, CompactLogSegment) and segment.search_index is None]
+        for segment in segments:
+            segment.search_index = self.segment_indexer([self._materialize(segment, i, 1).render() for i in range(len(segment))])
+
+    def wait_for_compaction(self) -> None:
+        """Blocks until all segments handed to the compaction thread so far are compacted."""
+        if self.last_compaction is not None:
+            self.last_compaction.result()
+
+    def discard_oldest(self, count: int) -> None:
+        count = min(count, self._size)
+        self._size -= count
+        self._start += count
+        evicted_segments = min(self._start // self.SEGMENT_SIZE, len(self.segments))
+        if evicted_segments:
+            with self.lock:
+                del self.segments[:evicted_segments]
+            self._start -= evicted_segments * self.SEGMENT_SIZE
+            self.materialize.cache_clear()
+            self.decompressed_text.cache_clear()
+        if not self.segments and self._start:
+            del self.recent_entries[: self._start]
+            self._start = 0
+
+    def clear(self) -> None:
+        with self.lock:
+            self.segments = []
+        self.recent_entries = []
+        self._start = 0
+        self._size = 0
+        self.materialize.cache_clear()
+        self.decompressed_text.cache_clear()
+
+    def snapshot(self) -> "LogHistory":
+        """
+        Returns a read-only view on the current rows that is safe to read on another thread while
+        this history keeps growing. Costs a copy of the segment list and the uncompacted entries.
+        """
+        snapshot = copy.copy(self)
+        with self.lock:
+            snapshot.segments = list(self.segments)
+        snapshot.recent_entries = list(self.recent_entries)
+        return snapshot
+
+    def _intern_name(self, name: str) -> int:
+        name_id = self.name_ids.get(name)
+        if name_id is None:
+            name_id = self.name_ids[name] = len(self.names)
+            self.names.append(name)
+        return name_id
+
+    def _intern_formatter(self, formatter: UiLogFormatter | None) -> int:
+        if formatter is not None and (formatter.render_header is None or not self.REBUILDABLE_HEADER_FIELDS.issuperset(formatter.header_fields)):
+            formatter = None
+        formatter_id = self.formatter_ids.get(formatter)
+        if formatter_id is None:
+            formatter_id = self.formatter_ids[formatter] = len(self.formatters)
+            self.formatters.append(formatter)
+        return formatter_id
+
+    def compact(self, entries: Sequence[UiLogEntry]) -> CompactLogSegment:
+        segment = CompactLogSegment(entries[0].sequence)
+        lines = [entry.render() for entry in entries]
+        for entry, (header, msg) in zip(entries, lines):
+            formatter_id = self._intern_formatter(entry.formatter)
+            name_id = self._intern_name(entry.name)
+            segment.append(entry.levelno, name_id, formatter_id, entry.created, entry.msecs, entry.repeat_count, None if formatter_id else header, msg)
+        segment.seal()
+        if self.segment_indexer is not None:
+            segment.search_index = self.segment_indexer(lines)
+        return segment
+
+    def _materialize(self, segment: CompactLogSegment, i: int, repeat_count: int) -> UiLogEntry:
+        entry = UiLogEntry(segment.levels[i])
+        entry.name = self.names[segment.name_ids[i]]
+        entry.created = segment.created[i]
+        entry.msecs = float(segment.msecs[i])
+        entry.repeat_count = repeat_count
+        entry.sequence = segment.first_sequence + i
+
+        text = self.decompressed_text(segment)
+        formatter = self.formatters[segment.formatter_ids[i]]
+        if formatter is None:
+            entry.header_text = segment.header(text, i)
+            entry.message_text = segment.message(text, i)
+            return entry
+
+        # The message is already rendered, the formatter only rebuilds the header from the stored fields.
+        fields = {
+            "levelname": logging.getLevelName(entry.levelno),
+            "levelno": entry.levelno,
+            "name": entry.name,
+            "created": entry.created,
+            "msecs": entry.msecs,
+        }
+        entry.msg = segment.message(text, i)
+        entry.header_values = tuple(fields[field] for field in formatter.header_fields)
+        entry.formatter = formatter
+        return entry
@@ -0,0 +1,102 @@
+# Copyright (C) 2024 twyleg
+from typing import Any, Dict, Sequence
+
+from PySide6.QtCore import QAbstractListModel, QByteArray, QModelIndex, QPersistentModelIndex, QObject, Qt
+
+from simple_python_app_qt.log_formatter import UiLogEntry
+from simple_python_app_qt.log_history import LogHistory
+
+
+class LogListModel(QAbstractListModel):
+    """List model view on the retained log history.
+
+    Rows are served straight from a compact LogHistory, so item views like ListView only ever
+    touch the rows they actually display. Header and message of a row are rendered when
+    requested for the first time or when the row gets compacted. Once the history is full, the
+    oldest rows are removed. Sequence numbers keep counting across clear().
+    """
+
+    LevelnoRole = Qt.ItemDataRole.UserRole + 1
+    HeaderRole = Qt.ItemDataRole.UserRole + 2
+    MessageRole = Qt.ItemDataRole.UserRole + 3
+    RepeatCountRole = Qt.ItemDataRole.UserRole + 4
+
+    DEFAULT_HISTORY_SIZE = 100000
+
+    def __init__(self, history_size: int = DEFAULT_HISTORY_SIZE, parent: QObject | None = None) -> None:
+        super().__init__(parent)
+        self.history = LogHistory(history_size)
+        self.appended_count = 0
+
+    def roleNames(self) -> Dict[int, QByteArray]:
+        return {
+            Qt.ItemDataRole.DisplayRole: QByteArray(b"display"),
+            self.LevelnoRole: QByteArray(b"levelno"),
+            self.HeaderRole: QByteArray(b"header"),
+            self.MessageRole: QByteArray(b"message"),
+            self.RepeatCountRole: QByteArray(b"repeatCount"),
+        }
+
+    def rowCount(self, parent: QModelIndex | QPersistentModelIndex = QModelIndex()) -> int:
+        if parent.isValid():
+            return 0
+        return len(self.history)
+
+    def data(self, index: QModelIndex | QPersistentModelIndex, role: int = Qt.ItemDataRole.DisplayRole) -> Any:
+        if not index.isValid() or not 0 <= index.row() < len(self.history):
+            return None
+
+        entry = self.history[index.row()]
+        match role:
+            case self.LevelnoRole:
+                return entry.levelno
+            case Qt.ItemDataRole.DisplayRole:
+                header, msg = entry.render()
+                return header + msg
+            case self.HeaderRole:
+                return entry.render()[0]
+            case self.MessageRole:
+                return entry.render()[1]
+            case self.RepeatCountRole:
+                return entry.repeat_count
+        return None
+
+    def row_of(self, entry: UiLogEntry) -> int | None:
+        if entry.sequence < 0:
+            return None
+        row = entry.sequence - (self.appended_count - len(self.history))
+        if not 0 <= row < len(self.history) or not self.history.is_entry(row, entry):
+            return None
+        return row
+
+    def entry_changed(self, entry: UiLogEntry) -> None:
+        row = self.row_of(entry)
+        if row is not None:
+            self.history.set_repeat_count(row, entry.repeat_count)
+            index = self.index(row)
+            self.dataChanged.emit(index, index, [self.RepeatCountRole])
+
+    def append_entries(self, entries: Sequence[UiLogEntry]) -> None:
+        if not entries:
+            return
+
+        capacity = self.history.capacity
+        entries = entries[-capacity:]
+        overflow = len(self.history) + len(entries) - capacity
+        if overflow > 0:
+            self.beginRemoveRows(QModelIndex(), 0, overflow - 1)
+            self.history.discard_oldest(overflow)
+            self.endRemoveRows()
+
+        first = len(self.history)
+        self.beginInsertRows(QModelIndex(), first, first + len(entries) - 1)
+        for entry in entries:
+            entry.sequence = self.appended_count
+            self.appended_count += 1
+            self.history.append(entry.levelno, entry)
+        self.endInsertRows()
+
+    def clear(self) -> None:
+        self.beginResetModel()
+        self.history.clear()
+        self.endResetModel()
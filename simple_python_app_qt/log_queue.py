@@ -0,0 +1,156 @@
+# Copyright (C) 2024 twyleg
+import copy
+import logging
+import logging.handlers
+import queue
+from typing import Dict, List, Sequence
+
+
+logm = logging.getLogger(__name__)
+
+
+class QueueSinkHandler(logging.Handler):
+    """Decouples slow sinks (files, pipes) from the logging threads.
+
+    Records are formatted into plain messages, put on a bounded queue and handed to the sink
+    handlers by a QueueListener thread. When the queue is full, either the incoming ("newest")
+    or the oldest queued record is dropped. The number of dropped records per level is reported
+    with a warning record as soon as the queue has room again. After close(), records are
+    handed to the sinks directly, so nothing logged during shutdown is lost.
+
+    In a dictConfig, the sinks are referenced as cfg://handlers.<name>. They are resolved with
+    the first record or flush, so they may be configured after this handler.
+    """
+
+    DROP_NEWEST = "newest"
+    DROP_OLDEST = "oldest"
+
+    # fmt: off
+    def __init__(self,
+                 handlers: Sequence[str | logging.Handler],
+                 queue_size: int = 10000,
+                 drop_policy: str = DROP_NEWEST,
+                 respect_handler_level: bool = True
+                 ):
+        super().__init__()
+    # fmt: on
+        if drop_policy not in (self.DROP_NEWEST, self.DROP_OLDEST):
+            raise ValueError(f"Unknown drop policy: {drop_policy}")
+        if queue_size <= 0:
+            raise ValueError("queue_size must be positive")
+
+        self.drop_policy = drop_policy
+        self.respect_handler_level = respect_handler_level
+        self.dropped_counts: Dict[int, int] = {}
+        self.handlers = handlers
+        self.sinks: List[logging.Handler] = []
+        self.queue: queue.Queue[logging.LogRecord | None] = queue.Queue(queue_size)
+        self.listener: logging.handlers.QueueListener | None = None
+        self.running = True
+
+    @property
+    def dropped_count(self) -> int:
+        return sum(self.dropped_counts.values())
+
+    @staticmethod
+    def dropped_records_message(dropped_counts: Dict[int, int]) -> str:
+        details = ", ".join(f"{logging.getLevelName(levelno)}={count}" for levelno, count in sorted(dropped_counts.items()))
+        return f"{sum(dropped_counts.values())} log records dropped from full log queue ({details})"
+
+    def get_listener(self) -> logging.handlers.QueueListener:
+        """Resolves the sinks and starts the listener thread on first use."""
+        self.acquire()
+        try:
+            if self.listener is None:
+                sinks: List[logging.Handler] = []
+                # Indexing converts cfg:// references of a dictConfig ConvertingList, iterating doesn't
+                for i in range(len(self.handlers)):
+                    sink = self.handlers[i]
+                    if not isinstance(sink, logging.Handler):
+                        raise ValueError(f"Log handler sink {sink!r} is not a configured handler, reference dictConfig handlers as cfg://handlers.<name>")
+                    sinks.append(sink)
+                self.sinks = sinks
+                self.listener = logging.handlers.QueueListener(self.queue, *self.sinks, respect_handler_level=self.respect_handler_level)
+                if self.running:
+                    self.listener.start()
+            return self.listener
+        finally:
+            self.release()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Renders message and traceback on the calling thread, same as QueueHandler.prepare()."""
+        msg = self.format(record)
+        record = copy.copy(record)
+        record.message = msg
+        record.msg = msg
+        record.args = None
+        record.exc_info = None
+        record.exc_text = None
+        record.stack_info = None
+        return record
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            record = self.prepare(record)
+            listener = self.get_listener()
+        except Exception:
+            self.handleError(record)
+            return
+
+        if not self.running:
+            listener.handle(record)
+            return
+
+        # emit() is serialized by the handler lock, the listener thread only ever frees space
+        if self.dropped_counts and self._put(self._create_dropped_records_record()):
+            self.dropped_counts = {}
+        if self._put(record):
+            return
+
+        dropped_record = record
+        if self.drop_policy == self.DROP_OLDEST:
+            oldest_record = self._pop_oldest()
+            if oldest_record is not None and self._put(record):
+                dropped_record = oldest_record
+        self.dropped_counts[dropped_record.levelno] = self.dropped_counts.get(dropped_record.levelno, 0) + 1
+
+    def _put(self, record: logging.LogRecord) -> bool:
+        try:
+            self.queue.put_nowait(record)
+            return True
+        except queue.Full:
+            return False
+
+    def _pop_oldest(self) -> logging.LogRecord | None:
+        try:
+            record = self.queue.get_nowait()
+        except queue.Empty:
+            return None
+        self.queue.task_done()
+        return record
+
+    def _create_dropped_records_record(self) -> logging.LogRecord:
+        msg = self.dropped_records_message(self.dropped_counts)
+        return logm.makeRecord(logm.name, logging.WARNING, __file__, 0, msg, (), None)
+
+    def flush(self) -> None:
+        """Blocks until all queued records have been handed to the sinks and flushes them."""
+        self.get_listener()
+        if self.running:
+            self.queue.join()
+        for sink in self.sinks:
+            sink.flush()
+
+    def close(self) -> None:
+        self.acquire()
+        try:
+            if self.running and self.listener is not None:
+                self.flush()
+                self.listener.stop()
+                if self.dropped_counts:
+                    self.listener.handle(self._create_dropped_records_record())
+                    self.dropped_counts = {}
+            self.running = False
+        finally:
+            self.release()
+        super().close()
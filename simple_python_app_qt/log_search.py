@@ -0,0 +1,421 @@
+# Copyright (C) 2024 twyleg
+import logging
+import zlib
+from array import array
+from bisect import bisect_left
+from concurrent.futures import Future
+from functools import lru_cache
+from itertools import compress, repeat
+from operator import contains, not_
+from typing import Any, Dict, Iterable, Iterator, List, Sequence, Set, Tuple
+
+from PySide6.QtCore import QAbstractListModel, QByteArray, QCoreApplication, QModelIndex, QPersistentModelIndex, QObject, Qt, Signal, Slot
+
+from simple_python_app_qt.log_formatter import UiLogEntry
+from simple_python_app_qt.log_history import CompactLogSegment, LogHistory, compaction_executor
+from simple_python_app_qt.log_list_model import LogListModel
+
+
+def entry_text(entry: UiLogEntry) -> str:
+    header, msg = entry.render()
+    return (header + msg).lower()
+
+
+def trigrams(text: str) -> Set[str]:
+    return {text[i : i + 3] for i in range(len(text) - 2)}
+
+
+def trigram_key(trigram: str) -> int:
+    """Packs the three code points (21 bits each) of a trigram into one integer."""
+    return ord(trigram[0]) << 42 | ord(trigram[1]) << 21 | ord(trigram[2])
+
+
+FLAGS_TO_DIGITS = bytes.maketrans(b"\0\1", b"01")
+DIGITS_TO_FLAGS = bytes.maketrans(b"01", b"\0\1")
+
+
+@lru_cache(maxsize=16)
+def query_trigram_keys(query: str) -> Tuple[int, ...]:
+    """Packed trigrams of a query, looked up in the SegmentSearchIndex of every segment."""
+    return tuple(trigram_key(trigram) for trigram in trigrams(query))
+
+
+def flags_to_mask(flags: bytes | bytearray) -> int:
+    """Packs one flag byte (0 or 1) per row into a row bitmask, bit i is row i."""
+    return int(flags.translate(FLAGS_TO_DIGITS)[::-1], 2) if flags else 0
+
+
+def mask_to_flags(mask: int, count: int) -> bytes:
+    """Unpacks the row bitmask of count rows into one flag byte per row, to select rows with itertools.compress()."""
+    return format(mask, f"0{count}b")[::-1].encode("ascii").translate(DIGITS_TO_FLAGS) if count else b""
+
+
+class SegmentSearchIndex:
+    """Trigram index and search text of the lines of one compacted history segment.
+
+    Built on the compaction thread (see LogHistory.set_segment_indexer). The rows of a trigram
+    are kept as a run of uint16 row numbers, the runs are looked up with a sorted array of packed
+    trigrams. Trigrams found in so many lines that a row bitmask takes less memory than the run
+    (like those of the headers) are kept as bitmask instead. A search intersects the row bitmasks
+    of the query trigrams and only verifies the remaining candidates against the lowercased
+    lines. Those are zlib compressed in blocks of TEXT_BLOCK_SIZE lines, only the blocks holding
+    candidates are decompressed.
+    """
+
+    LINE_SEPARATOR = "\0"
+    TEXT_BLOCK_SIZE = 256
+
+    def __init__(self, lines: List[Tuple[str, str]]) -> None:
+        texts = [(header + msg).lower().replace(self.LINE_SEPARATOR, " ") for header, msg in lines]
+        rows_by_trigram: Dict[str, List[int]] = {}
+        for row, text in enumerate(texts):
+            for trigram in trigrams(text):
+                rows = rows_by_trigram.get(trigram)
+                if rows is None:
+                    rows = rows_by_trigram[trigram] = []
+                rows.append(row)
+
+        self.line_count = len(texts)
+        bitmask_size = (self.line_count + 7) // 8
+        self.trigram_keys = array("Q")
+        self.posting_offsets = array("I", [0])
+        self.postings = array("H")
+        self.bitmask_keys = array("Q")
+        self.bitmasks: List[int] = []
+        for key, rows in sorted((trigram_key(trigram), rows) for trigram, rows in rows_by_trigram.items()):
+            if 2 * len(rows) > bitmask_size:
+                flags = bytearray(self.line_count)
+                for row in rows:
+                    flags[row] = 1
+                self.bitmask_keys.append(key)
+                self.bitmasks.append(flags_to_mask(flags))
+            else:
+                self.trigram_keys.append(key)
+                self.postings.extend(rows)
+                self.posting_offsets.append(len(self.postings))
+
+        self.text_blocks = [
+            zlib.compress(self.LINE_SEPARATOR.join(texts[first_row : first_row + self.TEXT_BLOCK_SIZE]).encode("utf-8", "surrogatepass"), 1)
+            for first_row in range(0, self.line_count, self.TEXT_BLOCK_SIZE)
+        ]
+
+    def __len__(self) -> int:
+        return self.line_count
+
+    def lines(self, block: int) -> List[str]:
+        return zlib.decompress(self.text_blocks[block]).decode("utf-8", "surrogatepass").split(self.LINE_SEPARATOR)
+
+    def rows_mask(self, trigram: str) -> int:
+        """Returns the bitmask of the rows containing trigram."""
+        return self._intersect((trigram_key(trigram),), (1 << self.line_count) - 1)
+
+    def _intersect(self, keys: Iterable[int], rows_mask: int) -> int:
+        """Intersects rows_mask with the rows of the packed trigrams in keys."""
+        posting_indices = []
+        for key in keys:
+            i = bisect_left(self.bitmask_keys, key)
+            if i < len(self.bitmask_keys) and self.bitmask_keys[i] == key:
+                rows_mask &= self.bitmasks[i]
+                continue
+            i = bisect_left(self.trigram_keys, key)
+            if i == len(self.trigram_keys) or self.trigram_keys[i] != key:
+                return 0
+            posting_indices.append(i)
+        # Unpacking a posting costs more than looking it up, so all trigrams are looked up first
+        for i in sorted(posting_indices, key=lambda i: self.posting_offsets[i + 1] - self.posting_offsets[i]):
+            if not rows_mask:
+                break
+            flags = bytearray(self.line_count)
+            for row in self.postings[self.posting_offsets[i] : self.posting_offsets[i + 1]]:
+                flags[row] = 1
+            rows_mask &= flags_to_mask(flags)
+        return rows_mask
+
+    def search(self, query: str, rows_mask: int | None = None) -> int:
+        """Returns the bitmask of the rows (of rows_mask, if given) containing the lowercase query."""
+        if rows_mask is None:
+            rows_mask = (1 << self.line_count) - 1
+        if len(query) >= 3:
+            rows_mask = self._intersect(query_trigram_keys(query), rows_mask)
+        if not rows_mask or not query or len(query) == 3:
+            # The trigram is the whole query, every candidate contains it
+            return rows_mask
+
+        # Only the candidates are verified, the rows of those not containing the query are cleared
+        block_mask = (1 << self.TEXT_BLOCK_SIZE) - 1
+        for block, first_row in enumerate(range(0, self.line_count, self.TEXT_BLOCK_SIZE)):
+            candidates = rows_mask >> first_row & block_mask
+            if not candidates:
+                continue
+            lines = self.lines(block)
+            if candidates == (1 << len(lines)) - 1:
+                # Every line is a candidate, they are checked in one go
+                rows_mask &= ~(candidates << first_row) | flags_to_mask(bytes(map(contains, lines, repeat(query)))) << first_row
+                continue
+            flags = mask_to_flags(candidates, len(lines))
+            mismatches = map(not_, map(contains, compress(lines, flags), repeat(query)))
+            for row in compress(compress(range(first_row, first_row + len(lines)), flags), mismatches):
+                rows_mask ^= 1 << row
+        return rows_mask
+
+
+class LogSearchIndex(QObject):
+    """Case-insensitive search over the rendered lines of a LogListModel.
+
+    Every compacted history segment gets a SegmentSearchIndex, built on the compaction thread,
+    so neither indexing nor retained lines cost GUI thread time. Segments compacted before the
+    index was created are indexed on the compaction thread as well, search() waits for that
+    instead of rendering them itself. Only the lines not compacted yet are scanned line by line.
+    search_in_background() leaves the GUI thread free altogether.
+    """
+
+    def __init__(self, list_model: LogListModel) -> None:
+        super().__init__(list_model)
+        self.list_model = list_model
+        list_model.history.set_segment_indexer(SegmentSearchIndex)
+
+    @property
+    def first_sequence(self) -> int:
+        return self.list_model.appended_count - len(self.list_model.history)
+
+    def entry(self, sequence: int) -> UiLogEntry:
+        return self.list_model.history[sequence - self.first_sequence]
+
+    def search(self, query: str, min_levelno: int = logging.NOTSET) -> List[int]:
+        """Returns the sequence numbers of all retained lines containing query (case-insensitive)."""
+        return self._search_sequences(self._indexed_snapshot(), self.first_sequence, query, min_levelno)
+
+    def search_row_ranges(self, query: str, min_levelno: int = logging.NOTSET) -> List[List[int]]:
+        """Like search(), but returns the rows of the list model as [first, last] ranges."""
+        ranges: List[List[int]] = []
+        first_sequence = self.first_sequence
+        for segment_sequence, count, rows_mask in self._search(self._indexed_snapshot(), first_sequence, query, min_levelno):
+            if not rows_mask:
+                continue
+            first_rows = rows_mask & ~(rows_mask << 1)
+            last_rows = rows_mask & ~(rows_mask >> 1)
+            rows = range(segment_sequence - first_sequence, segment_sequence - first_sequence + count)
+            runs = list(map(list, zip(compress(rows, mask_to_flags(first_rows, count)), compress(rows, mask_to_flags(last_rows, count)))))
+            if runs and ranges and ranges[-1][1] == runs[0][0] - 1:
+                # Continues the last run of the previous segment
+                ranges[-1][1] = runs[0][1]
+                del runs[0]
+            ranges.extend(runs)
+        return ranges
+
+    def search_in_background(self, query: str, min_levelno: int = logging.NOTSET) -> Future:
+        """
+        Like search(), but searches a snapshot of the current lines on the compaction thread, once the segments
+        queued for compaction and indexing before are done. The future holds the sequence numbers and the
+        sequence number following the last searched line.
+        """
+        history = self.list_model.history.snapshot()
+        first_sequence = self.first_sequence
+        return compaction_executor.submit(lambda: (self._search_sequences(history, first_sequence, query, min_levelno), first_sequence + len(history)))
+
+    def _indexed_snapshot(self) -> LogHistory:
+        history = self.list_model.history.snapshot()
+        if any(isinstance(segment, CompactLogSegment) and segment.search_index is None for segment in history.segments):
+            history.wait_for_compaction()
+            history = self.list_model.history.snapshot()
+        return history
+
+    @classmethod
+    def _search_sequences(cls, history: LogHistory, first_sequence: int, query: str, min_levelno: int) -> List[int]:
+        sequences: List[int] = []
+        for segment_sequence, count, rows_mask in cls._search(history, first_sequence, query, min_levelno):
+            if rows_mask:
+                sequences.extend(compress(range(segment_sequence, segment_sequence + count), mask_to_flags(rows_mask, count)))
+        return sequences
+
+    @staticmethod
+    def _search(history: LogHistory, first_sequence: int, query: str, min_levelno: int) -> Iterator[Tuple[int, int, int]]:
+        """Yields (first sequence number, line count, bitmask of the matching rows) per segment of history."""
+        query = query.lower()
+        # Whether a (clamped uint8) level of a compacted segment passes min_levelno
+        level_flags = bytes(int(levelno >= min_levelno) for levelno in range(256))
+
+        def scan(entries: Sequence[UiLogEntry]) -> Tuple[int, int, int]:
+            flags = bytes(entry.sequence >= first_sequence and entry.levelno >= min_levelno and (not query or query in entry_text(entry)) for entry in entries)
+            return entries[0].sequence, len(entries), flags_to_mask(flags)
+
+        for segment in history.segments:
+            if not isinstance(segment, CompactLogSegment):
+                yield scan(segment)
+                continue
+            if segment.search_index is None:
+                yield scan([history.materialize(segment, i, segment.repeat_count(i)) for i in range(len(segment))])
+                continue
+            rows_mask = (1 << len(segment)) - 1
+            if min_levelno > logging.NOTSET:
+                rows_mask = flags_to_mask(segment.levels.tobytes().translate(level_flags))
+            evicted_rows = first_sequence - segment.first_sequence
+            if evicted_rows > 0:
+                rows_mask = rows_mask >> evicted_rows << evicted_rows
+            yield segment.first_sequence, len(segment), segment.search_index.search(query, rows_mask)
+        if history.recent_entries:
+            yield scan(history.recent_entries)
+
+
+class SearchNotifier(QObject):
+    """Emits done once a background search finished.
+
+    Parentless and kept alive by the done callback of the search, so the compaction thread never
+    emits on a LogFilterModel that was deleted meanwhile; Qt drops the connection instead.
+    """
+
+    done = Signal()
+
+
+class LogFilterModel(QAbstractListModel):
+    """Filtered view on a LogListModel, kept up to date incrementally.
+
+    Without a filter, all rows of the source are shown. Matching rows are looked up with the
+    LogSearchIndex once per filter change, appended lines are checked one by one. If a
+    QCoreApplication exists, the lookup runs on the compaction thread (see
+    LogSearchIndex.search_in_background) and the model stays empty until it is done, lines
+    appended meanwhile are checked once the matching rows are inserted.
+    """
+
+    def __init__(self, list_model: LogListModel, parent: QObject | None = None) -> None:
+        super().__init__(parent)
+        self.list_model = list_model
+        self.search_index: LogSearchIndex | None = None
+        self.query = ""
+        self.min_levelno = logging.NOTSET
+        self.sequences: List[int] = []
+        self.search: Future | None = None
+
+        list_model.rowsAboutToBeInserted.connect(self._on_source_rows_about_to_be_inserted)
+        list_model.rowsInserted.connect(self._on_source_rows_inserted)
+        list_model.rowsAboutToBeRemoved.connect(self._on_source_rows_about_to_be_removed)
+        list_model.rowsRemoved.connect(self._on_source_rows_removed)
+        list_model.dataChanged.connect(self._on_source_data_changed)
+        list_model.modelReset.connect(self._on_source_model_reset)
+
+    @property
+    def active(self) -> bool:
+        return bool(self.query) or self.min_levelno > logging.NOTSET
+
+    @property
+    def searching(self) -> bool:
+        return self.search is not None
+
+    def set_filter(self, query: str, min_levelno: int, search_index: LogSearchIndex) -> None:
+        self.beginResetModel()
+        self.search_index = search_index
+        self.query = query.lower()
+        self.min_levelno = min_levelno
+        self.sequences = []
+        self.search = None
+        if self.active and QCoreApplication.instance() is None:
+            self.sequences = search_index.search(query, min_levelno)
+        elif self.active:
+            self.search = search_index.search_in_background(query, min_levelno)
+        self.endResetModel()
+        if self.search is not None:
+            notifier = SearchNotifier()
+            notifier.done.connect(self._on_searched, Qt.ConnectionType.QueuedConnection)
+            self.search.add_done_callback(lambda _: notifier.done.emit())
+
+    def wait_for_search(self) -> None:
+        """Blocks until the rows matching the current filter are inserted."""
+        if self.search is not None:
+            self.search.result()
+            self._on_searched()
+
+    @Slot()
+    def _on_searched(self) -> None:
+        search = self.search
+        if search is None or not search.done():
+            # Already inserted, or the search of a replaced filter
+            return
+        self.search = None
+        sequences, end_sequence = search.result()
+        first_sequence = self.list_model.appended_count - len(self.list_model.history)
+        del sequences[: bisect_left(sequences, first_sequence)]
+        history = self.list_model.history
+        sequences.extend(history[row].sequence for row in range(max(end_sequence - first_sequence, 0), len(history)) if self._matches(history[row]))
+        if sequences:
+            self.beginInsertRows(QModelIndex(), 0, len(sequences) - 1)
+            self.sequences = sequences
+            self.endInsertRows()
+
+    def roleNames(self) -> Dict[int, QByteArray]:
+        return self.list_model.roleNames()
+
+    def rowCount(self, parent: QModelIndex | QPersistentModelIndex = QModelIndex()) -> int:
+        if parent.isValid():
+            return 0
+        return len(self.sequences) if self.active else self.list_model.rowCount()
+
+    def data(self, index: QModelIndex | QPersistentModelIndex, role: int = Qt.ItemDataRole.DisplayRole) -> Any:
+        if not index.isValid():
+            return None
+        if self.active and not 0 <= index.row() < len(self.sequences):
+            return None
+        return self.list_model.data(self.list_model.index(self.source_row(index.row())), role)
+
+    def source_row(self, row: int) -> int:
+        if not self.active:
+            return row
+        return self.sequences[row] - (self.list_model.appended_count - len(self.list_model.history))
+
+    def _matches(self, entry: UiLogEntry) -> bool:
+        return entry.levelno >= self.min_levelno and (not self.query or self.query in entry_text(entry))
+
+    @Slot(QModelIndex, int, int)
+    def _on_source_rows_about_to_be_inserted(self, parent: QModelIndex, first: int, last: int) -> None:
+        if not self.active:
+            self.beginInsertRows(QModelIndex(), first, last)
+
+    @Slot(QModelIndex, int, int)
+    def _on_source_rows_inserted(self, parent: QModelIndex, first: int, last: int) -> None:
+        if not self.active:
+            self.endInsertRows()
+            return
+        if self.searching:
+            # Checked once the search is done
+            return
+
+        history = self.list_model.history
+        sequences = [history[row].sequence for row in range(first, last + 1) if self._matches(history[row])]
+        if sequences:
+            self.beginInsertRows(QModelIndex(), len(self.sequences), len(self.sequences) + len(sequences) - 1)
+            self.sequences.extend(sequences)
+            self.endInsertRows()
+
+    @Slot(QModelIndex, int, int)
+    def _on_source_rows_about_to_be_removed(self, parent: QModelIndex, first: int, last: int) -> None:
+        if not self.active:
+            self.beginRemoveRows(QModelIndex(), first, last)
+
+    @Slot(QModelIndex, int, int)
+    def _on_source_rows_removed(self, parent: QModelIndex, first: int, last: int) -> None:
+        if not self.active:
+            self.endRemoveRows()
+            return
+
+        removed_count = bisect_left(self.sequences, self.list_model.appended_count - len(self.list_model.history))
+        if removed_count:
+            self.beginRemoveRows(QModelIndex(), 0, removed_count - 1)
+            del self.sequences[:removed_count]
+            self.endRemoveRows()
+
+    @Slot(QModelIndex, QModelIndex, list)
+    def _on_source_data_changed(self, top_left: QModelIndex, bottom_right: QModelIndex, roles: List[int]) -> None:
+        for source_row in range(top_left.row(), bottom_right.row() + 1):
+            row = source_row
+            if self.active:
+                sequence = self.list_model.history[source_row].sequence
+                row = bisect_left(self.sequences, sequence)
+                if row == len(self.sequences) or self.sequences[row] != sequence:
+                    continue
+            index = self.index(row)
+            self.dataChanged.emit(index, index, roles)
+
+    @Slot()
+    def _on_source_model_reset(self) -> None:
+        self.beginResetModel()
+        self.sequences = []
+        self.endResetModel()
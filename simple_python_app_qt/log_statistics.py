@@ -0,0 +1,72 @@
+# Copyright (C) 2024 twyleg
+import logging
+import threading
+from typing import Any, Dict, List
+
+
+class SlidingWindowCounter:
+    """Running total and number of events within the last window_s seconds, in one-second buckets."""
+
+    def __init__(self, window_s: int) -> None:
+        self.total = 0
+        self.bucket_counts: List[int] = [0] * window_s
+        self.bucket_seconds: List[int] = [-1] * window_s
+
+    def add(self, second: int, count: int = 1) -> None:
+        i = second % len(self.bucket_counts)
+        self.total += count
+        if second < self.bucket_seconds[i]:
+            # At least one window older than the bucket, e.g. a line queued for a long time
+            return
+        if second > self.bucket_seconds[i]:
+            self.bucket_seconds[i] = second
+            self.bucket_counts[i] = 0
+        self.bucket_counts[i] += count
+
+    def recent_count(self, second: int) -> int:
+        oldest_second = second - len(self.bucket_counts) + 1
+        return sum(count for count, bucket_second in zip(self.bucket_counts, self.bucket_seconds) if bucket_second >= oldest_second)
+
+
+class LogStatistics:
+    """Line counters per level and per top-level logger ("foo" for "foo.bar.baz").
+
+    Counting a line costs two dict lookups and two bucket increments, independent of the
+    history size. Recent counts cover the last window_s seconds, recent_count / window_s is
+    the average rate in lines per second. Thread-safe.
+    """
+
+    def __init__(self, window_s: int) -> None:
+        self.window_s = window_s
+        self.level_counters: Dict[int, SlidingWindowCounter] = {}
+        self.logger_counters: Dict[str, SlidingWindowCounter] = {}
+        self.lock = threading.Lock()
+
+    def _counter(self, counters: Dict[Any, SlidingWindowCounter], key: Any) -> SlidingWindowCounter:
+        counter = counters.get(key)
+        if counter is None:
+            counter = counters[key] = SlidingWindowCounter(self.window_s)
+        return counter
+
+    def add(self, levelno: int, name: str, now: float, count: int = 1) -> None:
+        second = int(now)
+        with self.lock:
+            self._counter(self.level_counters, levelno).add(second, count)
+            if name:
+                self._counter(self.logger_counters, name.partition(".")[0]).add(second, count)
+
+    def level_counts(self) -> Dict[str, int]:
+        with self.lock:
+            return {logging.getLevelName(levelno): counter.total for levelno, counter in sorted(self.level_counters.items())}
+
+    def recent_level_counts(self, now: float) -> Dict[str, int]:
+        with self.lock:
+            return {logging.getLevelName(levelno): counter.recent_count(int(now)) for levelno, counter in sorted(self.level_counters.items())}
+
+    def logger_counts(self) -> Dict[str, int]:
+        with self.lock:
+            return {logger: counter.total for logger, counter in sorted(self.logger_counters.items())}
+
+    def recent_logger_counts(self, now: float) -> Dict[str, int]:
+        with self.lock:
+            return {logger: counter.recent_count(int(now)) for logger, counter in sorted(self.logger_counters.items())}
@@ -0,0 +1,138 @@
+# Copyright (C) 2024 twyleg
+import json
+import logging
+from typing import Dict, List
+from urllib.parse import parse_qs
+
+from PySide6.QtCore import QModelIndex, QObject, QTimer, QUrl, Slot
+from PySide6.QtNetwork import QHostAddress
+from PySide6.QtWebSockets import QWebSocket, QWebSocketCorsAuthenticator, QWebSocketServer
+
+from simple_python_app_qt.log_list_model import LogListModel
+
+
+logm = logging.getLogger(__name__)
+
+
+class LogStreamClient:
+    def __init__(self, socket: QWebSocket, next_sequence: int) -> None:
+        self.socket = socket
+        self.next_sequence = next_sequence
+
+
+class LogStreamServer(QObject):
+    """Streams the rows of a LogListModel to WebSocket viewers.
+
+    Every text frame is a JSON object {"seq": s, "lines": [[levelno, header, msg, repeat_count], ...]}
+    holding the lines with sequence numbers s, s + 1, ... and "skipped": n if n lines were evicted
+    from the history before the viewer got them. Viewers resume after a reconnect with
+    ws://host:port/?since=<next sequence>, without since they get the whole retained history.
+
+    Lines are read from the list model history when they are sent, there is no per-viewer copy.
+    A viewer is only sent more lines while less than MAX_PENDING_BYTES are waiting to be written
+    to its socket, a slow viewer falls behind (and eventually skips evicted lines) instead of
+    growing buffers or stalling the GUI thread.
+
+    Browsers send the origin of the page opening the connection. Only pages served from the local
+    host (LOCAL_HOSTS) are accepted, so a web page visited in a browser on the same machine can't
+    read the log. Clients sending no Origin header, i.e. everything but browsers, are accepted.
+    """
+
+    LOCAL_HOSTS = ("localhost", "127.0.0.1", "::1")
+    BATCH_SIZE = 500
+    MAX_PENDING_BYTES = 1 << 20
+    SEND_INTERVAL_MS = 50
+
+    def __init__(self, list_model: LogListModel, parent: QObject | None = None) -> None:
+        super().__init__(parent)
+        self.list_model = list_model
+        self.server = QWebSocketServer("simple_python_app_qt", QWebSocketServer.SslMode.NonSecureMode, self)
+        self.server.originAuthenticationRequired.connect(self._on_origin_authentication_required)
+        self.server.newConnection.connect(self._on_new_connection)
+        self.clients: Dict[QWebSocket, LogStreamClient] = {}
+        self.send_timer = QTimer(self)
+        self.send_timer.setSingleShot(True)
+        self.send_timer.timeout.connect(self.send_pending_lines)
+        self.list_model.rowsInserted.connect(self._on_rows_inserted)
+
+    @property
+    def port(self) -> int:
+        return self.server.serverPort()
+
+    def listen(self, port: int = 0, host: str = "127.0.0.1") -> int:
+        """Starts listening (port 0 picks a free port) and returns the port."""
+        if not self.server.listen(QHostAddress(host), port):
+            raise RuntimeError(f"Unable to listen for log stream viewers on {host}:{port}: {self.server.errorString()}")
+        logm.info("Streaming log to ws://%s:%d", host, self.port)
+        return self.port
+
+    def close(self) -> None:
+        self.server.close()
+        self.send_timer.stop()
+        for socket in list(self.clients):
+            self._remove_client(socket)
+            socket.close()
+
+    @property
+    def first_sequence(self) -> int:
+        return self.list_model.appended_count - len(self.list_model.history)
+
+    @Slot(QWebSocketCorsAuthenticator)
+    def _on_origin_authentication_required(self, authenticator: QWebSocketCorsAuthenticator) -> None:
+        origin = authenticator.origin()
+        allowed = not origin or QUrl(origin).host() in self.LOCAL_HOSTS
+        if not allowed:
+            logm.warning("Rejected log stream viewer from origin %s", origin)
+        authenticator.setAllowed(allowed)
+
+    @Slot()
+    def _on_new_connection(self) -> None:
+        while self.server.hasPendingConnections():
+            socket = self.server.nextPendingConnection()
+            since = parse_qs(socket.requestUrl().query()).get("since")
+            try:
+                next_sequence = int(since[0]) if since else self.first_sequence
+            except ValueError:
+                next_sequence = self.first_sequence
+            client = LogStreamClient(socket, max(0, min(next_sequence, self.list_model.appended_count)))
+            self.clients[socket] = client
+            socket.disconnected.connect(lambda socket=socket: self._remove_client(socket))
+            socket.bytesWritten.connect(lambda _, client=client: self._send_lines(client))
+            logm.debug("Log stream viewer connected from %s:%d", socket.peerAddress().toString(), socket.peerPort())
+            self._send_lines(client)
+
+    def _remove_client(self, socket: QWebSocket) -> None:
+        if self.clients.pop(socket, None) is not None:
+            socket.deleteLater()
+
+    @Slot(QModelIndex, int, int)
+    def _on_rows_inserted(self, parent: QModelIndex, first: int, last: int) -> None:
+        if self.clients and not self.send_timer.isActive():
+            self.send_timer.start(self.SEND_INTERVAL_MS)
+
+    @Slot()
+    def send_pending_lines(self) -> None:
+        for client in list(self.clients.values()):
+            self._send_lines(client)
+
+    def _send_lines(self, client: LogStreamClient) -> None:
+        if client.socket not in self.clients:
+            return
+        history = self.list_model.history
+        end_sequence = self.list_model.appended_count
+        while client.next_sequence < end_sequence and client.socket.bytesToWrite() < self.MAX_PENDING_BYTES:
+            first_sequence = end_sequence - len(history)
+            skipped = max(0, first_sequence - client.next_sequence)
+            sequence = client.next_sequence + skipped
+            count = min(self.BATCH_SIZE, end_sequence - sequence)
+
+            lines: List[list] = []
+            for row in range(sequence - first_sequence, sequence - first_sequence + count):
+                entry = history[row]
+                lines.append([entry.levelno, *entry.render(), entry.repeat_count])
+            frame: Dict[str, object] = {"seq": sequence, "lines": lines}
+            if skipped:
+                frame["skipped"] = skipped
+
+            client.socket.sendTextMessage(json.dumps(frame, ensure_ascii=False, separators=(",", ":")))
+            client.next_sequence = sequence + count
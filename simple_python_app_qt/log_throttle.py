@@ -0,0 +1,127 @@
+# Copyright (C) 2024 twyleg
+import itertools
+import logging
+import threading
+import time
+from typing import Any, Dict, List, Tuple
+
+from simple_python_app_qt.log_formatter import UiLogEntry
+
+
+CoalesceKey = Tuple[str, int, Any]
+
+
+class LogCoalescer:
+    """Tracks the latest entry per (logger, level, msg template) to coalesce repeated records.
+
+    A record repeating the template of an entry created less than window_s seconds before
+    is absorbed by that entry and only increments its repeat count.
+    """
+
+    MAX_TRACKED_KEYS = 1024
+
+    def __init__(self, window_s: float) -> None:
+        self.window_s = window_s
+        self.entries: Dict[CoalesceKey, UiLogEntry] = {}
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def key(record: logging.LogRecord) -> CoalesceKey | None:
+        key = (record.name, record.levelno, record.msg)
+        try:
+            hash(key)
+        except TypeError:
+            return None
+        return key
+
+    def absorb(self, key: CoalesceKey, record: logging.LogRecord) -> UiLogEntry | None:
+        """Returns the entry that absorbed the record or None if the record needs an entry of its own."""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or record.created - entry.created > self.window_s:
+                return None
+            entry.repeat_count += 1
+            return entry
+
+    def register(self, key: CoalesceKey, entry: UiLogEntry) -> None:
+        with self.lock:
+            if len(self.entries) >= self.MAX_TRACKED_KEYS:
+                now = time.time()
+                self.entries = {k: e for k, e in self.entries.items() if now - e.created <= self.window_s}
+            self.entries[key] = entry
+
+
+class TokenBucketRateLimiter:
+    """Per-logger token bucket: rate records per second on average, bursts of up to burst records."""
+
+    def __init__(self, rate: float, burst: int) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.buckets: Dict[str, List[float]] = {}
+        self.suppressed_counts: Dict[str, int] = {}
+        self.lock = threading.Lock()
+
+    def acquire(self, name: str, now: float) -> Tuple[bool, int]:
+        """
+        Takes a token from the bucket of the logger.
+
+        :return: Whether a token was available and, if so, the number of records of the logger
+            suppressed since the last successful call.
+        """
+        with self.lock:
+            bucket = self.buckets.get(name)
+            if bucket is None:
+                bucket = self.buckets[name] = [float(self.burst), now]
+            tokens = min(float(self.burst), bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+            if tokens < 1.0:
+                bucket[0] = tokens
+                self.suppressed_counts[name] = self.suppressed_counts.get(name, 0) + 1
+                return False, 0
+            bucket[0] = tokens - 1.0
+            return True, self.suppressed_counts.pop(name, 0)
+
+
+class LoadShedder:
+    """Sheds DEBUG/INFO lines while the UI falls behind.
+
+    The consumer reports the delivery lag with update_lag(). Once it exceeds max_lag_s, only
+    every sample_interval-th line below WARNING is accepted, until the lag drops below half the
+    threshold again. WARNING and above are always accepted. The shed lines are counted per level.
+    """
+
+    def __init__(self, max_lag_s: float, sample_interval: int) -> None:
+        self.max_lag_s = max_lag_s
+        self.sample_interval = sample_interval
+        self.lag_s = 0.0
+        self.degraded = False
+        self.shed_counts: Dict[int, int] = {}
+        self.shed_count = 0
+        self.sample_counter = itertools.count()
+        self.lock = threading.Lock()
+
+    def accept(self, levelno: int) -> bool:
+        """Thread-safe, costs a single attribute check as long as the UI keeps up."""
+        if not self.degraded or levelno >= logging.WARNING or next(self.sample_counter) % self.sample_interval == 0:
+            return True
+        with self.lock:
+            self.shed_counts[levelno] = self.shed_counts.get(levelno, 0) + 1
+            self.shed_count += 1
+        return False
+
+    def update_lag(self, lag_s: float) -> bool:
+        """Returns whether the degraded mode was entered or left."""
+        self.lag_s = lag_s
+        if not self.degraded and lag_s > self.max_lag_s:
+            self.degraded = True
+            return True
+        if self.degraded and lag_s < self.max_lag_s / 2:
+            self.degraded = False
+            return True
+        return False
+
+    def take_shed_counts(self) -> Dict[int, int]:
+        with self.lock:
+            shed_counts = self.shed_counts
+            self.shed_counts = {}
+        return shed_counts
@@ -1,6 +1,12 @@
+import itertools
+import operator
+import weakref
+from contextlib import contextmanager
 from functools import wraps
+from typing import NamedTuple
 
-from PySide6.QtCore import QObject, Signal
+from PySide6.QtCore import QAbstractListModel, QByteArray, QModelIndex, QObject, Qt, Signal, Slot
+from PySide6.QtQml import QQmlPropertyMap
 import PySide6.QtCore
 
 
@@ -14,44 +20,335 @@ class PropertyMeta(type(QObject)):  # type: ignore
                 continue
 
             types = {list: "QVariantList", dict: "QVariantMap"}
-            type_ = types.get(attr.type_, attr.type_)
+            type_ = QObject if attr.keyed else types.get(attr.type_, attr.type_)
 
-            notifier = Signal(type_)
+            # Granular list properties aren't consumed through the notify signal (see ListPropertyModel),
+            # passing the list as object saves converting it to a QVariantList on every assignment.
+            notifier = Signal(object if attr.granular else type_)
             attrs[f"_{key}_changed"] = notifier
-            attrs[key] = PropertyImpl(type_=type_, name=key, notify=notifier)
+            attrs[key] = PropertyImpl(
+                type_=type_, name=key, notify=notifier, is_unchanged=attr.is_unchanged, index=attr.index, granular=attr.granular, keyed=attr.keyed
+            )
 
+        if not any(hasattr(base, "batch") for base in bases):
+            attrs.setdefault("batch", batch)
         return super().__new__(cls, name, bases, attrs)
 
 
+IDENTITY = "identity"
+EQUALITY = "equality"
+
+_UNSET = object()
+_KEYS_CHANGED = object()
+
+_property_indices = itertools.count()
+
+COMPARISONS = {
+    IDENTITY: operator.is_,
+    EQUALITY: operator.eq,
+}
+
+
 class Property:
     """Property definition.
 
     Instances of this class will be replaced with their full
     implementation by the PropertyMeta metaclass.
+
+    By default, every set emits the notify signal. With a comparison policy, a set that
+    leaves the value unchanged is skipped without emitting:
+
+    - compare=IDENTITY: unchanged if it is the same object
+    - compare=EQUALITY: unchanged if it compares equal
+    - compare=callable(old, new): unchanged if it returns True
+    - epsilon=tolerance: unchanged if the numbers differ by at most tolerance
+
+    With granular=True, mutations of a list property are only reported as ListChange deltas
+    to the listeners of the list (e.g. a ListPropertyModel), the notify signal is only emitted
+    when the property is set.
+
+    With keyed=True, a dict property is exposed to QML as a PropertyMap with a change signal per
+    key. Setting the property updates the existing map, so only the changed keys notify, None
+    empties it.
     """
 
-    def __init__(self, type_):
+    def __init__(self, type_, compare=None, epsilon=None, granular=False, keyed=False):
+        if keyed and type_ is not dict:
+            raise ValueError("Only dict properties can be keyed")
+        if granular and type_ is not list:
+            raise ValueError("Only list properties can be granular")
+        if keyed and (compare is not None or epsilon is not None):
+            raise ValueError("Keyed properties compare per key, they take neither compare nor epsilon")
         self.type_ = type_
+        self.index = next(_property_indices)
+        self.granular = granular
+        self.keyed = keyed
+        if epsilon is not None:
+            if compare is not None:
+                raise ValueError("Property takes either compare or epsilon, not both")
+            self.is_unchanged = lambda old, new: abs(new - old) <= epsilon
+        elif isinstance(compare, str):
+            if compare not in COMPARISONS:
+                raise ValueError(f"Unknown comparison policy: {compare}")
+            self.is_unchanged = COMPARISONS[compare]
+        else:
+            self.is_unchanged = compare
 
 
 class PropertyImpl(PySide6.QtCore.Property):
-    """Property implementation: gets, sets, and notifies of change."""
+    """Property implementation: gets, sets, and notifies of change.
+
+    Sets skipped by the comparison policy are counted per instance, see suppressed_emit_counts().
+    While the instance is in a batch(), notifications are collected instead of emitted.
+    """
 
-    def __init__(self, type_, name, notify):
+    def __init__(self, type_, name, notify, is_unchanged=None, index=0, granular=False, keyed=False):
         super().__init__(type_, self.getter, self.setter, notify=notify)
         self.name = name
+        self.granular = granular
+        self.keyed = keyed
+        self.attr_name = f"_{name}"
+        self.signal_name = f"_{name}_changed"
+        self.is_unchanged = is_unchanged
+        self.index = index
 
     def getter(self, instance):
-        return getattr(instance, f"_{self.name}")
+        return getattr(instance, self.attr_name)
 
     def setter(self, instance, value):
-        signal = getattr(instance, f"_{self.name}_changed")
+        old_value = instance.__dict__.get(self.attr_name, _UNSET)
+        if self.keyed:
+            # None empties the map, QML keeps its bindings on the same map object
+            if value is None:
+                value = {}
+            elif not isinstance(value, (dict, PropertyMap)):
+                raise TypeError(f"Keyed property '{self.name}' takes a dict, got {type(value).__name__}")
+            if isinstance(old_value, PropertyMap):
+                old_value.replace(value)
+                return
+            value = PropertyMap(value, instance)
+            value.property_impl = self
+        elif self.is_unchanged is not None and old_value is not _UNSET and self.is_unchanged(old_value, value):
+            self.count_suppressed_emit(instance)
+            return
+
+        if type(value) in make_notified.notifiable_types:
+            value = make_notified(value, None if self.granular else PropertyNotifier(self, instance))
+
+        setattr(instance, self.attr_name, value)
+        self.notify(instance, old_value)
+
+    def notify(self, instance, old_value=_UNSET):
+        """Emits the notify signal, or records the change with the value before the batch."""
+        deferred = instance.__dict__.get("_deferred_notifications")
+        if deferred is None:
+            getattr(instance, self.signal_name).emit(getattr(instance, self.attr_name))
+        elif self not in deferred:
+            deferred[self] = old_value
+
+    def count_suppressed_emit(self, instance):
+        counts = suppressed_emit_counts(instance)
+        counts[self.name] = counts.get(self.name, 0) + 1
+
+
+class PropertyNotifier:
+    """Notify signal of a notified list or dict, emitted through the property it belongs to."""
+
+    def __init__(self, property_impl, instance):
+        self.property_impl = property_impl
+        self.instance = instance
+
+    def emit(self, value):
+        self.property_impl.notify(self.instance)
+
+
+@contextmanager
+def deferred_notifications(*models):
+    """Defers the notify signals of the PropertyMeta models until the block is left.
+
+    Writes and mutations of notified lists and dicts are recorded. On exit, each changed property
+    emits once with its final value, models in argument order, properties in declaration order.
+    Properties with a comparison policy don't emit when the final value is unchanged against the
+    value before the block. Blocks can be nested, the outermost one emits.
+    """
+    for model in models:
+        depth = model.__dict__.get("_deferred_notifications_depth", 0)
+        if depth == 0:
+            model.__dict__["_deferred_notifications"] = {}
+        model.__dict__["_deferred_notifications_depth"] = depth + 1
+    try:
+        yield
+    finally:
+        for model in models:
+            model.__dict__["_deferred_notifications_depth"] -= 1
+            if model.__dict__["_deferred_notifications_depth"] == 0:
+                emit_deferred_notifications(model)
+
+
+def emit_deferred_notifications(model):
+    deferred = model.__dict__.pop("_deferred_notifications")
+    for property_impl in sorted(deferred, key=operator.attrgetter("index")):
+        old_value = deferred[property_impl]
+        value = getattr(model, property_impl.attr_name)
+        if property_impl.keyed:
+            value.emit_deferred_changes()
+            if old_value is _KEYS_CHANGED:
+                continue
+        if property_impl.is_unchanged is not None and old_value is not _UNSET and property_impl.is_unchanged(old_value, value):
+            property_impl.count_suppressed_emit(model)
+            continue
+        getattr(model, property_impl.signal_name).emit(value)
+
+
+def batch(self):
+    """with model.batch(): defers the notify signals of model, see deferred_notifications()."""
+    return deferred_notifications(self)
+
+
+def suppressed_emit_counts(instance):
+    """Returns the number of sets skipped by the comparison policy per property name of instance."""
+    return instance.__dict__.setdefault("_suppressed_emit_counts", {})
+
+
+INSERTED = "inserted"
+REMOVED = "removed"
+CHANGED = "changed"
+MOVED = "moved"
+RESET = "reset"
+
+
+class ListChange(NamedTuple):
+    """Delta of a notified list, with rows in the list model sense.
+
+    INSERTED, REMOVED and CHANGED cover the rows first to last (REMOVED: before the removal).
+    MOVED moves the rows first to last before the row destination (an index before the move,
+    same as QAbstractItemModel.beginMoveRows()). RESET means any other change.
+    """
+
+    kind: str
+    first: int = 0
+    last: int = -1
+    destination: int = -1
+
+
+class NotifiedList(list):
+    """List that reports each mutation as a ListChange to its listeners and emits signal afterwards.
+
+    Listeners get list_about_to_change(change) before and list_changed(change) after the
+    mutation and are referenced weakly. Copies (copy, deepcopy, pickle) are unowned and have
+    no listeners.
+    """
+
+    signal = None
+    owned = False
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.listeners = weakref.WeakSet()
+
+    def __reduce_ex__(self, protocol):
+        return notified_list, (list(self),)
+
+    def _mutate(self, change, method, *args):
+        listeners = list(self.listeners) if change is not None else []
+        for listener in listeners:
+            listener.list_about_to_change(change)
+        try:
+            return method(self, *args)
+        finally:
+            for listener in listeners:
+                listener.list_changed(change)
+            if self.signal is not None:
+                self.signal.emit(self)
+
+    def _row(self, index):
+        row = operator.index(index)
+        if row < 0:
+            row += len(self)
+        if not 0 <= row < len(self):
+            raise IndexError("list index out of range")
+        return row
+
+    def _inserted(self, first, count):
+        return ListChange(INSERTED, first, first + count - 1) if count > 0 else None
+
+    def _removed(self, first, count):
+        return ListChange(REMOVED, first, first + count - 1) if count > 0 else None
+
+    def append(self, item):
+        self._mutate(self._inserted(len(self), 1), list.append, item)
+
+    def extend(self, items):
+        items = list(items)
+        self._mutate(self._inserted(len(self), len(items)), list.extend, items)
+
+    def __iadd__(self, items):  # type: ignore[misc]
+        self.extend(items)
+        return self
+
+    def __imul__(self, factor):  # type: ignore[misc]
+        size = len(self)
+        change = self._inserted(size, size * (factor - 1)) if factor > 0 else self._removed(0, size)
+        self._mutate(change, list.__imul__, factor)
+        return self
+
+    def insert(self, index, item):
+        first, _, _ = slice(index, None).indices(len(self))
+        self._mutate(self._inserted(first, 1), list.insert, first, item)
+
+    def pop(self, index=-1):
+        row = self._row(index)
+        return self._mutate(self._removed(row, 1), list.pop, row)
 
-        if type(value) in {list, dict}:
-            value = make_notified(value, signal)
+    def remove(self, item):
+        row = self.index(item)
+        self._mutate(self._removed(row, 1), list.__delitem__, row)
 
-        setattr(instance, f"_{self.name}", value)
-        signal.emit(value)
+    def clear(self):
+        self._mutate(self._removed(0, len(self)), list.clear)
+
+    def __delitem__(self, index):
+        if not isinstance(index, slice):
+            row = self._row(index)
+            self._mutate(self._removed(row, 1), list.__delitem__, row)
+            return
+        start, stop, step = index.indices(len(self))
+        change = self._removed(start, stop - start) if step == 1 else ListChange(RESET)
+        self._mutate(change, list.__delitem__, index)
+
+    def __setitem__(self, index, value):
+        if not isinstance(index, slice):
+            row = self._row(index)
+            self._mutate(ListChange(CHANGED, row, row), list.__setitem__, row, value)
+            return
+        value = list(value)
+        start, stop, step = index.indices(len(self))
+        if step == 1 and max(stop - start, 0) == len(value):
+            change = ListChange(CHANGED, start, stop - 1) if value else None
+        else:
+            change = ListChange(RESET)
+        self._mutate(change, list.__setitem__, index, value)
+
+    def move(self, first, last, destination):
+        """Moves the items first to last before the item at destination (an index before the move)."""
+        if not 0 <= first <= last < len(self) or not 0 <= destination <= len(self) or first <= destination <= last + 1:
+            raise IndexError(f"Invalid move of {first}..{last} to {destination}")
+        self._mutate(ListChange(MOVED, first, last, destination), NotifiedList._move, first, last, destination)
+
+    def _move(self, first, last, destination):
+        block = list.__getitem__(self, slice(first, last + 1))
+        if destination > last:
+            list.__setitem__(self, slice(destination, destination), block)
+            list.__delitem__(self, slice(first, last + 1))
+        else:
+            list.__delitem__(self, slice(first, last + 1))
+            list.__setitem__(self, slice(destination, destination), block)
+
+    def reverse(self):
+        self._mutate(ListChange(RESET), list.reverse)
+
+    def sort(self, *args, **kwargs):
+        self._mutate(ListChange(RESET), lambda self: list.sort(self, *args, **kwargs))
 
 
 class MakeNotified:
@@ -61,7 +358,6 @@ class MakeNotified:
     """
 
     change_methods = {
-        list: ["__delitem__", "__iadd__", "__imul__", "__setitem__", "append", "clear", "extend", "insert", "pop", "remove", "reverse", "sort"],
         dict: ["__delitem__", "__ior__", "__setitem__", "clear", "pop", "popitem", "setdefault", "update"],
     }
 
@@ -69,18 +365,32 @@ class MakeNotified:
         if not hasattr(dict, "__ior__"):
             # Dictionaries don't have | operator in Python < 3.9.
             self.change_methods[dict].remove("__ior__")
-        self.notified_class = {type_: self.make_notified_class(type_) for type_ in [list, dict]}
+        self.notified_class = {list: NotifiedList, dict: self.make_notified_class(dict)}
+        # Exact types only, subclasses like defaultdict or OrderedDict are stored as they are
+        self.notifiable_types = {list, dict, *self.notified_class.values()}
 
     def __call__(self, seq, signal):
-        """Returns a notifying version of the supplied list or dict."""
-        notified_class = self.notified_class[type(seq)]
-        notified_seq = notified_class(seq)
+        """Returns a notifying version of the supplied list or dict.
+
+        Notified containers not owned by a property yet (see notified_list() and notified_dict())
+        are adopted as they are, anything else is copied.
+        """
+        notified_class = self.notified_class[list if isinstance(seq, list) else dict]
+        if type(seq) is notified_class and not seq.owned:
+            notified_seq = seq
+        else:
+            notified_seq = notified_class(seq)
         notified_seq.signal = signal
+        notified_seq.owned = True
         return notified_seq
 
     @classmethod
     def make_notified_class(cls, parent):
-        notified_class = type(f"notified_{parent.__name__}", (parent,), {})
+        def reduce_ex(self, protocol):
+            # Copies (copy, deepcopy, pickle) are unowned and don't notify the property of the original
+            return notified_dict, (parent(self),)
+
+        notified_class = type(f"notified_{parent.__name__}", (parent,), {"signal": None, "owned": False, "__reduce_ex__": reduce_ex})
         for method_name in cls.change_methods[parent]:
             original = getattr(notified_class, method_name)
             notified_method = cls.make_notified_method(original, parent)
@@ -92,10 +402,213 @@ class MakeNotified:
         @wraps(method)
         def notified_method(self, *args, **kwargs):
             result = getattr(parent, method.__name__)(self, *args, **kwargs)
-            self.signal.emit(self)
+            if self.signal is not None:
+                self.signal.emit(self)
             return result
 
         return notified_method
 
 
 make_notified = MakeNotified()
+
+
+def notified_list(iterable=()):
+    """Builds a list that a list property adopts without copying, e.g. items = notified_list(range(1000000))."""
+    return NotifiedList(iterable)
+
+
+def notified_dict(*args, **kwargs):
+    """Builds a dict that a dict property adopts without copying, takes the arguments of dict()."""
+    return make_notified.notified_class[dict](*args, **kwargs)
+
+
+class PropertyMap(QQmlPropertyMap):
+    """Dict with a change signal per key in QML, the value of a Property(dict, keyed=True).
+
+    Bindings on map.foo are only re-evaluated when foo changes, setting a key to an equal value
+    notifies nothing. Deleted keys read as undefined in QML. Values written from QML are picked up.
+    While the owning model is in a batch(), the map changes right away for Python, QML is updated
+    once the batch is left.
+    """
+
+    def __init__(self, values=None, parent=None):
+        super().__init__(parent)
+        self.values_by_key = {}
+        self.property_impl = None
+        self.deferred_old_values = {}
+        if values:
+            self.update(values)
+
+    def _defer(self, key, old_value):
+        """Records the change of key if the owning model is in a batch, returns whether it did."""
+        if self.property_impl is None:
+            return False
+        deferred = self.parent().__dict__.get("_deferred_notifications")
+        if deferred is None:
+            return False
+        deferred.setdefault(self.property_impl, _KEYS_CHANGED)
+        self.deferred_old_values.setdefault(key, old_value)
+        return True
+
+    def emit_deferred_changes(self):
+        deferred_old_values = self.deferred_old_values
+        self.deferred_old_values = {}
+        for key, old_value in deferred_old_values.items():
+            value = self.values_by_key.get(key, _UNSET)
+            if value is old_value or (value is not _UNSET and old_value is not _UNSET and value == old_value):
+                continue
+            if value is _UNSET:
+                QQmlPropertyMap.clear(self, key)
+            else:
+                self.insert(key, value)
+
+    def updateValue(self, key, input):
+        # Called for writes from QML only
+        self.values_by_key[key] = input
+        return input
+
+    def __getitem__(self, key):
+        return self.values_by_key[key]
+
+    def __setitem__(self, key, value):
+        old_value = self.values_by_key.get(key, _UNSET)
+        if old_value is not value and old_value == value:
+            return
+        self.values_by_key[key] = value
+        if not self._defer(key, old_value):
+            self.insert(key, value)
+
+    def __delitem__(self, key):
+        old_value = self.values_by_key.pop(key)
+        if not self._defer(key, old_value):
+            QQmlPropertyMap.clear(self, key)
+
+    def __contains__(self, key):
+        return key in self.values_by_key
+
+    def __iter__(self):
+        return iter(self.values_by_key)
+
+    def __len__(self):
+        return len(self.values_by_key)
+
+    def __eq__(self, other):
+        return self.values_by_key == (other.values_by_key if isinstance(other, PropertyMap) else other)
+
+    __hash__ = QQmlPropertyMap.__hash__
+
+    def __repr__(self):
+        return f"PropertyMap({self.values_by_key!r})"
+
+    def keys(self):  # type: ignore[override]
+        return self.values_by_key.keys()
+
+    def values(self):
+        return self.values_by_key.values()
+
+    def items(self):
+        return self.values_by_key.items()
+
+    def get(self, key, default=None):
+        return self.values_by_key.get(key, default)
+
+    def pop(self, key, default=_UNSET):
+        if key not in self.values_by_key:
+            if default is _UNSET:
+                raise KeyError(key)
+            return default
+        value = self.values_by_key[key]
+        del self[key]
+        return value
+
+    def setdefault(self, key, default=None):
+        if key not in self.values_by_key:
+            self[key] = default
+        return self.values_by_key[key]
+
+    def update(self, values=(), **kwargs):
+        for key, value in dict(values, **kwargs).items():
+            self[key] = value
+
+    def clear(self):  # type: ignore[override]
+        for key in list(self.values_by_key):
+            del self[key]
+
+    def replace(self, values):
+        """Makes the map equal to values, only the keys that differ notify."""
+        for key in [key for key in self.values_by_key if key not in values]:
+            del self[key]
+        self.update(values)
+
+
+class ListPropertyModel(QAbstractListModel):
+    """List model view on a list property of a PropertyMeta model, e.g. as Repeater/ListView model.
+
+    Mutations of the list are forwarded as row inserts, removals, moves and data changes, so
+    appending an item costs O(1) for the model and the view. Setting the property resets the
+    model. Pair with Property(list, granular=True) to skip the notify signal, which converts
+    the whole list, on every mutation.
+    """
+
+    ItemRole = Qt.ItemDataRole.UserRole + 1
+
+    def __init__(self, model, name, parent=None):
+        super().__init__(parent)
+        self.model = model
+        self.name = name
+        self.items = []
+        self._attach(getattr(model, name))
+        getattr(model, f"_{name}_changed").connect(self._on_property_changed)
+
+    def _attach(self, items):
+        if isinstance(self.items, NotifiedList):
+            self.items.listeners.discard(self)
+        self.items = items if items is not None else []
+        if isinstance(self.items, NotifiedList):
+            self.items.listeners.add(self)
+
+    def roleNames(self):
+        return {
+            Qt.ItemDataRole.DisplayRole: QByteArray(b"display"),
+            self.ItemRole: QByteArray(b"item"),
+        }
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.items)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or not 0 <= index.row() < len(self.items) or role not in (Qt.ItemDataRole.DisplayRole, self.ItemRole):
+            return None
+        return self.items[index.row()]
+
+    @Slot()
+    def _on_property_changed(self):
+        items = getattr(self.model, self.name)
+        if items is not self.items:
+            self.beginResetModel()
+            self._attach(items)
+            self.endResetModel()
+
+    def list_about_to_change(self, change):
+        if change.kind == INSERTED:
+            self.beginInsertRows(QModelIndex(), change.first, change.last)
+        elif change.kind == REMOVED:
+            self.beginRemoveRows(QModelIndex(), change.first, change.last)
+        elif change.kind == MOVED:
+            self.beginMoveRows(QModelIndex(), change.first, change.last, QModelIndex(), change.destination)
+        elif change.kind == RESET:
+            self.beginResetModel()
+
+    def list_changed(self, change):
+        if change.kind == INSERTED:
+            self.endInsertRows()
+        elif change.kind == REMOVED:
+            self.endRemoveRows()
+        elif change.kind == MOVED:
+            self.endMoveRows()
+        elif change.kind == CHANGED:
+            self.dataChanged.emit(self.index(change.first), self.index(change.last))
+        elif change.kind == RESET:
+            self.endResetModel()
@@ -4,17 +4,31 @@ import argparse
 import os
 import signal
 import sys
-from copy import copy
+import threading
+import time
+from collections import deque
 from pathlib import Path
 from types import FrameType
-from typing import List, Tuple
+from typing import Any, Deque, Dict, List, Tuple
 
 from PySide6 import QtCore
-from PySide6.QtCore import QObject, QtMsgType, Slot, Signal, Property, QCoreApplication, QTimer
+from PySide6.QtCore import QObject, Qt, QtMsgType, Slot, Signal, Property, QCoreApplication, QLoggingCategory, QTimer, QUrl
 from PySide6.QtGui import QGuiApplication
 from PySide6.QtQml import QQmlApplicationEngine
 
 from simple_python_app.generic_application import GenericApplication
+from simple_python_app_qt.log_buffer import LogRingBuffer
+from simple_python_app_qt.log_export import LogExporter
+from simple_python_app_qt.log_file_model import LogFileModel
+from simple_python_app_qt.log_filter import LoggerLevelFilter
+from simple_python_app_qt.log_forwarding import LogForwardingServer
+from simple_python_app_qt.log_formatter import UiLogEntry, UiLogFormatter
+from simple_python_app_qt.log_list_model import LogListModel
+from simple_python_app_qt.log_queue import QueueSinkHandler
+from simple_python_app_qt.log_search import LogFilterModel, LogSearchIndex
+from simple_python_app_qt.log_statistics import LogStatistics
+from simple_python_app_qt.log_stream import LogStreamServer
+from simple_python_app_qt.log_throttle import LoadShedder, LogCoalescer, TokenBucketRateLimiter
 
 
 logm = logging.getLogger(__name__)
@@ -22,27 +36,513 @@ qml_logm = logging.getLogger("qml")
 
 FILE_DIR = Path(__file__).parent
 
+QT_MSG_TYPE_LEVELS = {
+    "debug": logging.DEBUG,
+    "info": logging.INFO,
+    "warning": logging.WARNING,
+    "critical": logging.ERROR,
+}
+
+
+def qt_logging_filter_rules() -> str:
+    """
+    Returns QLoggingCategory filter rules disabling the Qt message types the "qml" logger would discard.
+    Only disabling rules are generated, so Qt's own defaults (e.g. for qt.* debug categories) stay in
+    place and QT_LOGGING_RULES still overrides them.
+    """
+    return "\n".join(f"*.{msg_type}=false" for msg_type, levelno in QT_MSG_TYPE_LEVELS.items() if not qml_logm.isEnabledFor(levelno))
+
+
+def apply_qt_logging_filter_rules() -> None:
+    """Drops Qt and QML messages in C++ that wouldn't be logged anyway, before they reach qt_message_handler."""
+    QLoggingCategory.setFilterRules(qt_logging_filter_rules())
+
 
 class LogModel(QObject):
+    """Log lines for the QML frontend.
+
+    add_log_entry() and add_log_line() may be called from any thread. Lines added from other
+    threads are queued and handed over to the thread that created the model (the GUI thread)
+    with a single queued signal per drain cycle, so worker threads never block on the GUI.
+    Queued WARNING and above lines are delivered ahead of the queued lines below WARNING. At most
+    prebuffer_size lines of either kind are queued, further lines are dropped and reported with a
+    summary line and in droppedLineCount.
+    logLineAdded, logLinesAdded and all listModel changes are always emitted on the thread that
+    created the model. The lines delivered within one event loop iteration are appended to listModel
+    as a single row range, flush() appends them right away.
+
+    With max_delivery_lag_ms set, the time lines from other threads spend in the queue is measured.
+    While it exceeds the threshold, lines below WARNING are sampled (see LoadShedder) and
+    WARNING and above skip the batch interval. The lag is re-checked every max_delivery_lag_ms
+    while degraded, so the model also recovers once logging goes idle. deliveryLagMs, droppedLineCount and degraded
+    let the frontend show when the UI is shedding load.
+    """
+
+    DEFAULT_PREBUFFER_SIZE = 10000
+    DEFAULT_PREBUFFER_REPLAY_BUDGET_MS = 8
+    DEFAULT_DEGRADED_SAMPLE_INTERVAL = 10
+    DEFAULT_STATISTICS_WINDOW_S = 60
+    DEFAULT_STATISTICS_INTERVAL_MS = 500
 
     logLineAdded = Signal(int, str, str, arguments=["levelno", "header", "msg"])
-
-    def __init__(self) -> None:
+    logLinesAdded = Signal(list, arguments=["lines"])
+    logLineRepeated = Signal(int, str, str, int, arguments=["levelno", "header", "msg", "repeatCount"])
+    prebufferReplayProgress = Signal(int, int, arguments=["replayed", "total"])
+    exportProgress = Signal(int, int, arguments=["written", "total"])
+    exportFinished = Signal(bool, str, arguments=["success", "path"])
+    _queuedLogLinesAvailable = Signal()
+
+    def __init__(
+        self,
+        prebuffer_size: int = DEFAULT_PREBUFFER_SIZE,
+        batch_interval_ms: int | None = None,
+        history_size: int = LogListModel.DEFAULT_HISTORY_SIZE,
+        logger_levels: Dict[str, int | str] | None = None,
+        search_index: bool = False,
+        prebuffer_replay_budget_ms: int = DEFAULT_PREBUFFER_REPLAY_BUDGET_MS,
+        max_delivery_lag_ms: int | None = None,
+        degraded_sample_interval: int = DEFAULT_DEGRADED_SAMPLE_INTERVAL,
+        statistics_window_s: int = DEFAULT_STATISTICS_WINDOW_S,
+        statistics_interval_ms: int = DEFAULT_STATISTICS_INTERVAL_MS,
+    ) -> None:
+        """
+        :param prebuffer_size: Number of lines kept until QML requests the prebuffer.
+        :param batch_interval_ms: Enables batched mode when not None. Lines are then delivered as a single
+            logLinesAdded([[levelno, header, msg], ...]) signal at most batch_interval_ms after the first
+            pending line was added (0 = next event loop iteration) instead of one logLineAdded signal per line.
+        :param history_size: Number of lines retained by the list model (see listModel).
+        :param logger_levels: Initial UI level table, minimum level per logger name prefix (see setLoggerLevel).
+        :param search_index: Indexes the history for search right away instead of on the first search()/setFilter() call.
+        :param prebuffer_replay_budget_ms: Time spent replaying the prebuffer per event loop iteration
+            (see requestPrebuffer).
+        :param max_delivery_lag_ms: Enables load shedding when not None. Past this delivery lag, only every
+            degraded_sample_interval-th DEBUG/INFO line from other threads is delivered.
+        :param statistics_window_s: Time window of the recent line counts (see recentLevelCounts).
+        :param statistics_interval_ms: Minimum interval between two updates of the line count properties.
+        """
         QObject.__init__(self)
         self.redirect_to_prebuffer = True
-        self.prebuffer_entries: List[Tuple[int, str, str]] = []
+        self.prebuffer_entries: LogRingBuffer[UiLogEntry] = LogRingBuffer(prebuffer_size)
+        self.prebuffer_replay_budget_ms = prebuffer_replay_budget_ms
+        self.prebuffer_replayed_count = 0
+        self.prebuffer_replay_timer: QTimer | None = None
+        self.batch_interval_ms = batch_interval_ms
+        self.batch_entries: List[UiLogEntry] = []
+        self.batch_timer: QTimer | None = None
+        self.list_model = LogListModel(history_size, self)
+        self.pending_list_entries: List[UiLogEntry] = []
+        self.list_timer: QTimer | None = None
+        self.logger_level_filter = LoggerLevelFilter(logger_levels)
+        self.filter_model: LogFilterModel | None = None
+        self.search_index: LogSearchIndex | None = LogSearchIndex(self.list_model) if search_index else None
+        self.thread_ident = threading.get_ident()
+        self.queued_entries: Deque[UiLogEntry] = deque()
+        self.queued_priority_entries: Deque[UiLogEntry] = deque()
+        self.queued_updates: Deque[UiLogEntry] = deque()
+        self.queued_entries_drain_scheduled = False
+        self.queue_dropped_counts: Dict[int, int] = {}
+        self.queue_dropped_count = 0
+        self.queue_lock = threading.Lock()
+        self.load_shedder = LoadShedder(max_delivery_lag_ms / 1000.0, degraded_sample_interval) if max_delivery_lag_ms is not None else None
+        self.reported_delivery_lag_ms = 0
+        self.lag_check_timer: QTimer | None = None
+        self.reported_shed_count = 0
+        self.statistics = LogStatistics(statistics_window_s)
+        self.statistics_interval_ms = statistics_interval_ms
+        self.statistics_timer: QTimer | None = None
+        self.published_statistics: Dict[str, Dict[str, int]] = {}
+        self.exporter = LogExporter(self)
+        self.exporter.progress.connect(self.exportProgress)
+        self.exporter.finished.connect(self._on_export_finished)
+        self._queuedLogLinesAvailable.connect(self.drain_queued_log_lines, Qt.ConnectionType.QueuedConnection)
+
+    @staticmethod
+    def dropped_lines_message(dropped_counts: Dict[int, int], reason: str = "from prebuffer") -> str:
+        details = ", ".join(f"{logging.getLevelName(levelno)}={count}" for levelno, count in sorted(dropped_counts.items()))
+        return f"{sum(dropped_counts.values())} log lines dropped {reason} ({details})"
+
+    @property
+    def batched(self) -> bool:
+        return self.batch_interval_ms is not None
 
     @Slot()
-    def requestPrebuffer(self):
-        for prebuffer_entry in self.prebuffer_entries:
-            self.logLineAdded.emit(*prebuffer_entry)
+    def requestPrebuffer(self) -> None:
+        """
+        Replays the prebuffered lines through logLineAdded/logLinesAdded and switches to live delivery.
+
+        The replay runs in chunks of prebuffer_replay_budget_ms, one per event loop iteration, so a
+        large backlog doesn't delay the first frame. Lines added meanwhile are replayed after the
+        backlog. prebufferReplayProgress is emitted after every chunk, replayed == total once done.
+        """
+        if self.prebuffer_replay_timer and self.prebuffer_replay_timer.isActive():
+            return
+        self.flush()
+        if QCoreApplication.instance() is None:
+            while self.redirect_to_prebuffer:
+                self._replay_prebuffer_chunk()
+        else:
+            self._replay_prebuffer_chunk()
+
+    @Slot(result=list)
+    def takePrebuffer(self) -> List[Dict[str, Any]]:
+        """
+        Returns all prebuffered lines at once as [{"levelno": ..., "header": ..., "msg": ...}, ...] and switches
+        to live delivery. Meant for consumers appending the backlog to a ListModel with a single append() call.
+        """
+        if self.prebuffer_replay_timer:
+            self.prebuffer_replay_timer.stop()
+        self.flush()
+
+        entries: List[UiLogEntry] = []
+        if self.prebuffer_entries.dropped_count:
+            entries.append(UiLogEntry(logging.WARNING, "", self.dropped_lines_message(self.prebuffer_entries.dropped_counts)))
+        entries.extend(self.prebuffer_entries)
+        self.prebuffer_entries.clear()
         self.redirect_to_prebuffer = False
 
+        lines = []
+        for entry in entries:
+            header, msg = entry.render()
+            lines.append({"levelno": entry.levelno, "header": header, "msg": msg})
+        return lines
+
+    @Slot()
+    def _replay_prebuffer_chunk(self) -> None:
+        prebuffer_entries = self.prebuffer_entries
+        deadline = time.perf_counter() + self.prebuffer_replay_budget_ms / 1000.0
+        chunk: List[UiLogEntry] = []
+        if prebuffer_entries.dropped_count:
+            chunk.append(UiLogEntry(logging.WARNING, "", self.dropped_lines_message(prebuffer_entries.dropped_counts)))
+            prebuffer_entries.dropped_counts.clear()
+        render = self._line_signal_connected()
+        while prebuffer_entries:
+            entry = prebuffer_entries.popleft()
+            if render:
+                entry.render()
+            chunk.append(entry)
+            if time.perf_counter() >= deadline:
+                break
+
+        self.prebuffer_replayed_count += len(chunk)
+        total = self.prebuffer_replayed_count + len(prebuffer_entries)
+        if not prebuffer_entries:
+            self.redirect_to_prebuffer = False
+        elif QCoreApplication.instance() is not None:
+            self._start_prebuffer_replay_timer()
+
+        self._emit_log_lines(chunk)
+        self.prebufferReplayProgress.emit(self.prebuffer_replayed_count, total)
+
+    def _start_prebuffer_replay_timer(self) -> None:
+        if self.prebuffer_replay_timer is None:
+            self.prebuffer_replay_timer = QTimer(self)
+            self.prebuffer_replay_timer.setSingleShot(True)
+            self.prebuffer_replay_timer.timeout.connect(self._replay_prebuffer_chunk)
+        self.prebuffer_replay_timer.start(0)
+
+    @Slot()
+    def flush(self) -> None:
+        if self.batch_timer:
+            self.batch_timer.stop()
+        if self.batch_entries:
+            batch_entries = self.batch_entries
+            self.batch_entries = []
+            self._deliver_log_lines(batch_entries)
+        self.flush_list_entries()
+
+    @Slot()
+    def flush_list_entries(self) -> None:
+        """Appends the lines delivered since the last event loop iteration to the list model as a single row range."""
+        if self.list_timer:
+            self.list_timer.stop()
+        if self.pending_list_entries:
+            pending_list_entries = self.pending_list_entries
+            self.pending_list_entries = []
+            self.list_model.append_entries(pending_list_entries)
+
     def add_log_line(self, level: int, header: str, msg: str) -> None:
+        self.add_log_entry(UiLogEntry(level, header, msg))
+
+    def add_log_entry(self, entry: UiLogEntry, counted: bool = True) -> None:
+        """
+        Adds a line, thread-safe.
+
+        :param counted: Whether the line is counted in the statistics, False for notices of the pipeline itself.
+        """
+        if counted:
+            self.statistics.add(entry.levelno, entry.name, entry.created or time.time())
+        if threading.get_ident() != self.thread_ident:
+            if self.load_shedder and not self.load_shedder.accept(entry.levelno):
+                return
+            queue = self.queued_priority_entries if entry.levelno >= logging.WARNING else self.queued_entries
+            if len(queue) < self.prebuffer_entries.capacity:
+                queue.append(entry)
+            else:
+                with self.queue_lock:
+                    self.queue_dropped_counts[entry.levelno] = self.queue_dropped_counts.get(entry.levelno, 0) + 1
+            self._schedule_drain()
+            return
+
+        if self.queued_priority_entries or self.queued_entries or self.queued_updates:
+            self.drain_queued_log_lines()
+        self._add_log_line_entries([entry])
+
+    def update_log_entry(self, entry: UiLogEntry) -> None:
+        """Notifies consumers about a changed repeat count of an already added entry. Thread-safe."""
+        self.statistics.add(entry.levelno, entry.name, time.time())
+        if threading.get_ident() != self.thread_ident:
+            self.queued_updates.append(entry)
+            self._schedule_drain()
+            return
+
+        if self.queued_priority_entries or self.queued_entries or self.queued_updates:
+            self.drain_queued_log_lines()
+        self._update_log_entries([entry])
+
+    def count_log_line(self, levelno: int, name: str, created: float) -> None:
+        """Counts a line that is not shown, e.g. one suppressed by the rate limit, in the statistics. Thread-safe."""
+        self.statistics.add(levelno, name, created)
+        if threading.get_ident() != self.thread_ident:
+            # The drain cycle publishes the statistics on the GUI thread
+            self._schedule_drain()
+        else:
+            self._schedule_statistics_update()
+
+    def _schedule_drain(self) -> None:
+        if not self.queued_entries_drain_scheduled:
+            self.queued_entries_drain_scheduled = True
+            self._queuedLogLinesAvailable.emit()
+
+    @staticmethod
+    def _pop_all(queue: Deque[UiLogEntry]) -> List[UiLogEntry]:
+        entries: List[UiLogEntry] = []
+        while queue:
+            entries.append(queue.popleft())
+        return entries
+
+    @Slot()
+    def drain_queued_log_lines(self) -> None:
+        # Reset the flag before draining. Entries queued meanwhile are either drained by this
+        # call or trigger another (possibly empty) drain cycle, but never get stuck.
+        self.queued_entries_drain_scheduled = False
+        # WARNING and above don't wait behind the queued DEBUG/INFO lines
+        entries = self._pop_all(self.queued_priority_entries)
+        entries.extend(self._pop_all(self.queued_entries))
+        if self.load_shedder:
+            self._update_delivery_lag(entries)
+            if self.load_shedder.degraded and QCoreApplication.instance() is not None:
+                self._start_lag_check_timer()
+        if self.queue_dropped_counts:
+            with self.queue_lock:
+                dropped_counts = self.queue_dropped_counts
+                self.queue_dropped_counts = {}
+            entries.append(UiLogEntry(logging.WARNING, "", self.dropped_lines_message(dropped_counts, "from the full queue of other threads")))
+            self.queue_dropped_count += sum(dropped_counts.values())
+            self.dropped_line_count_changed.emit()
+        self._add_log_line_entries(entries)
+        self._update_log_entries(self._pop_all(self.queued_updates))
+        self._schedule_statistics_update()
+
+    def _start_lag_check_timer(self) -> None:
+        # Once logging goes idle there is nothing left to drain, an empty drain reports the lag as recovered
+        if self.lag_check_timer is None:
+            assert self.load_shedder
+            self.lag_check_timer = QTimer(self)
+            self.lag_check_timer.setSingleShot(True)
+            self.lag_check_timer.setInterval(round(self.load_shedder.max_lag_s * 1000.0))
+            self.lag_check_timer.timeout.connect(self.drain_queued_log_lines)
+        self.lag_check_timer.start()
+
+    def _update_delivery_lag(self, entries: List[UiLogEntry]) -> None:
+        assert self.load_shedder
+        load_shedder = self.load_shedder
+        created = min((entry.created for entry in entries if entry.created), default=None)
+        lag_s = max(0.0, time.time() - created) if created else 0.0
+
+        if load_shedder.update_lag(lag_s):
+            if not load_shedder.degraded:
+                shed_counts = load_shedder.take_shed_counts()
+                if shed_counts:
+                    entries.append(UiLogEntry(logging.WARNING, "", self.dropped_lines_message(shed_counts, "while the UI was lagging behind")))
+            self.degraded_changed.emit()
+
+        # Notify only about changes, not on every drain cycle
+        if round(lag_s * 1000.0) != self.reported_delivery_lag_ms:
+            self.reported_delivery_lag_ms = round(lag_s * 1000.0)
+            self.delivery_lag_changed.emit()
+        if load_shedder.shed_count != self.reported_shed_count:
+            self.reported_shed_count = load_shedder.shed_count
+            self.dropped_line_count_changed.emit()
+
+    def _update_log_entries(self, entries: List[UiLogEntry]) -> None:
+        if entries:
+            # The rows of repeated lines are looked up by their sequence number
+            self.flush_list_entries()
+            self._schedule_statistics_update()
+        emit = not self.redirect_to_prebuffer and self._is_signal_connected("logLineRepeated(int,QString,QString,int)")
+        for entry in dict.fromkeys(entries):
+            self.list_model.entry_changed(entry)
+            if entry.sequence >= 0 and emit:
+                self.logLineRepeated.emit(entry.levelno, *entry.render(), entry.repeat_count)
+
+    def _add_log_line_entries(self, entries: List[UiLogEntry]) -> None:
+        if not entries:
+            return
+        if not self.batched or QCoreApplication.instance() is None:
+            self._deliver_log_lines(entries)
+            return
+
+        batch_was_empty = not self.batch_entries
+        self.batch_entries.extend(entries)
+        if self.degraded and any(entry.levelno >= logging.WARNING for entry in entries):
+            self.flush()
+        elif batch_was_empty:
+            self._start_batch_timer()
+
+    def _deliver_log_lines(self, entries: List[UiLogEntry]) -> None:
+        self._append_list_entries(entries)
+        self._schedule_statistics_update()
         if self.redirect_to_prebuffer:
-            self.prebuffer_entries.append((level, header, msg))
+            for entry in entries:
+                self.prebuffer_entries.append(entry.levelno, entry)
+        else:
+            self._emit_log_lines(entries)
+
+    def _is_signal_connected(self, signature: str) -> bool:
+        meta_object = self.metaObject()
+        return self.isSignalConnected(meta_object.method(meta_object.indexOfSignal(signature)))
+
+    def _line_signal_connected(self) -> bool:
+        return self._is_signal_connected("logLinesAdded(QVariantList)" if self.batched else "logLineAdded(int,QString,QString)")
+
+    def _emit_log_lines(self, entries: List[UiLogEntry]) -> None:
+        # Lines are only rendered for the signals if someone listens, listModel renders the displayed rows itself
+        if not entries or not self._line_signal_connected():
+            return
+        if self.batched:
+            self.logLinesAdded.emit([[entry.levelno, *entry.render()] for entry in entries])
         else:
-            self.logLineAdded.emit(level, header, msg)
+            for entry in entries:
+                self.logLineAdded.emit(entry.levelno, *entry.render())
+
+    def _append_list_entries(self, entries: List[UiLogEntry]) -> None:
+        if QCoreApplication.instance() is None:
+            self.list_model.append_entries(entries)
+            return
+        self.pending_list_entries.extend(entries)
+        if len(self.pending_list_entries) >= self.list_model.history.capacity:
+            self.flush_list_entries()
+        elif self.list_timer is None or not self.list_timer.isActive():
+            self._start_list_timer()
+
+    def _start_list_timer(self) -> None:
+        if self.list_timer is None:
+            self.list_timer = QTimer(self)
+            self.list_timer.setSingleShot(True)
+            self.list_timer.timeout.connect(self.flush_list_entries)
+        self.list_timer.start(0)
+
+    def _start_batch_timer(self) -> None:
+        if self.batch_timer is None:
+            self.batch_timer = QTimer(self)
+            self.batch_timer.setSingleShot(True)
+            self.batch_timer.timeout.connect(self.flush)
+        self.batch_timer.start(self.batch_interval_ms or 0)
+
+    def _schedule_statistics_update(self) -> None:
+        if QCoreApplication.instance() is None:
+            self.publish_statistics()
+            return
+        if self.statistics_timer is None:
+            self.statistics_timer = QTimer(self)
+            self.statistics_timer.setSingleShot(True)
+            self.statistics_timer.timeout.connect(self.publish_statistics)
+        if not self.statistics_timer.isActive():
+            self.statistics_timer.start(self.statistics_interval_ms)
+
+    @Slot()
+    def publish_statistics(self) -> None:
+        now = time.time()
+        statistics = {
+            "levelCounts": self.statistics.level_counts(),
+            "recentLevelCounts": self.statistics.recent_level_counts(now),
+            "loggerCounts": self.statistics.logger_counts(),
+            "recentLoggerCounts": self.statistics.recent_logger_counts(now),
+        }
+        if statistics != self.published_statistics:
+            self.published_statistics = statistics
+            self.statistics_changed.emit()
+        # Keep updating until the recent counts decayed, also without new lines
+        if self.statistics_timer and any(statistics["recentLevelCounts"].values()):
+            self.statistics_timer.start(self.statistics_interval_ms)
+
+    def get_list_model(self) -> LogListModel:
+        return self.list_model
+
+    listModel = Property(QObject, get_list_model, constant=True)  # type: ignore
+
+    def get_filter_model(self) -> LogFilterModel:
+        # Follows every change of the list model, so it is only created once it is actually used
+        if self.filter_model is None:
+            self.filter_model = LogFilterModel(self.list_model, self)
+        return self.filter_model
+
+    filteredListModel = Property(QObject, get_filter_model, constant=True)  # type: ignore
+
+    def get_search_index(self) -> LogSearchIndex:
+        # Indexing costs time on the compaction thread and memory per line, so it only starts once
+        # searching is actually used. From then on every compacted segment is indexed.
+        if self.search_index is None:
+            self.search_index = LogSearchIndex(self.list_model)
+        return self.search_index
+
+    @Slot(str, result=bool)
+    def exportLog(self, path_or_url: str) -> bool:
+        """
+        Writes the current history to a file on a worker thread (see LogExporter for the formats) while
+        logging continues. Returns False if an export is already running.
+        """
+        if self.exporter.running:
+            return False
+        self.flush()
+        path = Path(QUrl(path_or_url).toLocalFile() if path_or_url.startswith("file:") else path_or_url)
+        self.exporter.start(self.list_model.history.snapshot(), path)
+        self.exporting_changed.emit()
+        return True
+
+    @Slot()
+    def cancelExport(self) -> None:
+        self.exporter.cancel()
+
+    @Slot(bool, str)
+    def _on_export_finished(self, success: bool, path: str) -> None:
+        self.exporter.wait()
+        self.exporting_changed.emit()
+        self.exportFinished.emit(success, path)
+
+    def get_exporting(self) -> bool:
+        return self.exporter.running
+
+    @Signal  # type: ignore
+    def exporting_changed(self):
+        pass
+
+    exporting = Property(bool, get_exporting, notify=exporting_changed)  # type: ignore
+
+    @Slot(str, result=list)
+    def search(self, query: str) -> List[List[int]]:
+        """Returns the listModel rows containing query (case-insensitive) as [first, last] ranges."""
+        self.flush_list_entries()
+        return self.get_search_index().search_row_ranges(query)
+
+    @Slot(str, int)
+    def setFilter(self, query: str, min_levelno: int) -> None:
+        """
+        Restricts filteredListModel to lines containing query (case-insensitive) with a level of at least min_levelno.
+        The matching lines are searched on the compaction thread and inserted into filteredListModel once found.
+        """
+        self.flush_list_entries()
+        self.get_filter_model().set_filter(query, min_levelno, self.get_search_index())
 
     @Slot(str)
     def setLogLevel(self, log_level):
@@ -50,6 +550,7 @@ class LogModel(QObject):
             logging.getLogger().setLevel(logging.WARNING)
         logging.warning("Changing log level to '%s'", log_level)
         logging.getLogger().setLevel(log_level)
+        apply_qt_logging_filter_rules()
 
     def log_level(self):
         return logging.getLevelName(logging.getLogger().level)
@@ -60,21 +561,171 @@ class LogModel(QObject):
 
     logLevel = Property(str, log_level, notify=log_level_changed)  # type: ignore
 
+    @Slot(str, str)
+    def setLoggerLevel(self, logger_name_prefix: str, log_level: str) -> None:
+        """
+        Sets the minimum level of lines shown in the UI for a logger and its children. Muted lines are
+        dropped by the ui handler before they are formatted, other handlers are not affected.
+        """
+        self.logger_level_filter.set_level(logger_name_prefix, log_level)
+        self.logger_levels_changed.emit()
+
+    @Slot(str)
+    def resetLoggerLevel(self, logger_name_prefix: str) -> None:
+        self.logger_level_filter.remove_level(logger_name_prefix)
+        self.logger_levels_changed.emit()
+
+    def logger_levels(self) -> Dict[str, str]:
+        return {prefix: logging.getLevelName(levelno) for prefix, levelno in self.logger_level_filter.logger_levels.items()}
+
+    @Signal  # type: ignore
+    def logger_levels_changed(self):
+        pass
+
+    loggerLevels = Property("QVariantMap", logger_levels, notify=logger_levels_changed)  # type: ignore
+
+    def delivery_lag_ms(self) -> int:
+        return self.reported_delivery_lag_ms
+
+    @Signal  # type: ignore
+    def delivery_lag_changed(self):
+        pass
+
+    deliveryLagMs = Property(int, delivery_lag_ms, notify=delivery_lag_changed)  # type: ignore
+
+    def dropped_line_count(self) -> int:
+        return self.reported_shed_count + self.queue_dropped_count
+
+    @Signal  # type: ignore
+    def dropped_line_count_changed(self):
+        pass
+
+    droppedLineCount = Property(int, dropped_line_count, notify=dropped_line_count_changed)  # type: ignore
+
+    @property
+    def degraded(self) -> bool:
+        return self.load_shedder is not None and self.load_shedder.degraded
+
+    def get_degraded(self) -> bool:
+        return self.degraded
+
+    @Signal  # type: ignore
+    def degraded_changed(self):
+        pass
+
+    degradedMode = Property(bool, get_degraded, notify=degraded_changed)  # type: ignore
+
+    @Signal  # type: ignore
+    def statistics_changed(self):
+        pass
+
+    def level_counts(self) -> Dict[str, int]:
+        return self.published_statistics.get("levelCounts", {})
+
+    levelCounts = Property("QVariantMap", level_counts, notify=statistics_changed)  # type: ignore
+
+    def recent_level_counts(self) -> Dict[str, int]:
+        return self.published_statistics.get("recentLevelCounts", {})
+
+    recentLevelCounts = Property("QVariantMap", recent_level_counts, notify=statistics_changed)  # type: ignore
+
+    def logger_counts(self) -> Dict[str, int]:
+        return self.published_statistics.get("loggerCounts", {})
+
+    loggerCounts = Property("QVariantMap", logger_counts, notify=statistics_changed)  # type: ignore
+
+    def recent_logger_counts(self) -> Dict[str, int]:
+        return self.published_statistics.get("recentLoggerCounts", {})
+
+    recentLoggerCounts = Property("QVariantMap", recent_logger_counts, notify=statistics_changed)  # type: ignore
+
 
 class UiLogHandler(logging.Handler):
+    """Forwards log records to a LogModel.
 
-    def __init__(self):
+    The handler lock is not taken: the record is captured as a lazy UiLogEntry without being
+    rendered and LogModel.add_log_entry() is thread-safe, so concurrent emitters never serialize
+    on the UI. Header and message get rendered once a consumer actually displays the line.
+    """
+
+    # fmt: off
+    def __init__(self,
+                 prebuffer_size: int = LogModel.DEFAULT_PREBUFFER_SIZE,
+                 batch_interval_ms: int | None = None,
+                 history_size: int = LogListModel.DEFAULT_HISTORY_SIZE,
+                 logger_levels: Dict[str, int | str] | None = None,
+                 coalesce_window_ms: int | None = None,
+                 rate_limit: float | None = None,
+                 rate_limit_burst: int = 100,
+                 search_index: bool = False,
+                 prebuffer_replay_budget_ms: int = LogModel.DEFAULT_PREBUFFER_REPLAY_BUDGET_MS,
+                 max_delivery_lag_ms: int | None = None,
+                 degraded_sample_interval: int = LogModel.DEFAULT_DEGRADED_SAMPLE_INTERVAL,
+                 statistics_window_s: int = LogModel.DEFAULT_STATISTICS_WINDOW_S,
+                 statistics_interval_ms: int = LogModel.DEFAULT_STATISTICS_INTERVAL_MS
+                 ):
+        """
+        :param coalesce_window_ms: Enables coalescing when not None. Records repeating the (logger, level,
+            msg template) of a line created less than coalesce_window_ms before only increment the repeat
+            count of that line.
+        :param rate_limit: Enables a per-logger token bucket when not None. On average, rate_limit lines per
+            second and logger reach the UI, with bursts of up to rate_limit_burst lines. The number of
+            suppressed lines is reported once the logger gets through again.
+        """
         super().__init__()
-        self.log_model = LogModel()
+        self.log_model = LogModel(
+            prebuffer_size=prebuffer_size,
+            batch_interval_ms=batch_interval_ms,
+            history_size=history_size,
+            logger_levels=logger_levels,
+            search_index=search_index,
+            prebuffer_replay_budget_ms=prebuffer_replay_budget_ms,
+            max_delivery_lag_ms=max_delivery_lag_ms,
+            degraded_sample_interval=degraded_sample_interval,
+            statistics_window_s=statistics_window_s,
+            statistics_interval_ms=statistics_interval_ms
+        )
+        self.ui_formatter = UiLogFormatter()
+        self.addFilter(self.log_model.logger_level_filter)
+        self.coalescer = LogCoalescer(coalesce_window_ms / 1000.0) if coalesce_window_ms is not None else None
+        self.rate_limiter = TokenBucketRateLimiter(rate_limit, rate_limit_burst) if rate_limit is not None else None
+    # fmt: on
+
+    def setFormatter(self, fmt: logging.Formatter | None) -> None:
+        super().setFormatter(fmt)
+        self.ui_formatter = UiLogFormatter(fmt)
+
+    def handle(self, record):
+        rv = self.filter(record)
+        if isinstance(rv, logging.LogRecord):
+            record = rv
+        if rv:
+            self.emit(record)
+        return rv
 
     def emit(self, record):
         try:
-            msg = record.getMessage()
-            header_record = copy(record)
-            header_record.msg = ""
-            header_record.args = None
-            header = self.format(header_record)
-            self.log_model.add_log_line(record.levelno, header, msg)
+            coalescer = self.coalescer
+            coalesce_key = coalescer.key(record) if coalescer else None
+            if coalescer and coalesce_key is not None:
+                coalescing_entry = coalescer.absorb(coalesce_key, record)
+                if coalescing_entry is not None:
+                    self.log_model.update_log_entry(coalescing_entry)
+                    return
+
+            if self.rate_limiter:
+                accepted, suppressed_count = self.rate_limiter.acquire(record.name, record.created)
+                if not accepted:
+                    self.log_model.count_log_line(record.levelno, record.name, record.created)
+                    return
+                if suppressed_count:
+                    suppressed_message = f"{suppressed_count} lines of logger '{record.name}' suppressed by the UI rate limit"
+                    self.log_model.add_log_entry(UiLogEntry(logging.WARNING, "", suppressed_message), counted=False)
+
+            entry = self.ui_formatter.create_entry(record)
+            if coalescer and coalesce_key is not None:
+                coalescer.register(coalesce_key, entry)
+            self.log_model.add_log_entry(entry)
         except (KeyboardInterrupt, SystemExit):
             raise
         except:
@@ -87,12 +738,13 @@ class QmlApplication(GenericApplication):
                  application_name: str,
                  version: str,
                  frontend_qml_file_path: Path,
+                 queued_logging: bool = False,
                  **kwargs
                  ):
         super().__init__(
             application_name=application_name,
             version=version,
-            logging_default_config_filepath=FILE_DIR / "resources/default_logging_config.yaml",
+            logging_default_config_filepath=FILE_DIR / ("resources/queued_logging_config.yaml" if queued_logging else "resources/default_logging_config.yaml"),
             **kwargs
         )
     # fmt: on
@@ -102,6 +754,9 @@ class QmlApplication(GenericApplication):
         self.app: QCoreApplication | QGuiApplication | None = None
         self.engine: QQmlApplicationEngine | None = None
         self.signal_watchdog_timer: QTimer | None = None
+        self.log_file_model: LogFileModel | None = None
+        self.log_forwarding_server: LogForwardingServer | None = None
+        self.log_stream_server: LogStreamServer | None = None
 
         super().add_custom_init_stage_two(self._init_stage_qml)
         super().add_custom_init_stage_two(self._init_stage_qml_logging)
@@ -114,6 +769,13 @@ class QmlApplication(GenericApplication):
                 assert isinstance(handler, UiLogHandler)
                 return handler.log_model
 
+    @staticmethod
+    def close_queue_sink_handlers() -> None:
+        """Hands all queued records to their sinks and stops the background threads."""
+        loggers = [logging.getLogger()] + [logger for logger in logging.Logger.manager.loggerDict.values() if isinstance(logger, logging.Logger)]
+        for handler in {handler for logger in loggers for handler in logger.handlers if isinstance(handler, QueueSinkHandler)}:
+            handler.close()
+
     @staticmethod
     def qt_message_handler(mode, context, message):
         match mode:
@@ -130,6 +792,26 @@ class QmlApplication(GenericApplication):
         assert self.engine
         self.engine.rootContext().setContextProperty(name, model)
 
+    def start_log_forwarding(self) -> Tuple[str, int]:
+        """
+        Starts receiving log records of child processes and returns the arguments to pass to
+        init_log_forwarding() in the children, e.g. multiprocessing.Pool(initializer=init_log_forwarding, initargs=initargs).
+        """
+        if self.log_forwarding_server is None:
+            self.log_forwarding_server = LogForwardingServer()
+            self.log_forwarding_server.listen()
+        return self.log_forwarding_server.initargs()
+
+    def start_log_streaming(self, port: int = 0, host: str = "127.0.0.1") -> int:
+        """
+        Streams the log lines of the ui handler to WebSocket viewers (see LogStreamServer) and returns
+        the port. Listens on localhost only by default, remote viewers can attach with an SSH tunnel.
+        """
+        if self.log_stream_server is None:
+            self.log_stream_server = LogStreamServer(self.log_model.get_list_model())
+            self.log_stream_server.listen(port, host)
+        return self.log_stream_server.port
+
     def _sigint_handler(self, signum: int, frame: FrameType | None):
         assert self.app
         self.app.exit(0)
@@ -144,22 +826,38 @@ class QmlApplication(GenericApplication):
             self.app = QGuiApplication.instance()
 
         self.engine = QQmlApplicationEngine()
+        self.engine.addImportPath(FILE_DIR / "resources/qml")
 
         self.signal_watchdog_timer = QTimer()
         self.signal_watchdog_timer.timeout.connect(lambda: None)
         self.signal_watchdog_timer.start(200)
 
         QtCore.qInstallMessageHandler(self.qt_message_handler)
+        apply_qt_logging_filter_rules()
 
     def _init_stage_qml_logging(self) -> None:
         self.log_model = self.find_dev_log_handler()
         self.add_model(self.log_model, "log_model")
+        self.log_file_model = LogFileModel()
+        self.add_model(self.log_file_model, "log_file_model")
 
     def _init_stage_qml_info(self) -> None:
         logm.debug("qml details:")
         logm.debug("- qml frontend filepath = %s", self.frontend_qml_file_path.absolute())
 
     def open(self) -> int:
+        try:
+            return self._exec()
+        finally:
+            if self.log_file_model:
+                self.log_file_model.close()
+            if self.log_forwarding_server:
+                self.log_forwarding_server.close()
+            if self.log_stream_server:
+                self.log_stream_server.close()
+            self.close_queue_sink_handlers()
+
+    def _exec(self) -> int:
         if self.app is None:
             return -1
 
@@ -0,0 +1,78 @@
+// Copyright (C) 2024 twyleg
+import QtQuick 2.15
+import QtQuick.Controls 2.15
+
+// Log console backed by LogModel.listModel (or LogModel.filteredListModel if filtered is set).
+// Any model with the same roles, e.g. a LogFileModel, can be shown by setting sourceModel instead.
+// Only the visible rows get a delegate, so the rendering cost doesn't depend on the number of
+// retained log lines. The history already holds the prebuffered lines, so a console showing a
+// logModel ends its prebuffer mode (see LogModel.requestPrebuffer).
+ListView {
+    id: logConsole
+
+    property var logModel: null
+    property var sourceModel: null
+    property bool filtered: false
+    property bool followTail: true
+    property int fontPixelSize: 12
+    property color textColor: "white"
+    property color warningColor: "orange"
+    property color errorColor: "red"
+    property color backgroundColor: "#ff2e2f30"
+
+    function endPrebuffer() {
+        if (logModel && !sourceModel)
+            logModel.requestPrebuffer()
+    }
+
+    function levelColor(levelno) {
+        if (levelno >= 40)
+            return errorColor
+        if (levelno >= 30)
+            return warningColor
+        return textColor
+    }
+
+    model: sourceModel ? sourceModel : (logModel ? (filtered ? logModel.filteredListModel : logModel.listModel) : null)
+
+    clip: true
+    reuseItems: true
+    boundsBehavior: Flickable.StopAtBounds
+
+    ScrollBar.vertical: ScrollBar {
+        policy: ScrollBar.AlwaysOn
+    }
+
+    Rectangle {
+        anchors.fill: parent
+        z: -1
+        color: logConsole.backgroundColor
+    }
+
+    delegate: Text {
+        required property int levelno
+        required property string header
+        required property string message
+        required property int repeatCount
+
+        // Sized to the content, so multi-line messages and tracebacks are shown in full
+        width: ListView.view.width
+
+        text: repeatCount > 1 ? header + message + " (\u00d7" + repeatCount + ")" : header + message
+        textFormat: Text.PlainText
+        wrapMode: Text.Wrap
+        color: logConsole.levelColor(levelno)
+        font.pixelSize: logConsole.fontPixelSize
+    }
+
+    onCountChanged: {
+        if (followTail)
+            positionViewAtEnd()
+    }
+
+    onMovementEnded: followTail = atYEnd
+
+    onLogModelChanged: endPrebuffer()
+
+    Component.onCompleted: endPrebuffer()
+}
@@ -0,0 +1 @@
+# Copyright (C) 2024 twyleg
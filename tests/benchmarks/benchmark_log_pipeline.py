@@ -0,0 +1,244 @@
+# Copyright (C) 2024 twyleg
+"""End-to-end throughput benchmark of the UI log pipeline.
+
+Drives logging -> UiLogHandler -> LogModel -> offscreen QML consumer (LogConsole plus a signal
+counter) for a grid of batch intervals, record levels and emitting thread counts and reports
+records/s, p50/p99 emit latency and the CPU time spent on the GUI thread. Thread count 0 means
+the records are emitted on the GUI thread itself.
+
+Usage:
+    python tests/benchmarks/benchmark_log_pipeline.py --output results.json
+    python tests/benchmarks/benchmark_log_pipeline.py --baseline results.json --max-regression 0.2
+
+Every run also measures the records/s of a reference pipeline that only formats the records with a
+plain logging.Handler. The regression gate (tox -e benchmark) compares the records/s relative to
+that reference against tests/benchmarks/baseline.json, so the baseline holds on other machines as
+long as they are uniformly faster or slower. The baseline is recorded with the gate's --threads 0
+--repeat 3 on a clean tree, the threaded scenarios vary too much between runs to gate on.
+"""
+import argparse
+import json
+import logging
+import platform
+import sys
+import threading
+import time
+from dataclasses import asdict, dataclass
+from itertools import product
+from pathlib import Path
+from typing import Any, Dict, List
+
+from PySide6.QtCore import QCoreApplication
+from PySide6.QtGui import QGuiApplication
+from PySide6.QtQml import QQmlApplicationEngine
+
+import simple_python_app_qt
+from simple_python_app_qt.qml_application import UiLogHandler
+
+
+FILE_DIR = Path(__file__).parent
+PACKAGE_QML_DIR = Path(simple_python_app_qt.__file__).parent / "resources/qml"
+
+FORMAT = "[%(asctime)s.%(msecs)03d][%(levelname)s][%(name)s]: %(message)s"
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+BATCH_INTERVALS: List[int | None] = [None, 0, 16]
+LEVELS = ["INFO", "DEBUG"]
+THREAD_COUNTS = [0, 1, 4]
+
+
+@dataclass
+class Scenario:
+    batch_interval_ms: int | None
+    level: str
+    threads: int
+    records: int
+
+    @property
+    def name(self) -> str:
+        batch = "unbatched" if self.batch_interval_ms is None else f"batch{self.batch_interval_ms}ms"
+        return f"{batch}-{self.level.lower()}-{self.threads}threads"
+
+
+@dataclass
+class Result:
+    name: str
+    scenario: Dict[str, Any]
+    delivered_lines: int
+    duration_s: float
+    records_per_s: float
+    emit_latency_p50_us: float
+    emit_latency_p99_us: float
+    gui_thread_cpu_s: float
+
+
+class FormattingHandler(logging.Handler):
+    def __init__(self) -> None:
+        super().__init__()
+        self.lines: List[str] = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.lines.append(self.format(record))
+
+
+def percentile(sorted_values: List[int], fraction: float) -> int:
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+def emit_records(logger: logging.Logger, levelno: int, count: int, latencies_ns: List[int]) -> None:
+    perf_counter_ns = time.perf_counter_ns
+    for i in range(count):
+        start = perf_counter_ns()
+        logger.log(levelno, "Benchmark record %d with payload %r", i, ("payload", i))
+        latencies_ns.append(perf_counter_ns() - start)
+
+
+def run_scenario(scenario: Scenario, timeout_s: float = 60.0) -> Result:
+    app = QGuiApplication.instance()
+    assert app
+
+    # Lines queued by the emitting threads are bounded by the prebuffer size, none may be dropped here
+    handler = UiLogHandler(batch_interval_ms=scenario.batch_interval_ms, history_size=max(scenario.records, 1), prebuffer_size=max(scenario.records, 1))
+    handler.setLevel(logging.INFO)
+    handler.setFormatter(logging.Formatter(FORMAT, DATE_FORMAT))
+
+    logger = logging.getLogger(f"benchmark.{scenario.name}")
+    logger.handlers = [handler]
+    logger.propagate = False
+    logger.setLevel(logging.DEBUG)
+
+    engine = QQmlApplicationEngine()
+    engine.addImportPath(PACKAGE_QML_DIR)
+    engine.rootContext().setContextProperty("log_model", handler.log_model)
+    engine.load(FILE_DIR / "resources/log_consumer.qml")
+    if not engine.rootObjects():
+        raise RuntimeError("Unable to load benchmark QML consumer")
+    consumer = engine.rootObjects()[0]
+    QCoreApplication.processEvents()
+
+    levelno = logging.getLevelName(scenario.level)
+    expected_lines = scenario.records if levelno >= handler.level else 0
+    emitting_threads = max(scenario.threads, 1)
+    records_per_thread = scenario.records // emitting_threads
+    latencies: List[List[int]] = [[] for _ in range(emitting_threads)]
+
+    gui_thread_cpu_start = time.thread_time()
+    start = time.perf_counter()
+
+    if scenario.threads == 0:
+        emit_records(logger, levelno, records_per_thread, latencies[0])
+        workers: List[threading.Thread] = []
+    else:
+        workers = [threading.Thread(target=emit_records, args=(logger, levelno, records_per_thread, latencies[i])) for i in range(emitting_threads)]
+        for worker in workers:
+            worker.start()
+
+    expected_lines = records_per_thread * emitting_threads if expected_lines else 0
+    while consumer.property("receivedLines") < expected_lines or any(worker.is_alive() for worker in workers):
+        QCoreApplication.processEvents()
+        if time.perf_counter() - start > timeout_s:
+            raise TimeoutError(f"Scenario {scenario.name} timed out")
+        time.sleep(0.0005)
+
+    duration_s = time.perf_counter() - start
+    gui_thread_cpu_s = time.thread_time() - gui_thread_cpu_start
+    delivered_lines = consumer.property("receivedLines")
+
+    for worker in workers:
+        worker.join()
+    del engine
+    logger.handlers = []
+
+    all_latencies = sorted(latency for thread_latencies in latencies for latency in thread_latencies)
+    return Result(
+        name=scenario.name,
+        scenario=asdict(scenario),
+        delivered_lines=delivered_lines,
+        duration_s=duration_s,
+        records_per_s=len(all_latencies) / duration_s,
+        emit_latency_p50_us=percentile(all_latencies, 0.50) / 1000.0,
+        emit_latency_p99_us=percentile(all_latencies, 0.99) / 1000.0,
+        gui_thread_cpu_s=gui_thread_cpu_s,
+    )
+
+
+def run_reference(records: int) -> float:
+    """Returns the records/s of only formatting the records on the calling thread, without Qt."""
+    handler = FormattingHandler()
+    handler.setFormatter(logging.Formatter(FORMAT, DATE_FORMAT))
+    logger = logging.getLogger("benchmark.reference")
+    logger.handlers = [handler]
+    logger.propagate = False
+    logger.setLevel(logging.DEBUG)
+
+    latencies_ns: List[int] = []
+    start = time.perf_counter()
+    emit_records(logger, logging.INFO, records, latencies_ns)
+    duration_s = time.perf_counter() - start
+    logger.handlers = []
+    return records / duration_s
+
+
+def find_regressions(results: List[Result], reference_records_per_s: float, baseline: Dict[str, Any], max_regression: float) -> List[str]:
+    """Compares the records/s of results relative to the reference of the same run against the baseline."""
+    baseline_results = {result["name"]: result for result in baseline["results"]}
+    regressions = []
+    for result in results:
+        baseline_result = baseline_results.get(result.name)
+        if not baseline_result:
+            continue
+        relative = result.records_per_s / reference_records_per_s
+        baseline_relative = baseline_result["records_per_s"] / baseline["reference_records_per_s"]
+        if relative < baseline_relative * (1.0 - max_regression):
+            regressions.append(f"{result.name}: {relative:.3f} x reference records/s (baseline {baseline_relative:.3f} x reference records/s)")
+    return regressions
+
+
+def main() -> int:
+    argparser = argparse.ArgumentParser()
+    argparser.add_argument("--records", type=int, default=20000, help="Number of records per scenario")
+    argparser.add_argument("--output", type=Path, default=None, help="Write the results as JSON to this file")
+    argparser.add_argument("--baseline", type=Path, default=None, help="JSON result file to compare records/s against")
+    argparser.add_argument("--max-regression", type=float, default=0.2, help="Tolerated relative records/s drop against the baseline")
+    argparser.add_argument("--threads", type=int, nargs="+", default=THREAD_COUNTS, help="Emitting thread counts to run, 0 = GUI thread")
+    argparser.add_argument("--repeat", type=int, default=1, help="Runs per scenario, the run with the most records/s is reported")
+    args = argparser.parse_args()
+
+    if not QGuiApplication.instance():
+        QGuiApplication([sys.argv[0], "-platform", "offscreen"])
+
+    reference_records_per_s = max(run_reference(args.records) for _ in range(args.repeat))
+    print(f"{'reference':>30}: {reference_records_per_s:>10,.0f} records/s")
+
+    results = []
+    for batch_interval_ms, level, threads in product(BATCH_INTERVALS, LEVELS, args.threads):
+        scenario = Scenario(batch_interval_ms=batch_interval_ms, level=level, threads=threads, records=args.records)
+        result = max((run_scenario(scenario) for _ in range(args.repeat)), key=lambda result: result.records_per_s)
+        results.append(result)
+        print(
+            f"{result.name:>30}: {result.records_per_s:>10,.0f} records/s, "
+            f"p50={result.emit_latency_p50_us:7.1f}us, p99={result.emit_latency_p99_us:8.1f}us, "
+            f"gui cpu={result.gui_thread_cpu_s:6.3f}s"
+        )
+
+    if args.output:
+        report = {
+            "version": simple_python_app_qt.__version__,
+            "python": sys.version,
+            "platform": platform.platform(),
+            "records": args.records,
+            "reference_records_per_s": reference_records_per_s,
+            "results": [asdict(result) for result in results],
+        }
+        args.output.write_text(json.dumps(report, indent=2))
+
+    if args.baseline:
+        regressions = find_regressions(results, reference_records_per_s, json.loads(args.baseline.read_text()), args.max_regression)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,86 @@
+# Copyright (C) 2024 twyleg
+"""Search and filter latency over an indexed LogModel history of a million lines.
+
+Fills the history with records of a few loggers and levels, waits for the compaction thread to
+index them and reports the best search() time of every query. setFilter() searches on the
+compaction thread, for it the time until the matching rows are inserted is reported as well.
+
+Usage: python tests/benchmarks/benchmark_log_search.py [--lines N] [--repeat N]
+"""
+import argparse
+import logging
+import sys
+import time
+from typing import Callable, List
+
+from PySide6.QtCore import QCoreApplication
+
+from simple_python_app_qt.log_formatter import UiLogFormatter
+from simple_python_app_qt.qml_application import LogModel
+
+
+FORMAT = "[%(asctime)s.%(msecs)03d][%(levelname)s][%(name)s]: %(message)s"
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+LOGGERS = ["main", "main.network", "main.storage", "main.ui"]
+LEVELS = [logging.DEBUG, logging.INFO, logging.INFO, logging.INFO, logging.WARNING]
+
+# Matches every line, a tenth of the lines, a few lines and no line at all
+QUERIES = ["handled", "in 5 ms", "user4999 ", "timeout"]
+FILTERS = [("handled", logging.NOTSET), ("in 4 ms", logging.WARNING), ("", logging.WARNING)]
+
+
+def fill(log_model: LogModel, lines: int) -> None:
+    ui_formatter = UiLogFormatter(logging.Formatter(FORMAT, DATE_FORMAT))
+    for i in range(lines):
+        record = logging.LogRecord(LOGGERS[i % 4], LEVELS[i % 5], __file__, 1, "Request %d handled in %d ms by user%d ", (i, i % 10, i % 5000), None)
+        log_model.add_log_entry(ui_formatter.create_entry(record))
+        if i % 10000 == 0:
+            QCoreApplication.processEvents()
+    log_model.flush()
+    log_model.list_model.history.wait_for_compaction()
+
+
+def best_time_ms(function: Callable[[], object], repeat: int) -> float:
+    durations: List[float] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        durations.append(time.perf_counter() - start)
+    return min(durations) * 1000.0
+
+
+def main() -> None:
+    argparser = argparse.ArgumentParser()
+    argparser.add_argument("--lines", type=int, default=1_000_000, help="Number of lines in the history")
+    argparser.add_argument("--repeat", type=int, default=3, help="Number of runs per query (best run is reported)")
+    args = argparser.parse_args()
+
+    app = QCoreApplication.instance() or QCoreApplication(sys.argv[:1])
+    log_model = LogModel(history_size=args.lines, search_index=True)
+    start = time.perf_counter()
+    fill(log_model, args.lines)
+    print(f"{'fill and index':>32}: {time.perf_counter() - start:8.2f} s")
+
+    for query in QUERIES:
+        rows = sum(last - first + 1 for first, last in log_model.search(query))
+        print(f"{f'search({query!r})':>32}: {best_time_ms(lambda: log_model.search(query), args.repeat):8.1f} ms, {rows} rows")
+
+    filter_model = log_model.get_filter_model()
+    for query, min_levelno in FILTERS:
+        gui_thread_ms = best_time_ms(lambda: log_model.setFilter(query, min_levelno), args.repeat)
+        filter_model.wait_for_search()
+
+        def set_filter_and_wait() -> None:
+            log_model.setFilter(query, min_levelno)
+            filter_model.wait_for_search()
+
+        inserted_ms = best_time_ms(set_filter_and_wait, args.repeat)
+        print(
+            f"{f'setFilter({query!r}, {min_levelno})':>32}: {gui_thread_ms:8.1f} ms, rows inserted after {inserted_ms:8.1f} ms, {filter_model.rowCount()} rows"
+        )
+    del app
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+# Copyright (C) 2024 twyleg
+"""Measures the cost of assigning a list to a PropertyMeta property, by list size.
+
+A plain list is copied into a notified list and converted to a QVariantList for the notify
+signal, both scale with the size. A notified_list() is adopted without a copy, and a granular
+property passes it to the notify signal without conversion.
+
+Usage: python tests/benchmarks/benchmark_property_assignment.py [--sizes 1000 1000000] [--repeat N]
+"""
+import argparse
+import time
+from typing import Callable, Dict, List
+
+from PySide6.QtCore import QObject
+
+from simple_python_app_qt.property import Property, PropertyMeta, notified_list
+
+
+DEFAULT_SIZES = [1000, 10000, 100000, 1000000]
+
+
+class Model(QObject, metaclass=PropertyMeta):
+    items = Property(list)
+    rows = Property(list, granular=True)
+
+
+def measure_assignment(model: Model, name: str, create: Callable[[int], list], size: int, repeat: int) -> float:
+    """Returns the fastest of repeat assignments in seconds, creating and freeing the lists isn't measured."""
+    values = [create(size) for _ in range(repeat)]
+    durations = []
+    for value in values:
+        start = time.perf_counter()
+        setattr(model, name, value)
+        durations.append(time.perf_counter() - start)
+    setattr(model, name, [])
+    return min(durations)
+
+
+def run_benchmark(sizes: List[int], repeat: int) -> Dict[str, Dict[int, float]]:
+    model = Model()
+    cases = {
+        "list (copied)": ("items", lambda size: list(range(size))),
+        "notified_list": ("items", lambda size: notified_list(range(size))),
+        "notified_list, granular": ("rows", lambda size: notified_list(range(size))),
+    }
+    return {case: {size: measure_assignment(model, name, create, size, repeat) for size in sizes} for case, (name, create) in cases.items()}
+
+
+def main() -> None:
+    argparser = argparse.ArgumentParser()
+    argparser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="List sizes to assign")
+    argparser.add_argument("--repeat", type=int, default=5, help="Number of assignments per size (best one is reported)")
+    args = argparser.parse_args()
+
+    results = run_benchmark(args.sizes, args.repeat)
+
+    print(f"{'':>24}" + "".join(f"{size:>14,}" for size in args.sizes))
+    for case, durations in results.items():
+        print(f"{case:>24}" + "".join(f"{durations[size] * 1e6:>12.1f}us" for size in args.sizes))
+
+
+if __name__ == "__main__":
+    main()
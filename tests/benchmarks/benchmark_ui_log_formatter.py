@@ -0,0 +1,47 @@
+# Copyright (C) 2024 twyleg
+"""Compares the UiLogFormatter header rendering with the former record copy path.
+
+Usage: python tests/benchmarks/benchmark_ui_log_formatter.py [--records N]
+"""
+import argparse
+import logging
+import timeit
+from copy import copy
+
+from simple_python_app_qt.log_formatter import UiLogFormatter
+
+
+FORMAT = "[%(asctime)s.%(msecs)03d][%(levelname)s][%(name)s]: %(message)s"
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def format_header_with_record_copy(formatter: logging.Formatter, record: logging.LogRecord) -> str:
+    header_record = copy(record)
+    header_record.msg = ""
+    header_record.args = None
+    return formatter.format(header_record)
+
+
+def main() -> None:
+    argparser = argparse.ArgumentParser()
+    argparser.add_argument("--records", type=int, default=200000, help="Number of formatted records per run")
+    argparser.add_argument("--repeat", type=int, default=5, help="Number of runs (best run is reported)")
+    args = argparser.parse_args()
+
+    formatter = logging.Formatter(FORMAT, DATE_FORMAT)
+    ui_formatter = UiLogFormatter(formatter)
+    record = logging.LogRecord("main", logging.INFO, __file__, 1, "Counter: %s", (42,), None)
+
+    assert ui_formatter.format_header(record) == format_header_with_record_copy(formatter, record)
+
+    results = {
+        "record copy": min(timeit.repeat(lambda: format_header_with_record_copy(formatter, record), number=args.records, repeat=args.repeat)),
+        "UiLogFormatter": min(timeit.repeat(lambda: ui_formatter.format_header(record), number=args.records, repeat=args.repeat)),
+    }
+
+    for name, duration in results.items():
+        print(f"{name:>16}: {duration / args.records * 1e9:8.1f} ns/record ({args.records / duration:,.0f} records/s)")
+
+
+if __name__ == "__main__":
+    main()
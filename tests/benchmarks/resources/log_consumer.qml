@@ -0,0 +1,35 @@
+// Copyright (C) 2024 twyleg
+import QtQuick 2.15
+import QtQuick.Window 2.15
+import QtQuick.Controls 2.15
+import SimplePythonAppQt 1.0
+
+ApplicationWindow {
+    id: window
+
+    width: 800
+    height: 480
+    visible: true
+    title: qsTr("Log pipeline benchmark")
+
+    property int receivedLines: 0
+
+    LogConsole {
+        anchors.fill: parent
+        logModel: log_model
+    }
+
+    Connections {
+        target: log_model
+
+        function onLogLineAdded(levelno, header, msg) {
+            window.receivedLines += 1
+        }
+
+        function onLogLinesAdded(lines) {
+            window.receivedLines += lines.length
+        }
+    }
+
+    Component.onCompleted: log_model.requestPrebuffer()
+}
@@ -2,7 +2,12 @@
 import pytest
 import shutil
 import logging
+import threading
+import time
 from pathlib import Path
+from typing import Any, List
+
+from PySide6.QtGui import QGuiApplication
 
 
 FILE_DIR = Path(__file__).parent
@@ -14,6 +19,45 @@ def print_tmp_path(tmp_path):
     return None
 
 
+@pytest.fixture
+def qt_app():
+    app = QGuiApplication.instance()
+    if not app:
+        app = QGuiApplication(["qt_app", "-platform", "offscreen"])
+    return app
+
+
+def process_events_until(qt_app, predicate, timeout_s: float = 10.0) -> None:
+    """Processes events of qt_app until predicate() is true or timeout_s has passed."""
+    deadline = time.monotonic() + timeout_s
+    while not predicate() and time.monotonic() < deadline:
+        qt_app.processEvents()
+        time.sleep(0.001)
+
+
+class ListHandler(logging.Handler):
+    """Keeps the handled records and their formatted messages, emit() waits for block if given."""
+
+    def __init__(self, block: threading.Event | None = None) -> None:
+        super().__init__()
+        self.block = block
+        self.records: List[logging.LogRecord] = []
+        self.messages: List[str] = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        if self.block:
+            self.block.wait()
+        self.records.append(record)
+        self.messages.append(self.format(record))
+
+
+def create_record(msg: str = "msg", args: Any = None, name: str = "main", levelno: int = logging.INFO, created: float | None = None) -> logging.LogRecord:
+    record = logging.LogRecord(name, levelno, __file__, 42, msg, args, None)
+    if created is not None:
+        record.created = created
+    return record
+
+
 @pytest.fixture
 def project_dir(tmp_path, monkeypatch):
     monkeypatch.chdir(tmp_path)
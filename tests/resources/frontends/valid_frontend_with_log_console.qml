@@ -0,0 +1,23 @@
+// Copyright (C) 2024 twyleg
+import QtQuick 2.15
+import QtQuick.Window 2.15
+import QtQuick.Controls 2.15
+import SimplePythonAppQt 1.0
+
+ApplicationWindow {
+    id: window
+
+    width: 800
+    height: 480
+    visible: true
+    title: qsTr("Frontend")
+
+    color: "black"
+
+    LogConsole {
+        anchors.fill: parent
+        logModel: log_model
+    }
+
+    Component.onCompleted: Qt.exit(0)
+}
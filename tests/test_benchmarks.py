@@ -0,0 +1,51 @@
+# Copyright (C) 2024 twyleg
+# fmt: off
+import pytest
+
+from benchmarks.benchmark_log_pipeline import Scenario, find_regressions, run_reference, run_scenario
+from benchmarks.benchmark_property_assignment import run_benchmark
+from fixtures import qt_app
+
+#
+# General naming convention for unit tests:
+#               test_INITIALSTATE_ACTION_EXPECTATION
+#
+
+
+class TestLogPipelineBenchmark:
+
+    @pytest.mark.parametrize("batch_interval_ms, level, threads, expected_lines", [
+        (None, "INFO", 0, 100),
+        (0, "INFO", 2, 100),
+        (16, "DEBUG", 1, 0),
+    ])
+    def test_Scenario_Run_AllLinesDeliveredAndMetricsReported(self, qt_app, batch_interval_ms, level, threads, expected_lines):
+        result = run_scenario(Scenario(batch_interval_ms=batch_interval_ms, level=level, threads=threads, records=100))
+
+        assert result.delivered_lines == expected_lines
+        assert result.records_per_s > 0
+        assert result.emit_latency_p50_us <= result.emit_latency_p99_us
+
+    def test_ResultsBelowBaseline_FindRegressions_RegressionReported(self, qt_app):
+        result = run_scenario(Scenario(batch_interval_ms=None, level="INFO", threads=0, records=10))
+        baseline = {"reference_records_per_s": 1000.0, "results": [{"name": result.name, "records_per_s": result.records_per_s}]}
+
+        assert find_regressions([result], 1000.0, baseline, max_regression=0.2) == []
+        assert len(find_regressions([result], 2000.0, baseline, max_regression=0.2)) == 1
+        assert find_regressions([result], 2000.0, {"reference_records_per_s": 1000.0, "results": []}, max_regression=0.2) == []
+
+    def test_MachineTwiceAsFast_FindRegressions_NoRegressionReported(self, qt_app):
+        reference_records_per_s = run_reference(10)
+        result = run_scenario(Scenario(batch_interval_ms=None, level="INFO", threads=0, records=10))
+        baseline = {"reference_records_per_s": reference_records_per_s, "results": [{"name": result.name, "records_per_s": result.records_per_s / 2}]}
+
+        assert find_regressions([result], reference_records_per_s * 2, baseline, max_regression=0.2) == []
+
+
+class TestPropertyAssignmentBenchmark:
+
+    def test_Sizes_Run_DurationReportedPerCaseAndSize(self, qt_app):
+        results = run_benchmark([10, 100], repeat=2)
+
+        assert set(results) == {"list (copied)", "notified_list", "notified_list, granular"}
+        assert all(set(durations) == {10, 100} and min(durations.values()) > 0 for durations in results.values())
@@ -0,0 +1,100 @@
+# Copyright (C) 2024 twyleg
+# fmt: off
+import gzip
+import json
+import logging
+import threading
+
+import pytest
+
+from fixtures import process_events_until, qt_app
+from simple_python_app_qt.log_export import LogExporter
+from simple_python_app_qt.log_formatter import UiLogFormatter
+from simple_python_app_qt.qml_application import LogModel
+
+#
+# General naming convention for unit tests:
+#               test_INITIALSTATE_ACTION_EXPECTATION
+#
+
+
+def create_log_model(line_count: int) -> LogModel:
+    log_model = LogModel()
+    ui_formatter = UiLogFormatter(logging.Formatter("%(levelname)s [%(name)s]: %(message)s"))
+    for i in range(line_count):
+        log_model.add_log_entry(ui_formatter.create_entry(logging.LogRecord("main", logging.WARNING, __file__, 1, "line %d", (i,), None)))
+    return log_model
+
+
+def export(qt_app, log_model: LogModel, path):
+    finished = []
+    log_model.exportFinished.connect(lambda success, exported_path: finished.append((success, exported_path)))
+
+    assert log_model.exportLog(str(path))
+    process_events_until(qt_app, lambda: finished)
+
+    assert not log_model.exporting
+    return finished[0]
+
+
+class TestLogExport:
+
+    @pytest.mark.parametrize("filename, open_file", [
+        ("export.log", open),
+        ("export.log.gz", gzip.open),
+    ])
+    def test_LogModelWithHistory_ExportLogAsText_LinesWrittenAsDisplayed(self, qt_app, tmp_path, filename, open_file):
+        log_model = create_log_model(1500)
+
+        assert export(qt_app, log_model, tmp_path / filename) == (True, str(tmp_path / filename))
+
+        with open_file(tmp_path / filename, "rt", encoding="utf-8") as f:
+            lines = f.read().splitlines()
+        assert lines == [f"WARNING [main]: line {i}" for i in range(1500)]
+        assert not (tmp_path / (filename + ".part")).exists()
+
+    def test_LogModelWithHistory_ExportLogAsJsonLines_OneObjectPerLine(self, qt_app, tmp_path):
+        log_model = create_log_model(3)
+
+        export(qt_app, log_model, tmp_path / "export.jsonl")
+
+        records = [json.loads(line) for line in (tmp_path / "export.jsonl").read_text(encoding="utf-8").splitlines()]
+        assert [record["message"] for record in records] == ["line 0", "line 1", "line 2"]
+        assert records[0]["levelname"] == "WARNING" and records[0]["name"] == "main" and records[0]["sequence"] == 0
+
+    @pytest.mark.parametrize("filename", ["export.log", "export.jsonl"])
+    def test_MessageWithLoneSurrogate_ExportLog_EscapedAndExportFinished(self, qt_app, tmp_path, filename):
+        log_model = LogModel()
+        ui_formatter = UiLogFormatter(logging.Formatter("%(message)s"))
+        undecodable_name = b"report-\xff.txt".decode("utf-8", "surrogateescape")
+        log_model.add_log_entry(ui_formatter.create_entry(logging.LogRecord("main", logging.INFO, __file__, 1, "Opened %s", (undecodable_name,), None)))
+
+        assert export(qt_app, log_model, tmp_path / filename) == (True, str(tmp_path / filename))
+
+        assert "Opened report-\\udcff.txt" in (tmp_path / filename).read_text(encoding="utf-8")
+
+    def test_SnapshotExport_AddLinesDuringExport_OnlySnapshotExported(self, qt_app, tmp_path):
+        log_model = create_log_model(10)
+        unblock = threading.Event()
+        format_text = LogExporter.format_text
+
+        def blocking_format_text(entry):
+            unblock.wait()
+            return format_text(entry)
+
+        log_model.exporter.format_text = blocking_format_text  # type: ignore[method-assign]
+        assert log_model.exportLog(str(tmp_path / "export.log"))
+        assert not log_model.exportLog(str(tmp_path / "other.log"))
+        log_model.add_log_line(logging.INFO, "", "added during export")
+        unblock.set()
+        log_model.exporter.wait()
+
+        assert len((tmp_path / "export.log").read_text().splitlines()) == 10
+
+    def test_RunningExport_CancelExport_NoFileLeftBehind(self, qt_app, tmp_path):
+        log_model = create_log_model(10)
+        exporter = log_model.exporter
+        exporter.format_text = lambda entry: (exporter.cancel(), "")[1]  # type: ignore[method-assign]
+
+        assert export(qt_app, log_model, tmp_path / "export.log") == (False, str(tmp_path / "export.log"))
+        assert list(tmp_path.iterdir()) == []
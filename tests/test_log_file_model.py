@@ -0,0 +1,82 @@
+# Copyright (C) 2024 twyleg
+# fmt: off
+import logging
+
+import pytest
+from PySide6.QtCore import QCoreApplication
+
+from fixtures import qt_app
+from simple_python_app_qt.log_file_model import LogFileModel
+from simple_python_app_qt.log_list_model import LogListModel
+
+#
+# General naming convention for unit tests:
+#               test_INITIALSTATE_ACTION_EXPECTATION
+#
+
+
+LOG_LINES = [
+    "[2024-05-01 10:00:00.001][INFO][main]: Started",
+    "[2024-05-01 10:00:01.002][ERROR][main.sub]: Failed: ✗",
+    "Traceback (most recent call last):",
+    "[2024-05-01 10:00:02.003][WARNING][qml]: Binding loop",
+]
+
+
+@pytest.fixture
+def log_file_model(qt_app):
+    model = LogFileModel()
+    yield model
+    model.close()
+
+
+def open_and_index(log_file_model: LogFileModel, path) -> None:
+    assert log_file_model.open(str(path))
+    assert log_file_model.wait_for_index(timeout=10.0)
+    QCoreApplication.processEvents()
+
+
+def rows(log_file_model: LogFileModel):
+    return [
+        tuple(log_file_model.data(log_file_model.index(row), role) for role in (LogListModel.LevelnoRole, LogListModel.HeaderRole, LogListModel.MessageRole))
+        for row in range(log_file_model.rowCount())
+    ]
+
+
+class TestLogFileModel:
+
+    @pytest.mark.parametrize("trailing_newline", [True, False])
+    def test_LogFile_Open_LinesIndexedAndSplitIntoLevelHeaderAndMessage(self, log_file_model, tmp_path, trailing_newline):
+        log_filepath = tmp_path / "default.log"
+        log_filepath.write_text("\n".join(LOG_LINES) + ("\n" if trailing_newline else ""), encoding="utf-8")
+
+        open_and_index(log_file_model, log_filepath)
+
+        assert rows(log_file_model) == [
+            (logging.INFO, "[2024-05-01 10:00:00.001][INFO][main]: ", "Started"),
+            (logging.ERROR, "[2024-05-01 10:00:01.002][ERROR][main.sub]: ", "Failed: ✗"),
+            (logging.NOTSET, "", "Traceback (most recent call last):"),
+            (logging.WARNING, "[2024-05-01 10:00:02.003][WARNING][qml]: ", "Binding loop"),
+        ]
+        assert not log_file_model.indexing
+        assert log_file_model.indexProgress == 1.0
+
+    def test_LogFileLargerThanIndexChunk_Open_AllLinesIndexedAcrossChunks(self, log_file_model, tmp_path, monkeypatch):
+        monkeypatch.setattr(LogFileModel, "INDEX_CHUNK_SIZE", 64)
+        log_filepath = tmp_path / "default.log"
+        log_filepath.write_text("".join(f"line {i}\n" for i in range(1000)))
+
+        open_and_index(log_file_model, log_filepath)
+
+        assert log_file_model.rowCount() == 1000
+        assert log_file_model.data(log_file_model.index(999), LogListModel.MessageRole) == "line 999"
+
+    def test_OpenLogFile_OpenNonExistingFile_ModelEmptyAndErrorLogged(self, log_file_model, tmp_path, caplog):
+        log_filepath = tmp_path / "default.log"
+        log_filepath.write_text("line\n")
+        open_and_index(log_file_model, log_filepath)
+
+        assert not log_file_model.open(str(tmp_path / "does_not_exist.log"))
+
+        assert log_file_model.rowCount() == 0
+        assert "Unable to open log file" in caplog.text
@@ -0,0 +1,60 @@
+# Copyright (C) 2024 twyleg
+# fmt: off
+import logging
+
+import pytest
+
+from fixtures import create_record
+from simple_python_app_qt.log_filter import LoggerLevelFilter
+from simple_python_app_qt.qml_application import UiLogHandler
+
+#
+# General naming convention for unit tests:
+#               test_INITIALSTATE_ACTION_EXPECTATION
+#
+
+
+class TestLoggerLevelFilter:
+
+    def test_EmptyTable_Filter_AllRecordsPass(self):
+        logger_level_filter = LoggerLevelFilter()
+        assert logger_level_filter.filter(create_record(name="foo", levelno=logging.DEBUG))
+
+    @pytest.mark.parametrize("name, levelno, expected", [
+        ("foo", logging.INFO, False),
+        ("foo", logging.WARNING, True),
+        ("foo.bar", logging.WARNING, False),
+        ("foo.bar", logging.ERROR, True),
+        ("foo.bar.baz", logging.WARNING, False),
+        ("foobar", logging.DEBUG, False),
+        ("foobar", logging.INFO, True),
+    ])
+    def test_PrefixTable_Filter_LongestMatchingPrefixApplied(self, name, levelno, expected):
+        logger_level_filter = LoggerLevelFilter({"": "INFO", "foo": "WARNING", "foo.bar": logging.ERROR})
+        assert logger_level_filter.filter(create_record(name=name, levelno=levelno)) == expected
+
+    def test_FilterWithResolvedLevels_SetLevel_NewLevelApplied(self):
+        logger_level_filter = LoggerLevelFilter({"foo": "WARNING"})
+        assert not logger_level_filter.filter(create_record(name="foo.bar", levelno=logging.INFO))
+
+        logger_level_filter.set_level("foo.bar", "DEBUG")
+        assert logger_level_filter.filter(create_record(name="foo.bar", levelno=logging.INFO))
+
+        logger_level_filter.remove_level("foo.bar")
+        assert not logger_level_filter.filter(create_record(name="foo.bar", levelno=logging.INFO))
+
+    def test_InvalidLevel_SetLevel_ValueErrorRaised(self):
+        with pytest.raises(ValueError):
+            LoggerLevelFilter().set_level("foo", "NOT_A_LEVEL")
+
+
+class TestUiLogHandlerLoggerLevels:
+
+    def test_MutedLogger_Handle_RecordNotForwardedToLogModel(self):
+        handler = UiLogHandler(logger_levels={"noisy": "ERROR"})
+
+        handler.handle(create_record(name="noisy.sub", levelno=logging.WARNING))
+        handler.handle(create_record(name="quiet", levelno=logging.WARNING))
+
+        assert [entry.name for entry in handler.log_model.prebuffer_entries] == ["quiet"]
+        assert handler.log_model.loggerLevels == {"noisy": "ERROR"}
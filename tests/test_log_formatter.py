@@ -0,0 +1,108 @@
+# Copyright (C) 2024 twyleg
+# fmt: off
+import logging
+import sys
+from copy import copy
+
+import pytest
+
+from simple_python_app_qt.log_formatter import UiLogFormatter
+
+#
+# General naming convention for unit tests:
+#               test_INITIALSTATE_ACTION_EXPECTATION
+#
+
+
+def create_record(msg="Counter: %s", args=(42,), exc_info=None) -> logging.LogRecord:
+    return logging.LogRecord("main.sub", logging.WARNING, __file__, 42, msg, args, exc_info)
+
+
+def format_header_with_record_copy(formatter: logging.Formatter, record: logging.LogRecord) -> str:
+    header_record = copy(record)
+    header_record.msg = ""
+    header_record.args = None
+    return formatter.format(header_record)
+
+
+class TestUiLogFormatter:
+
+    @pytest.mark.parametrize("formatter", [
+        logging.Formatter("[%(asctime)s.%(msecs)03d][%(levelname)s][%(name)s]: %(message)s", "%Y-%m-%d %H:%M:%S"),
+        logging.Formatter("[%(asctime)s][%(levelname)s][%(name)s]: %(message)s"),
+        logging.Formatter("{asctime} {levelname} {name}: {message}", style="{"),
+        logging.Formatter("$levelname $name: $message", style="$"),
+        logging.Formatter("%(levelname)s %(custom)s: %(message)s", defaults={"custom": "default"}),
+    ])
+    def test_Formatter_FormatHeader_SameHeaderAsFormattingRecordCopy(self, formatter):
+        ui_formatter = UiLogFormatter(formatter)
+        record = create_record()
+
+        assert ui_formatter.format_header(record) == format_header_with_record_copy(formatter, record)
+        assert ui_formatter.render_header is not None
+
+    def test_CustomFormatter_FormatHeader_FallbackToRecordCopy(self):
+        class CustomFormatter(logging.Formatter):
+            def format(self, record):
+                return "custom: " + super().format(record)
+
+        ui_formatter = UiLogFormatter(CustomFormatter("%(levelname)s: %(message)s"))
+        record = create_record()
+
+        assert ui_formatter.render_header is None
+        assert ui_formatter.format_header(record) == "custom: WARNING: "
+        assert record.getMessage() == "Counter: 42"
+
+    def test_RecordWithException_FormatMessage_TracebackAppendedToMessage(self):
+        try:
+            raise RuntimeError("boom")
+        except RuntimeError:
+            record = create_record(msg="failed", args=None, exc_info=sys.exc_info())
+        ui_formatter = UiLogFormatter(logging.Formatter("%(levelname)s: %(message)s"))
+
+        msg = ui_formatter.format_message(record)
+
+        assert msg.startswith("failed\nTraceback")
+        assert "RuntimeError: boom" in msg
+        assert ui_formatter.format_header(record) == "WARNING: "
+
+    def test_Record_CreateEntry_MessageRenderedOnFirstAccessOnly(self):
+        class CountingArg:
+            def __init__(self):
+                self.repr_calls = 0
+
+            def __repr__(self):
+                self.repr_calls += 1
+                return "CountingArg"
+
+        formatter = logging.Formatter("[%(asctime)s.%(msecs)03d][%(levelname)s][%(name)s][%(threadName)s]: %(message)s", "%Y-%m-%d %H:%M:%S")
+        ui_formatter = UiLogFormatter(formatter)
+        arg = CountingArg()
+        record = create_record(msg="value=%r", args=(arg,))
+
+        entry = ui_formatter.create_entry(record)
+        assert arg.repr_calls == 0
+
+        assert entry.message == "value=CountingArg"
+        assert entry.header == format_header_with_record_copy(formatter, record)
+        assert arg.repr_calls == 1
+
+    def test_CustomFormatter_CreateEntry_EntryRenderedEagerly(self):
+        class CustomFormatter(logging.Formatter):
+            def format(self, record):
+                return "custom: " + super().format(record)
+
+        ui_formatter = UiLogFormatter(CustomFormatter("%(levelname)s: %(message)s"))
+
+        entry = ui_formatter.create_entry(create_record())
+
+        assert entry.formatter is None
+        assert entry.render() == ("custom: WARNING: ", "Counter: 42")
+
+    def test_EntryWithInvalidArgs_Render_FormattingErrorRendered(self):
+        ui_formatter = UiLogFormatter(logging.Formatter("%(levelname)s: %(message)s"))
+
+        entry = ui_formatter.create_entry(create_record(msg="%d", args=("no number",)))
+
+        assert entry.header == "WARNING: "
+        assert entry.message.startswith("<message formatting failed")
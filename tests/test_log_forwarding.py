@@ -0,0 +1,168 @@
+# Copyright (C) 2024 twyleg
+# fmt: off
+import logging
+import multiprocessing
+import os
+import socket
+
+import pytest
+
+from fixtures import ListHandler, create_record, process_events_until, qt_app
+from simple_python_app_qt.log_forwarding import FRAME_HEADER, LogForwardingHandler, LogForwardingServer, init_log_forwarding
+
+#
+# General naming convention for unit tests:
+#               test_INITIALSTATE_ACTION_EXPECTATION
+#
+
+
+def log_in_worker(i: int) -> int:
+    logging.getLogger("worker").info("task %d", i)
+    return os.getpid()
+
+
+@pytest.fixture
+def forwarding_server(qt_app):
+    sink = ListHandler()
+    server = LogForwardingServer(handler=sink)
+    server.listen()
+    yield server, sink
+    server.close()
+
+
+class TestLogForwarding:
+
+    def test_ListeningServer_SendBatchFromHandler_RecordsTaggedWithSourceProcess(self, qt_app, forwarding_server):
+        server, sink = forwarding_server
+        handler = LogForwardingHandler(server.address, batch_size=10)
+        logger = logging.getLogger("forwarding_test")
+        logger.handlers = [handler]
+        logger.propagate = False
+        logger.setLevel(logging.DEBUG)
+
+        for i in range(25):
+            logger.info("line %d", i)
+        process_events_until(qt_app, lambda: len(sink.records) == 20)
+        assert len(sink.records) == 20
+
+        handler.close()
+        logger.handlers = []
+        process_events_until(qt_app, lambda: len(sink.records) == 25)
+
+        process_name = multiprocessing.current_process().name
+        assert [record.getMessage() for record in sink.records] == [f"[{process_name}:{os.getpid()}] line {i}" for i in range(25)]
+        assert sink.records[0].name == "forwarding_test" and sink.records[0].levelno == logging.INFO
+
+    def test_BufferedRecord_FlushIntervalElapsed_RecordSentWithoutFurtherLogging(self, qt_app, forwarding_server):
+        server, sink = forwarding_server
+        handler = LogForwardingHandler(server.address, flush_interval_s=0.01)
+
+        handler.handle(create_record("idle"))
+        process_events_until(qt_app, lambda: sink.records)
+        handler.close()
+
+        assert len(sink.records) == 1
+
+    def test_ServerUnreachable_SendBatch_DroppedRecordsReportedOnceReachable(self, qt_app, forwarding_server, tmp_path):
+        server, sink = forwarding_server
+        handler = LogForwardingHandler(str(tmp_path / "missing.sock"), batch_size=1)
+
+        handler.handle(create_record("lost"))
+        handler.address = server.address
+        handler.handle(create_record("delivered"))
+        handler.close()
+        process_events_until(qt_app, lambda: len(sink.records) == 2)
+
+        assert "1 log records dropped" in sink.records[0].getMessage()
+        assert sink.records[1].getMessage().endswith("delivered")
+
+    def test_ListeningServer_SendRecordWithLoneSurrogate_RecordReceivedUnchanged(self, qt_app, forwarding_server):
+        server, sink = forwarding_server
+        handler = LogForwardingHandler(server.address, batch_size=1)
+        undecodable_name = b"report-\xff.txt".decode("utf-8", "surrogateescape")
+
+        handler.handle(create_record("Opened %s", (undecodable_name,)))
+        handler.close()
+        process_events_until(qt_app, lambda: sink.records)
+
+        assert sink.records[0].getMessage().endswith(f"Opened {undecodable_name}")
+
+    def test_UnserializableRecordField_SendBatch_DroppedAndReportedWithNextBatch(self, qt_app, forwarding_server):
+        server, sink = forwarding_server
+        handler = LogForwardingHandler(server.address, batch_size=1)
+        unserializable = create_record("lost")
+        unserializable.threadName = object()  # type: ignore[assignment]
+
+        handler.handle(unserializable)
+        handler.handle(create_record("delivered"))
+        handler.close()
+        process_events_until(qt_app, lambda: len(sink.records) == 2)
+
+        assert "1 log records dropped" in sink.records[0].getMessage()
+        assert sink.records[1].getMessage().endswith("delivered")
+
+    @pytest.mark.skipif(os.name == "nt", reason="Unix domain socket")
+    def test_ListeningServer_SendMalformedFrame_ConnectionClosed(self, qt_app, forwarding_server):
+        server, sink = forwarding_server
+        connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        connection.connect(server.address)
+        connection.sendall(FRAME_HEADER.pack(3) + b"{{{")
+
+        connection.setblocking(False)
+
+        def closed_by_server() -> bool:
+            try:
+                return connection.recv(1) == b""
+            except BlockingIOError:
+                return False
+
+        process_events_until(qt_app, closed_by_server)
+        connection.close()
+
+        assert not server.connections
+        assert not sink.records
+
+    def test_PoolWithLogForwarding_LogInWorkers_RecordsReceivedFromEachWorker(self, qt_app, forwarding_server):
+        server, sink = forwarding_server
+        context = multiprocessing.get_context("spawn")
+
+        root = logging.getLogger()
+        root_level = root.level
+        root.setLevel(logging.INFO)
+        try:
+            pool = context.Pool(2, initializer=init_log_forwarding, initargs=server.initargs())
+        finally:
+            root.setLevel(root_level)
+        async_result = pool.map_async(log_in_worker, range(8))
+        process_events_until(qt_app, async_result.ready, timeout_s=60.0)
+        worker_pids = set(async_result.get())
+        # Workers send their remaining records when exiting, terminate() would kill them instead
+        pool.close()
+        pool.join()
+        process_events_until(qt_app, lambda: len(sink.records) == 8)
+
+        assert sorted(record.getMessage().partition("] ")[2] for record in sink.records) == sorted(f"task {i}" for i in range(8))
+        assert {record.process for record in sink.records} == worker_pids
+
+    def test_NonPropagatingLoggerWithHandler_InitLogForwarding_RecordsForwardedInsteadOfHandledLocally(self, qt_app, forwarding_server):
+        server, sink = forwarding_server
+        local_sink = ListHandler()
+        logger = logging.getLogger("forwarding_test.main")
+        logger.handlers = [local_sink]
+        logger.propagate = False
+        root = logging.getLogger()
+        loggers = [root, *(logger for logger in logging.Logger.manager.loggerDict.values() if isinstance(logger, logging.Logger))]
+        saved_state = [(logger, list(logger.handlers), logger.propagate, logger.level) for logger in loggers]
+        try:
+            handler = init_log_forwarding(server.address, logging.DEBUG)
+            logger.debug("forwarded")
+            handler.close()
+            assert not logger.handlers
+        finally:
+            for saved_logger, handlers, propagate, level in saved_state:
+                saved_logger.handlers, saved_logger.propagate = handlers, propagate
+                saved_logger.setLevel(level)
+        process_events_until(qt_app, lambda: len(sink.records) == 1)
+
+        assert not local_sink.records
+        assert sink.records[0].getMessage().endswith("forwarded")
@@ -0,0 +1,157 @@
+# Copyright (C) 2024 twyleg
+# fmt: off
+import gc
+import logging
+import threading
+import tracemalloc
+import weakref
+
+import pytest
+
+from fixtures import qt_app
+from simple_python_app_qt.log_formatter import UiLogEntry, UiLogFormatter
+from simple_python_app_qt.log_history import CompactLogSegment, LogHistory, compaction_executor
+from simple_python_app_qt.log_list_model import LogListModel
+from simple_python_app_qt.log_search import SegmentSearchIndex
+
+#
+# General naming convention for unit tests:
+#               test_INITIALSTATE_ACTION_EXPECTATION
+#
+
+
+SEGMENT_SIZE = LogHistory.SEGMENT_SIZE
+
+
+def create_entries(ui_formatter: UiLogFormatter, count: int, first_sequence: int = 0):
+    entries = []
+    for i in range(count):
+        record = logging.LogRecord(f"main.sub{i % 3}", logging.INFO + i % 2, __file__, 42, "Item %d: %s ✓", (i, "done"), None)
+        entry = ui_formatter.create_entry(record)
+        entry.sequence = first_sequence + i
+        entries.append(entry)
+    return entries
+
+
+def fill_history(history: LogHistory, entries) -> None:
+    for entry in entries:
+        history.append(entry.levelno, entry)
+    history.wait_for_compaction()
+
+
+class TestLogHistory:
+
+    @pytest.mark.parametrize("formatter", [
+        logging.Formatter("[%(asctime)s.%(msecs)03d][%(levelname)s][%(name)s]: %(message)s", "%Y-%m-%d %H:%M:%S"),
+        logging.Formatter("[%(asctime)s][%(threadName)s][%(levelno)d]: %(message)s"),
+    ])
+    def test_HistoryWithCompactedSegments_GetEntries_SameRenderingAsOriginalEntries(self, formatter):
+        ui_formatter = UiLogFormatter(formatter)
+        entries = create_entries(ui_formatter, 2 * SEGMENT_SIZE + 10)
+        expected = [(entry.levelno, entry.name, entry.sequence, entry.render()) for entry in entries]
+        history = LogHistory(len(entries))
+
+        fill_history(history, entries)
+
+        assert len(history.segments) == 2
+        assert [(entry.levelno, entry.name, entry.sequence, entry.render()) for entry in history] == expected
+        assert history[-1] is entries[-1]
+
+    def test_PreRenderedEntries_Compact_HeaderAndMessageStored(self):
+        history = LogHistory(SEGMENT_SIZE)
+
+        fill_history(history, [UiLogEntry(logging.WARNING, f"header {i}: ", f"msg {i}") for i in range(SEGMENT_SIZE)])
+
+        assert history.segments[0].header_offsets is not None
+        assert history[7].render() == ("header 7: ", "msg 7")
+
+    def test_FullHistory_DiscardOldestAcrossSegments_RemainingEntriesKeptInOrder(self):
+        ui_formatter = UiLogFormatter(logging.Formatter("%(levelname)s: %(message)s"))
+        history = LogHistory(3 * SEGMENT_SIZE)
+        fill_history(history, create_entries(ui_formatter, 2 * SEGMENT_SIZE + 5))
+
+        history.discard_oldest(SEGMENT_SIZE + 3)
+
+        assert len(history) == SEGMENT_SIZE + 2
+        assert len(history.segments) == 1
+        assert [entry.sequence for entry in history] == list(range(SEGMENT_SIZE + 3, 2 * SEGMENT_SIZE + 5))
+
+        history.discard_oldest(SEGMENT_SIZE)
+
+        assert [entry.sequence for entry in history] == [2 * SEGMENT_SIZE + 3, 2 * SEGMENT_SIZE + 4]
+        assert history.segments == []
+
+    def test_CompactedCoalescedEntry_EntryChanged_RepeatCountUpdatedInColumn(self, qt_app):
+        ui_formatter = UiLogFormatter(logging.Formatter("%(levelname)s: %(message)s"))
+        list_model = LogListModel(2 * SEGMENT_SIZE)
+        entries = create_entries(ui_formatter, SEGMENT_SIZE + 1)
+        list_model.append_entries(entries)
+        list_model.history.wait_for_compaction()
+        changed_rows = []
+        list_model.dataChanged.connect(lambda top_left, bottom_right, roles: changed_rows.append(top_left.row()))
+
+        entries[5].repeat_count = 3
+        list_model.entry_changed(entries[5])
+
+        assert changed_rows == [5]
+        assert list_model.data(list_model.index(5), LogListModel.RepeatCountRole) == 3
+
+    def test_SegmentWaitingForCompaction_EntryChanged_RepeatCountKeptInCompactedSegment(self, qt_app):
+        ui_formatter = UiLogFormatter(logging.Formatter("%(levelname)s: %(message)s"))
+        list_model = LogListModel(2 * SEGMENT_SIZE)
+        entries = create_entries(ui_formatter, SEGMENT_SIZE)
+        compaction_blocked = threading.Event()
+        compaction_executor.submit(compaction_blocked.wait)
+
+        try:
+            list_model.append_entries(entries)
+            assert not isinstance(list_model.history.segments[0], CompactLogSegment)
+            entries[5].repeat_count = 3
+            list_model.entry_changed(entries[5])
+        finally:
+            compaction_blocked.set()
+        list_model.history.wait_for_compaction()
+
+        assert isinstance(list_model.history.segments[0], CompactLogSegment)
+        assert list_model.data(list_model.index(5), LogListModel.RepeatCountRole) == 3
+
+    @pytest.mark.parametrize("search_index, min_ratio", [
+        (False, 10),
+        # The trigram postings of the search index take about twice the memory of the compacted lines
+        (True, 3),
+    ])
+    def test_ManyLines_Compact_MemoryPerLineFractionOfLineTuples(self, search_index, min_ratio):
+        ui_formatter = UiLogFormatter(logging.Formatter("[%(asctime)s.%(msecs)03d][%(levelname)s][%(name)s]: %(message)s", "%Y-%m-%d %H:%M:%S"))
+        count = 16 * SEGMENT_SIZE
+
+        def traced_bytes() -> int:
+            ui_formatter.render.cache_clear()
+            gc.collect()
+            return tracemalloc.get_traced_memory()[0]
+
+        tracemalloc.start()
+        start_bytes = traced_bytes()
+        lines = [(entry.levelno, *entry.render()) for entry in create_entries(ui_formatter, count)]
+        tuple_bytes = traced_bytes() - start_bytes
+        del lines
+        start_bytes = traced_bytes()
+        history = LogHistory(count)
+        if search_index:
+            history.set_segment_indexer(SegmentSearchIndex)
+        fill_history(history, create_entries(ui_formatter, count))
+        history_bytes = traced_bytes() - start_bytes
+        tracemalloc.stop()
+
+        assert history_bytes * min_ratio < tuple_bytes
+
+    def test_ReadSegment_DiscardOldest_EvictedSegmentReleased(self):
+        ui_formatter = UiLogFormatter(logging.Formatter("%(levelname)s: %(message)s"))
+        history = LogHistory(2 * SEGMENT_SIZE)
+        fill_history(history, create_entries(ui_formatter, 2 * SEGMENT_SIZE))
+        evicted_segment = weakref.ref(history.segments[0])
+        assert history[3].render()[1] == "Item 3: done ✓"
+
+        history.discard_oldest(SEGMENT_SIZE)
+        gc.collect()
+
+        assert evicted_segment() is None
@@ -0,0 +1,313 @@
+# Copyright (C) 2024 twyleg
+# fmt: off
+import logging
+import threading
+import time
+from typing import List, Tuple
+
+import pytest
+
+from fixtures import create_record, process_events_until, qt_app
+from simple_python_app_qt.log_buffer import LogRingBuffer
+from simple_python_app_qt.log_formatter import UiLogEntry
+from simple_python_app_qt.log_list_model import LogListModel
+from simple_python_app_qt.qml_application import LogModel, UiLogHandler
+
+#
+# General naming convention for unit tests:
+#               test_INITIALSTATE_ACTION_EXPECTATION
+#
+
+
+def collect_log_lines(log_model: LogModel) -> List[Tuple[int, str, str]]:
+    lines: List[Tuple[int, str, str]] = []
+    log_model.logLineAdded.connect(lambda levelno, header, msg: lines.append((levelno, header, msg)))
+    return lines
+
+
+class TestLogRingBuffer:
+
+    def test_EmptyBuffer_AppendBelowCapacity_AllEntriesKept(self):
+        buffer = LogRingBuffer(3)
+        buffer.append(logging.INFO, "a")
+        buffer.append(logging.INFO, "b")
+        assert list(buffer) == ["a", "b"]
+        assert buffer.dropped_count == 0
+
+    def test_FullBuffer_Append_OldestEntriesDroppedAndCountedPerLevel(self):
+        buffer = LogRingBuffer(2)
+        buffer.append(logging.DEBUG, "a")
+        buffer.append(logging.WARNING, "b")
+        buffer.append(logging.INFO, "c")
+        buffer.append(logging.INFO, "d")
+        assert list(buffer) == ["c", "d"]
+        assert buffer.dropped_counts == {logging.DEBUG: 1, logging.WARNING: 1}
+
+    def test_InvalidCapacity_Create_ValueErrorRaised(self):
+        with pytest.raises(ValueError):
+            LogRingBuffer(0)
+
+
+class TestLogListModel:
+
+    def test_EmptyListModel_AppendEntries_RowsInsertedAndRolesServed(self):
+        list_model = LogListModel(history_size=10)
+        inserted = []
+        list_model.rowsInserted.connect(lambda parent, first, last: inserted.append((first, last)))
+
+        list_model.append_entries([UiLogEntry(logging.INFO, "header: ", "msg 0"), UiLogEntry(logging.ERROR, "header: ", "msg 1")])
+
+        assert inserted == [(0, 1)]
+        assert list_model.rowCount() == 2
+        index = list_model.index(1)
+        assert list_model.data(index, LogListModel.LevelnoRole) == logging.ERROR
+        assert list_model.data(index, LogListModel.HeaderRole) == "header: "
+        assert list_model.data(index, LogListModel.MessageRole) == "msg 1"
+        assert list_model.data(index) == "header: msg 1"
+
+    def test_FullListModel_AppendEntries_OldestRowsRemoved(self):
+        list_model = LogListModel(history_size=3)
+        list_model.append_entries([UiLogEntry(logging.INFO, "", f"msg {i}") for i in range(3)])
+        removed = []
+        list_model.rowsRemoved.connect(lambda parent, first, last: removed.append((first, last)))
+
+        list_model.append_entries([UiLogEntry(logging.INFO, "", "msg 3"), UiLogEntry(logging.INFO, "", "msg 4")])
+
+        assert removed == [(0, 1)]
+        assert [list_model.data(list_model.index(row), LogListModel.MessageRole) for row in range(3)] == ["msg 2", "msg 3", "msg 4"]
+
+
+class TestLogModel:
+
+    def test_PrebufferOverflowed_RequestPrebuffer_DroppedMarkerAndRetainedLinesReplayed(self):
+        log_model = LogModel(prebuffer_size=2)
+        lines = collect_log_lines(log_model)
+        for i in range(5):
+            log_model.add_log_line(logging.INFO, "header: ", f"line {i}")
+
+        log_model.requestPrebuffer()
+
+        assert lines[0][0] == logging.WARNING
+        assert "3 log lines dropped" in lines[0][2]
+        assert lines[1:] == [(logging.INFO, "header: ", "line 3"), (logging.INFO, "header: ", "line 4")]
+        assert len(log_model.prebuffer_entries) == 0
+
+    def test_NothingConnected_ReplayPrebufferAndAddLines_NoLineRendered(self):
+        handler = UiLogHandler()
+        handler.handle(create_record("prebuffered %d", (0,), name="foo"))
+        handler.log_model.requestPrebuffer()
+
+        for i in range(3):
+            handler.handle(create_record("live %d", (i,), name="foo"))
+        handler.log_model.flush()
+
+        assert len(handler.log_model.list_model.history) == 4
+        assert handler.ui_formatter.render.cache_info().misses == 0
+
+    def test_PrebufferReplayed_AddLogLine_LineEmittedDirectly(self):
+        log_model = LogModel()
+        log_model.requestPrebuffer()
+        lines = collect_log_lines(log_model)
+
+        log_model.add_log_line(logging.ERROR, "header: ", "msg")
+
+        assert lines == [(logging.ERROR, "header: ", "msg")]
+
+    def test_LogModel_AddLogLines_SingleRowRangeInsertedOnNextEventLoopIteration(self, qt_app):
+        log_model = LogModel()
+        log_model.requestPrebuffer()
+        lines = collect_log_lines(log_model)
+        inserted_ranges = []
+        log_model.list_model.rowsInserted.connect(lambda parent, first, last: inserted_ranges.append((first, last)))
+
+        for i in range(3):
+            log_model.add_log_line(logging.INFO, "header: ", f"line {i}")
+        assert len(lines) == 3
+        assert inserted_ranges == []
+
+        process_events_until(qt_app, lambda: len(inserted_ranges) > 0)
+
+        assert inserted_ranges == [(0, 2)]
+        assert [entry.message for entry in log_model.list_model.history] == ["line 0", "line 1", "line 2"]
+
+    def test_BatchedLogModel_AddLogLines_SingleBatchEmittedOnNextEventLoopIteration(self, qt_app):
+        log_model = LogModel(batch_interval_ms=0)
+        log_model.requestPrebuffer()
+        single_lines = collect_log_lines(log_model)
+        batches = []
+        log_model.logLinesAdded.connect(batches.append)
+
+        for i in range(3):
+            log_model.add_log_line(logging.INFO, "header: ", f"line {i}")
+        assert batches == []
+
+        process_events_until(qt_app, lambda: len(batches) > 0)
+
+        assert batches == [[[logging.INFO, "header: ", f"line {i}"] for i in range(3)]]
+        assert single_lines == []
+
+    def test_BatchedLogModelWithPrebuffer_RequestPrebuffer_PrebufferEmittedAsSingleBatch(self, qt_app):
+        log_model = LogModel(batch_interval_ms=0)
+        batches = []
+        log_model.logLinesAdded.connect(batches.append)
+        log_model.add_log_line(logging.INFO, "header: ", "line 0")
+        log_model.add_log_line(logging.INFO, "header: ", "line 1")
+
+        log_model.requestPrebuffer()
+
+        assert batches == [[[logging.INFO, "header: ", "line 0"], [logging.INFO, "header: ", "line 1"]]]
+
+    def test_LargePrebuffer_RequestPrebuffer_ReplayedInChunksAcrossEventLoopIterations(self, qt_app):
+        log_model = LogModel(prebuffer_replay_budget_ms=0)
+        lines = collect_log_lines(log_model)
+        progress = []
+        log_model.prebufferReplayProgress.connect(lambda replayed, total: progress.append((replayed, total)))
+        for i in range(3):
+            log_model.add_log_line(logging.INFO, "", f"line {i}")
+
+        log_model.requestPrebuffer()
+        assert [msg for _, _, msg in lines] == ["line 0"]
+
+        log_model.add_log_line(logging.INFO, "", "line 3")
+        process_events_until(qt_app, lambda: len(lines) == 4)
+
+        assert [msg for _, _, msg in lines] == [f"line {i}" for i in range(4)]
+        assert progress == [(1, 3), (2, 4), (3, 4), (4, 4)]
+        assert not log_model.redirect_to_prebuffer
+
+    def test_PrebufferOverflowed_TakePrebuffer_AllLinesReturnedAtOnce(self):
+        log_model = LogModel(prebuffer_size=2)
+        lines = collect_log_lines(log_model)
+        for i in range(3):
+            log_model.add_log_line(logging.INFO, "header: ", f"line {i}")
+
+        prebuffer = log_model.takePrebuffer()
+        log_model.add_log_line(logging.INFO, "header: ", "live")
+
+        assert [line["msg"] for line in prebuffer] == ["1 log lines dropped from prebuffer (INFO=1)", "line 1", "line 2"]
+        assert prebuffer[1] == {"levelno": logging.INFO, "header": "header: ", "msg": "line 1"}
+        assert lines == [(logging.INFO, "header: ", "live")]
+
+    def test_LaggingLogModel_AddLogLinesFromWorkerThread_InfoSampledWarningsDeliveredAndSummaryAdded(self, qt_app):
+        log_model = LogModel(max_delivery_lag_ms=100, degraded_sample_interval=2)
+        log_model.requestPrebuffer()
+        lines = collect_log_lines(log_model)
+
+        def add_lines(levelno, count, age_s):
+            for i in range(count):
+                entry = UiLogEntry(levelno, "", f"{logging.getLevelName(levelno)} {i}")
+                entry.created = time.time() - age_s
+                log_model.add_log_entry(entry)
+
+        def run_in_worker(*args):
+            worker = threading.Thread(target=add_lines, args=args)
+            worker.start()
+            worker.join()
+            log_model.drain_queued_log_lines()
+
+        run_in_worker(logging.INFO, 1, 1.0)
+        assert log_model.degraded and log_model.deliveryLagMs >= 1000
+
+        run_in_worker(logging.INFO, 4, 1.0)
+        run_in_worker(logging.WARNING, 2, 1.0)
+        assert log_model.droppedLineCount == 2
+
+        run_in_worker(logging.INFO, 1, 0.0)
+        assert not log_model.degraded
+
+        assert [msg for _, _, msg in lines] == [
+            "INFO 0", "INFO 0", "INFO 2", "WARNING 0", "WARNING 1", "INFO 0", "2 log lines dropped while the UI was lagging behind (INFO=2)"
+        ]
+
+    def test_DegradedLogModel_LoggingGoesIdle_RecoversAndSummaryAdded(self, qt_app):
+        log_model = LogModel(max_delivery_lag_ms=50, degraded_sample_interval=2)
+        log_model.requestPrebuffer()
+        lines = collect_log_lines(log_model)
+
+        def add_lines():
+            for i in range(3):
+                entry = UiLogEntry(logging.INFO, "", f"INFO {i}")
+                entry.created = time.time() - 1.0
+                log_model.add_log_entry(entry)
+
+        for _ in range(2):
+            worker = threading.Thread(target=add_lines)
+            worker.start()
+            worker.join()
+            qt_app.processEvents()
+        assert log_model.degraded and log_model.droppedLineCount == 1
+
+        process_events_until(qt_app, lambda: not log_model.degraded, timeout_s=2.0)
+
+        assert log_model.deliveryLagMs == 0
+        assert lines[-1][2] == "1 log lines dropped while the UI was lagging behind (INFO=1)"
+
+    def test_QueuedInfoLines_AddWarningFromWorkerThread_WarningDeliveredFirst(self, qt_app):
+        log_model = LogModel()
+        log_model.requestPrebuffer()
+        lines = collect_log_lines(log_model)
+
+        def worker():
+            for i in range(3):
+                log_model.add_log_line(logging.INFO, "", f"info {i}")
+            log_model.add_log_line(logging.WARNING, "", "warning")
+            log_model.add_log_line(logging.INFO, "", "info 3")
+
+        worker_thread = threading.Thread(target=worker)
+        worker_thread.start()
+        worker_thread.join()
+        log_model.drain_queued_log_lines()
+
+        assert [msg for _, _, msg in lines] == ["warning", "info 0", "info 1", "info 2", "info 3"]
+
+    def test_SmallPrebuffer_AddLogLinesFromWorkerThread_QueuesBoundedAndOverflowReportedAsDropped(self, qt_app):
+        log_model = LogModel(prebuffer_size=2)
+        log_model.requestPrebuffer()
+        lines = collect_log_lines(log_model)
+
+        def worker():
+            for i in range(4):
+                log_model.add_log_line(logging.INFO, "", f"info {i}")
+            for i in range(3):
+                log_model.add_log_line(logging.WARNING, "", f"warning {i}")
+
+        worker_thread = threading.Thread(target=worker)
+        worker_thread.start()
+        worker_thread.join()
+        assert len(log_model.queued_entries) == 2 and len(log_model.queued_priority_entries) == 2
+
+        log_model.drain_queued_log_lines()
+
+        assert [msg for _, _, msg in lines] == [
+            "warning 0", "warning 1", "info 0", "info 1", "3 log lines dropped from the full queue of other threads (INFO=2, WARNING=1)"
+        ]
+        assert log_model.droppedLineCount == 3
+
+    def test_LogModel_AddLogLinesFromWorkerThreads_LinesEmittedOnCreatingThread(self, qt_app):
+        log_model = LogModel()
+        log_model.requestPrebuffer()
+        emitting_threads = set()
+        lines = []
+
+        def on_log_line_added(levelno, header, msg):
+            emitting_threads.add(threading.get_ident())
+            lines.append(msg)
+
+        log_model.logLineAdded.connect(on_log_line_added)
+
+        def worker(worker_id):
+            for i in range(100):
+                log_model.add_log_line(logging.INFO, "", f"{worker_id}:{i}")
+
+        workers = [threading.Thread(target=worker, args=(worker_id,)) for worker_id in range(4)]
+        for worker_thread in workers:
+            worker_thread.start()
+        for worker_thread in workers:
+            worker_thread.join()
+
+        assert lines == []
+        process_events_until(qt_app, lambda: len(lines) == 400)
+
+        assert sorted(lines) == sorted(f"{worker_id}:{i}" for worker_id in range(4) for i in range(100))
+        assert emitting_threads == {threading.get_ident()}
+        assert [msg for msg in lines if msg.startswith("0:")] == [f"0:{i}" for i in range(100)]
@@ -0,0 +1,117 @@
+# Copyright (C) 2024 twyleg
+# fmt: off
+import logging
+import logging.config
+import threading
+import time
+
+import pytest
+
+from fixtures import ListHandler, create_record
+from simple_python_app_qt.log_queue import QueueSinkHandler
+
+#
+# General naming convention for unit tests:
+#               test_INITIALSTATE_ACTION_EXPECTATION
+#
+
+
+@pytest.fixture
+def queue_handler_factory():
+    handlers = []
+
+    def create(*args, **kwargs):
+        handler = QueueSinkHandler(*args, **kwargs)
+        handlers.append(handler)
+        return handler
+
+    yield create
+    for handler in handlers:
+        handler.close()
+
+
+class TestQueueSinkHandler:
+
+    def test_QueueHandler_Flush_RecordsHandedToSinksInOrder(self, queue_handler_factory):
+        sink = ListHandler()
+        sink.setFormatter(logging.Formatter("%(levelname)s: %(message)s"))
+        handler = queue_handler_factory([sink])
+
+        for i in range(100):
+            handler.handle(create_record("line %d", args=(i,)))
+        handler.flush()
+
+        assert sink.messages == [f"INFO: line {i}" for i in range(100)]
+
+    def test_SinkWithLevel_HandleRecords_SinkLevelRespected(self, queue_handler_factory):
+        sink = ListHandler()
+        sink.setLevel(logging.WARNING)
+        handler = queue_handler_factory([sink])
+
+        handler.handle(create_record("info"))
+        handler.handle(create_record("warning", levelno=logging.WARNING))
+        handler.flush()
+
+        assert sink.messages == ["warning"]
+
+    @pytest.mark.parametrize("drop_policy, expected_messages", [
+        (QueueSinkHandler.DROP_NEWEST, ["blocking", "1", "2"]),
+        (QueueSinkHandler.DROP_OLDEST, ["blocking", "3", "4"]),
+    ])
+    def test_BlockedSink_QueueOverflows_RecordsDroppedByPolicyAndReported(self, queue_handler_factory, drop_policy, expected_messages):
+        unblock = threading.Event()
+        sink = ListHandler(unblock)
+        handler = queue_handler_factory([sink], queue_size=2, drop_policy=drop_policy)
+
+        handler.handle(create_record("blocking"))
+        while not handler.queue.empty():
+            time.sleep(0.001)
+        for i in range(1, 5):
+            handler.handle(create_record(str(i)))
+        unblock.set()
+        handler.flush()
+        handler.handle(create_record("after"))
+        handler.flush()
+
+        assert handler.dropped_counts == {}
+        assert sink.messages[:-2] == expected_messages
+        assert sink.messages[-2] == "2 log records dropped from full log queue (INFO=2)"
+        assert sink.messages[-1] == "after"
+
+    def test_ClosedHandler_HandleRecord_RecordHandedToSinkDirectly(self):
+        sink = ListHandler()
+        handler = QueueSinkHandler([sink])
+        handler.handle(create_record("queued"))
+
+        handler.close()
+        handler.handle(create_record("direct"))
+
+        assert sink.messages == ["queued", "direct"]
+        assert not handler.running
+
+    def test_DictConfigWithSinkConfiguredAfterQueue_Configure_SinkResolvedOnFirstRecord(self):
+        logger = logging.getLogger("test_log_queue")
+        logging.config.dictConfig({
+            "version": 1,
+            "disable_existing_loggers": False,
+            "handlers": {
+                "queue": {"class": "simple_python_app_qt.log_queue.QueueSinkHandler", "handlers": ["cfg://handlers.sink"], "drop_policy": "oldest"},
+                "sink": {"class": "fixtures.ListHandler"},
+            },
+            "loggers": {"test_log_queue": {"level": "INFO", "handlers": ["queue"], "propagate": False}},
+        })
+        handler = logger.handlers[0]
+        assert isinstance(handler, QueueSinkHandler)
+
+        logger.info("configured")
+        handler.close()
+
+        assert handler.drop_policy == QueueSinkHandler.DROP_OLDEST
+        assert handler.sinks[0].messages == ["configured"]
+        logger.handlers = []
+
+    def test_UnresolvedSinkReference_Flush_ValueError(self, queue_handler_factory):
+        handler = queue_handler_factory(["cfg://handlers.does_not_exist"])
+
+        with pytest.raises(ValueError):
+            handler.flush()
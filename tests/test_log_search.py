@@ -0,0 +1,189 @@
+# Copyright (C) 2024 twyleg
+# fmt: off
+import logging
+
+from fixtures import process_events_until, qt_app
+from simple_python_app_qt.log_formatter import UiLogEntry
+from simple_python_app_qt.log_history import LogHistory
+from simple_python_app_qt.log_search import SegmentSearchIndex, flags_to_mask, mask_to_flags, trigram_key
+from simple_python_app_qt.qml_application import LogModel
+
+#
+# General naming convention for unit tests:
+#               test_INITIALSTATE_ACTION_EXPECTATION
+#
+
+
+def add_lines(log_model: LogModel, messages, levelno: int = logging.INFO) -> None:
+    for msg in messages:
+        log_model.add_log_entry(UiLogEntry(levelno, "[main]: ", msg))
+
+
+def filtered_messages(log_model: LogModel):
+    log_model.flush()
+    filter_model = log_model.get_filter_model()
+    filter_model.wait_for_search()
+    return [filter_model.data(filter_model.index(row), log_model.list_model.MessageRole) for row in range(filter_model.rowCount())]
+
+
+def to_row_ranges(rows):
+    ranges = []
+    for row in rows:
+        if ranges and ranges[-1][1] == row - 1:
+            ranges[-1][1] = row
+        else:
+            ranges.append([row, row])
+    return ranges
+
+
+def mask_rows(rows_mask: int):
+    return [row for row in range(rows_mask.bit_length()) if rows_mask >> row & 1]
+
+
+SEGMENT_SIZE = LogHistory.SEGMENT_SIZE
+
+
+class TestLogSearch:
+
+    def test_RowFlags_ToMaskAndBack_SameFlags(self):
+        flags = bytes([1, 0, 0, 1, 1, 0])
+
+        assert flags_to_mask(flags) == 0b11001
+        assert mask_to_flags(0b11001, len(flags)) == flags
+        assert flags_to_mask(b"") == 0 and mask_to_flags(0, 0) == b""
+
+    def test_LogModelWithHistory_Search_MatchingRowRangesReturned(self):
+        log_model = LogModel()
+        add_lines(log_model, ["connected", "Connection lost", "retrying", "connection LOST again", "idle"])
+
+        assert log_model.search("connection lost") == [[1, 1], [3, 3]]
+        assert log_model.search("nothing") == []
+        assert log_model.search("ng") == [[2, 2]]
+
+    def test_IndexedLogModel_AddLinesAfterSearch_IndexUpdatedIncrementally(self):
+        log_model = LogModel()
+        add_lines(log_model, ["foo"])
+        assert log_model.search("bar") == []
+
+        add_lines(log_model, ["bar", "foobar"])
+
+        assert log_model.search("bar") == [[1, 2]]
+
+    def test_FullHistory_SearchAfterEviction_OnlyRetainedRowsReturned(self):
+        log_model = LogModel(history_size=3, search_index=True)
+        add_lines(log_model, [f"line {i}" for i in range(10)])
+
+        assert log_model.search("line") == [[0, 2]]
+        assert log_model.search("line 8") == [[1, 1]]
+
+    def test_CompactedSegments_Search_IndexedSegmentsAndRecentLinesSearched(self):
+        log_model = LogModel(history_size=2 * SEGMENT_SIZE, search_index=True)
+        add_lines(log_model, [f"line {i}" for i in range(2 * SEGMENT_SIZE + 10)])
+        log_model.list_model.history.wait_for_compaction()
+        segments = log_model.list_model.history.segments
+
+        assert len(segments) == 2 and all(segment.search_index is not None for segment in segments)
+        assert log_model.search("LINE 1030") == [[1020, 1020]]
+        assert log_model.search("line 5") == to_row_ranges([i - 10 for i in range(10, 2 * SEGMENT_SIZE + 10) if f"line {i}".startswith("line 5")])
+        assert log_model.search("e 9") == to_row_ranges([i - 10 for i in range(10, 2 * SEGMENT_SIZE + 10) if str(i).startswith("9")])
+
+    def test_UnindexedCompactedSegments_SearchWhileIndexing_SameResultsAsIndexed(self):
+        log_model = LogModel(history_size=2 * SEGMENT_SIZE)
+        add_lines(log_model, [f"line {i}" for i in range(SEGMENT_SIZE + 10)])
+        log_model.list_model.history.wait_for_compaction()
+
+        unindexed_matches = log_model.search("ne 10")
+        log_model.list_model.history.wait_for_compaction()
+
+        assert log_model.list_model.history.segments[0].search_index is not None
+        assert log_model.search("ne 10") == unindexed_matches == [[10, 10], [100, 109], [1000, 1033]]
+
+    def test_Lines_IndexSegment_RowsSearchedCaseInsensitive(self):
+        index = SegmentSearchIndex([("[main]: ", "foo bar"), ("[main]: ", "bar"), ("", "Foo")])
+
+        assert mask_rows(index.search("bar")) == [0, 1]
+        assert mask_rows(index.search("foo b")) == [0]
+        assert mask_rows(index.search("o")) == [0, 2]
+        assert mask_rows(index.search("baz")) == []
+        assert mask_rows(index.search("bar", rows_mask=0b110)) == [1]
+
+    def test_SegmentOfLines_IndexSegment_FrequentTrigramsStoredAsBitmasksOthersAsUint16Postings(self):
+        index = SegmentSearchIndex([("[main]: ", f"line {i}") for i in range(SEGMENT_SIZE)])
+
+        assert index.postings.typecode == "H"
+        assert trigram_key("mai") in index.bitmask_keys and trigram_key("mai") not in index.trigram_keys
+        assert trigram_key("102") in index.trigram_keys and trigram_key("102") not in index.bitmask_keys
+        assert index.rows_mask("mai") == (1 << SEGMENT_SIZE) - 1
+        assert index.rows_mask("102") == sum(1 << row for row in [102, 1020, 1021, 1022, 1023])
+        assert mask_rows(index.search("line 1023")) == [1023]
+        assert mask_rows(index.search("e 5")) == [row for row in range(SEGMENT_SIZE) if str(row).startswith("5")]
+
+    def test_LinesAllContainingQueryTrigrams_Search_OnlyLinesContainingQueryReturned(self):
+        index = SegmentSearchIndex([("", "aaaa") if row % 3 == 0 else ("", "aaa b") for row in range(SEGMENT_SIZE)])
+
+        assert index.rows_mask("aaa") == (1 << SEGMENT_SIZE) - 1
+        assert mask_rows(index.search("aaaa")) == list(range(0, SEGMENT_SIZE, 3))
+        assert mask_rows(index.search("aaaa", rows_mask=0b1111)) == [0, 3]
+
+
+class TestLogFilterModel:
+
+    def test_LogModel_AddLinesWithoutFilter_NoFilterModelCreated(self):
+        log_model = LogModel()
+        add_lines(log_model, ["a", "b"])
+
+        assert log_model.filter_model is None
+
+    def test_NoFilter_AddLines_AllRowsShown(self):
+        log_model = LogModel()
+        add_lines(log_model, ["a", "b"])
+        assert filtered_messages(log_model) == ["a", "b"]
+
+    def test_LogModel_SetFilter_MatchingRowsShownAndUpdatedIncrementally(self):
+        log_model = LogModel(history_size=4)
+        add_lines(log_model, ["error 1", "info"])
+        add_lines(log_model, ["error 2"], logging.ERROR)
+
+        log_model.setFilter("error", logging.ERROR)
+        assert filtered_messages(log_model) == ["error 2"]
+
+        add_lines(log_model, ["error 3"], logging.ERROR)
+        add_lines(log_model, ["info"], logging.ERROR)
+        assert filtered_messages(log_model) == ["error 2", "error 3"]
+
+        add_lines(log_model, ["x", "y"])
+        assert filtered_messages(log_model) == ["error 3"]
+
+        log_model.setFilter("", logging.NOTSET)
+        assert filtered_messages(log_model) == ["error 3", "info", "x", "y"]
+
+    def test_PartiallyEvictedCompactedSegments_SetFilterWithLevel_RetainedMatchingLinesShown(self):
+        log_model = LogModel(history_size=SEGMENT_SIZE + 10, search_index=True)
+        line_count = 2 * SEGMENT_SIZE + 5
+        for i in range(line_count):
+            add_lines(log_model, [f"line {i}"], logging.WARNING if i % 3 == 0 else logging.INFO)
+        log_model.flush()
+        log_model.list_model.history.wait_for_compaction()
+
+        log_model.setFilter("LINE 10", logging.WARNING)
+
+        retained = range(line_count - SEGMENT_SIZE - 10, line_count)
+        assert filtered_messages(log_model) == [f"line {i}" for i in retained if i % 3 == 0 and f"line {i}".startswith("line 10")]
+
+    def test_LogModelWithApp_SetFilterAndAddLinesWhileSearching_MatchingRowsInsertedOnceSearched(self, qt_app):
+        log_model = LogModel(history_size=2 * SEGMENT_SIZE)
+        add_lines(log_model, [f"line {i}" for i in range(SEGMENT_SIZE + 10)])
+        log_model.flush()
+        filter_model = log_model.get_filter_model()
+        inserted_rows = []
+        filter_model.rowsInserted.connect(lambda parent, first, last: inserted_rows.append((first, last)))
+
+        log_model.setFilter("line 10", logging.NOTSET)
+        add_lines(log_model, ["line 10 added while searching", "other line"])
+        log_model.flush()
+
+        assert filter_model.searching and filter_model.rowCount() == 0
+        process_events_until(qt_app, lambda: not filter_model.searching)
+        expected = [f"line {i}" for i in range(SEGMENT_SIZE + 10) if f"line {i}".startswith("line 10")] + ["line 10 added while searching"]
+        assert filtered_messages(log_model) == expected
+        assert inserted_rows == [(0, len(expected) - 1)]
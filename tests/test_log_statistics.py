@@ -0,0 +1,93 @@
+# Copyright (C) 2024 twyleg
+# fmt: off
+import logging
+
+from fixtures import qt_app
+from simple_python_app_qt.log_formatter import UiLogEntry
+from simple_python_app_qt.log_statistics import LogStatistics, SlidingWindowCounter
+from simple_python_app_qt.qml_application import LogModel, UiLogHandler
+
+#
+# General naming convention for unit tests:
+#               test_INITIALSTATE_ACTION_EXPECTATION
+#
+
+
+def create_entry(levelno: int, name: str) -> UiLogEntry:
+    entry = UiLogEntry(levelno, "", "msg")
+    entry.name = name
+    return entry
+
+
+class TestSlidingWindowCounter:
+
+    def test_Counter_AddOverTime_OnlyEventsWithinWindowCountedAsRecent(self):
+        counter = SlidingWindowCounter(window_s=3)
+
+        counter.add(100)
+        counter.add(101, 2)
+        counter.add(103)
+
+        assert counter.total == 4
+        assert counter.recent_count(103) == 3
+        assert counter.recent_count(104) == 1
+        assert counter.recent_count(200) == 0
+
+    def test_CounterWithRecentEvents_AddEventOneWindowOld_RecentEventsKept(self):
+        counter = SlidingWindowCounter(window_s=3)
+
+        counter.add(103, 2)
+        counter.add(100)
+
+        assert counter.total == 3
+        assert counter.recent_count(103) == 2
+
+
+class TestLogStatistics:
+
+    def test_Lines_Add_CountedPerLevelAndTopLevelLogger(self):
+        statistics = LogStatistics(window_s=60)
+
+        statistics.add(logging.ERROR, "main.sub", now=1000.0)
+        statistics.add(logging.ERROR, "main", now=1000.0)
+        statistics.add(logging.WARNING, "qml", now=1000.0)
+        statistics.add(logging.INFO, "", now=1000.0)
+        statistics.add(logging.ERROR, "qml", now=1100.0)
+
+        assert statistics.level_counts() == {"INFO": 1, "WARNING": 1, "ERROR": 3}
+        assert statistics.recent_level_counts(now=1100.0) == {"INFO": 0, "WARNING": 0, "ERROR": 1}
+        assert statistics.logger_counts() == {"main": 2, "qml": 2}
+        assert statistics.recent_logger_counts(now=1100.0) == {"main": 0, "qml": 1}
+
+
+class TestLogModelStatistics:
+
+    def test_LogModel_AddLogLines_CountPropertiesUpdatedOnceAfterInterval(self, qt_app):
+        log_model = LogModel(statistics_interval_ms=0)
+        notifications = []
+        log_model.statistics_changed.connect(lambda: notifications.append(dict(log_model.levelCounts)))
+
+        for _ in range(3):
+            log_model.add_log_entry(create_entry(logging.ERROR, "main.sub"))
+        assert notifications == []
+
+        qt_app.processEvents()
+
+        assert notifications == [{"ERROR": 3}]
+        assert log_model.recentLevelCounts == {"ERROR": 3}
+        assert log_model.loggerCounts == {"main": 3}
+
+    def test_ThrottledUiLogHandler_LogRepeatedAndRateLimitedLines_AllLinesCounted(self, qt_app):
+        handler = UiLogHandler(coalesce_window_ms=1000, rate_limit=1.0, rate_limit_burst=2, statistics_interval_ms=0)
+        logger = logging.getLogger("statistics_test.throttled")
+        logger.handlers = [handler]
+        logger.propagate = False
+
+        for _ in range(10):
+            logger.error("same error")
+        for i in range(5):
+            logger.error(f"error {i}")
+        qt_app.processEvents()
+
+        assert handler.log_model.levelCounts == {"ERROR": 15}
+        assert handler.log_model.loggerCounts == {"statistics_test": 15}
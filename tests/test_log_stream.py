@@ -0,0 +1,130 @@
+# Copyright (C) 2024 twyleg
+# fmt: off
+import json
+import socket
+from typing import Any, Dict, List
+
+import pytest
+from PySide6.QtCore import QUrl
+from PySide6.QtWebSockets import QWebSocket
+
+from fixtures import process_events_until, qt_app
+from simple_python_app_qt.log_list_model import LogListModel
+from simple_python_app_qt.log_formatter import UiLogEntry
+from simple_python_app_qt.log_stream import LogStreamServer
+
+#
+# General naming convention for unit tests:
+#               test_INITIALSTATE_ACTION_EXPECTATION
+#
+
+
+def append_lines(list_model: LogListModel, first: int, count: int, msg_size: int = 0) -> None:
+    list_model.append_entries([UiLogEntry(20, "INFO: ", f"line {i}".ljust(msg_size, ".")) for i in range(first, first + count)])
+
+
+class Viewer:
+    def __init__(self, port: int, since: int | None = None, origin: str = "") -> None:
+        self.frames: List[Dict[str, Any]] = []
+        self.closed = False
+        self.socket = QWebSocket(origin)
+        self.socket.disconnected.connect(lambda: setattr(self, "closed", True))
+        self.socket.textMessageReceived.connect(lambda message: self.frames.append(json.loads(message)))
+        query = "" if since is None else f"?since={since}"
+        self.socket.open(QUrl(f"ws://127.0.0.1:{port}/{query}"))
+
+    @property
+    def messages(self) -> List[str]:
+        return [line[2] for frame in self.frames for line in frame["lines"]]
+
+    @property
+    def next_sequence(self) -> int:
+        return self.frames[-1]["seq"] + len(self.frames[-1]["lines"]) if self.frames else -1
+
+
+@pytest.fixture
+def stream_server(qt_app):
+    list_model = LogListModel(history_size=1000)
+    server = LogStreamServer(list_model)
+    server.listen()
+    yield server, list_model
+    server.close()
+
+
+class TestLogStreamServer:
+
+    def test_ModelWithHistory_ViewerConnects_HistoryAndNewLinesStreamedInBatches(self, qt_app, stream_server):
+        server, list_model = stream_server
+        append_lines(list_model, 0, 600)
+
+        viewer = Viewer(server.port)
+        process_events_until(qt_app, lambda: viewer.next_sequence == 600)
+        append_lines(list_model, 600, 10)
+        process_events_until(qt_app, lambda: viewer.next_sequence == 610)
+
+        assert viewer.messages == [f"line {i}" for i in range(610)]
+        assert [frame["seq"] for frame in viewer.frames] == [0, 500, 600]
+        assert viewer.frames[0]["lines"][0] == [20, "INFO: ", "line 0", 1]
+
+    def test_ModelWithHistory_ViewerResumesWithSince_OnlyLaterLinesStreamed(self, qt_app, stream_server):
+        server, list_model = stream_server
+        append_lines(list_model, 0, 20)
+
+        viewer = Viewer(server.port, since=15)
+        process_events_until(qt_app, lambda: viewer.next_sequence == 20)
+
+        assert viewer.messages == [f"line {i}" for i in range(15, 20)]
+
+    def test_EvictedLines_ViewerResumesBeforeHistory_SkippedCountReported(self, qt_app, stream_server):
+        server, list_model = stream_server
+        append_lines(list_model, 0, 600)
+        append_lines(list_model, 600, 600)
+
+        viewer = Viewer(server.port, since=100)
+        process_events_until(qt_app, lambda: viewer.next_sequence == 1200)
+
+        assert viewer.frames[0]["seq"] == 200
+        assert viewer.frames[0]["skipped"] == 100
+        assert viewer.messages[0] == "line 200"
+
+    @pytest.mark.parametrize("origin", ["http://localhost:8000", "http://127.0.0.1", "http://[::1]:8000"])
+    def test_ModelWithHistory_ViewerFromLocalOriginConnects_HistoryStreamed(self, qt_app, stream_server, origin):
+        server, list_model = stream_server
+        append_lines(list_model, 0, 10)
+
+        viewer = Viewer(server.port, origin=origin)
+        process_events_until(qt_app, lambda: viewer.next_sequence == 10)
+
+        assert viewer.messages == [f"line {i}" for i in range(10)]
+
+    @pytest.mark.parametrize("origin", ["https://example.com", "http://localhost.example.com", "null"])
+    def test_ModelWithHistory_ViewerFromRemoteOriginConnects_ConnectionRejected(self, qt_app, stream_server, origin):
+        server, list_model = stream_server
+        append_lines(list_model, 0, 10)
+
+        viewer = Viewer(server.port, origin=origin)
+        process_events_until(qt_app, lambda: viewer.closed)
+
+        assert viewer.frames == []
+        assert server.clients == {}
+
+    def test_ViewerNotReading_AppendManyLines_PendingBytesBoundedAndViewerFallsBehind(self, qt_app, stream_server):
+        server, list_model = stream_server
+        server.MAX_PENDING_BYTES = 64 * 1024
+        stalled_viewer = socket.create_connection(("127.0.0.1", server.port))
+        stalled_viewer.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)
+        stalled_viewer.sendall(
+            b"GET / HTTP/1.1\r\nHost: 127.0.0.1\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+            b"Sec-WebSocket-Key: dGhlIHNhbXBsZSBub25jZQ==\r\nSec-WebSocket-Version: 13\r\n\r\n"
+        )
+        process_events_until(qt_app, lambda: server.clients)
+
+        for i in range(0, 50000, 1000):
+            append_lines(list_model, i, 1000, msg_size=1000)
+            server.send_pending_lines()
+            qt_app.processEvents()
+
+        client = next(iter(server.clients.values()))
+        assert client.socket.bytesToWrite() < server.MAX_PENDING_BYTES + server.BATCH_SIZE * 1100
+        assert client.next_sequence < list_model.appended_count
+        stalled_viewer.close()
@@ -0,0 +1,74 @@
+# Copyright (C) 2024 twyleg
+# fmt: off
+import logging
+
+from fixtures import create_record
+from simple_python_app_qt.log_throttle import LoadShedder, TokenBucketRateLimiter
+from simple_python_app_qt.qml_application import UiLogHandler
+
+#
+# General naming convention for unit tests:
+#               test_INITIALSTATE_ACTION_EXPECTATION
+#
+
+
+class TestTokenBucketRateLimiter:
+
+    def test_FullBucket_AcquireBeyondBurst_RecordsSuppressedAndReportedOnRefill(self):
+        rate_limiter = TokenBucketRateLimiter(rate=1.0, burst=2)
+
+        assert rate_limiter.acquire("foo", 0.0) == (True, 0)
+        assert rate_limiter.acquire("foo", 0.0) == (True, 0)
+        assert rate_limiter.acquire("foo", 0.0) == (False, 0)
+        assert rate_limiter.acquire("foo", 0.5) == (False, 0)
+        assert rate_limiter.acquire("bar", 0.5) == (True, 0)
+
+        assert rate_limiter.acquire("foo", 1.0) == (True, 2)
+
+
+class TestLoadShedder:
+
+    def test_LaggingConsumer_Accept_InfoSampledWarningsKeptUntilLagRecovers(self):
+        load_shedder = LoadShedder(max_lag_s=0.1, sample_interval=3)
+        assert all(load_shedder.accept(logging.DEBUG) for _ in range(5))
+
+        assert load_shedder.update_lag(0.2)
+        accepted = [load_shedder.accept(logging.INFO) for _ in range(6)]
+        assert all(load_shedder.accept(logging.WARNING) for _ in range(5))
+
+        assert accepted == [True, False, False, True, False, False]
+        assert not load_shedder.update_lag(0.08)
+        assert load_shedder.update_lag(0.04)
+        assert load_shedder.take_shed_counts() == {logging.INFO: 4}
+        assert load_shedder.shed_count == 4
+        assert load_shedder.accept(logging.DEBUG)
+
+
+class TestUiLogHandlerThrottling:
+
+    def test_CoalescingHandler_HandleRepeatedRecords_SingleEntryWithRepeatCount(self):
+        handler = UiLogHandler(coalesce_window_ms=1000)
+        repeated = []
+        handler.log_model.logLineRepeated.connect(lambda levelno, header, msg, repeat_count: repeated.append(repeat_count))
+        handler.log_model.requestPrebuffer()
+
+        for i in range(5):
+            handler.handle(create_record("Counter: %s", (i,), name="foo", created=1000.0 + i * 0.1))
+        handler.handle(create_record("Counter: %s", (5,), name="foo", created=1002.0))
+        handler.log_model.flush()
+
+        history = list(handler.log_model.list_model.history)
+        assert [entry.repeat_count for entry in history] == [5, 1]
+        assert [entry.message for entry in history] == ["Counter: 0", "Counter: 5"]
+        assert repeated == [2, 3, 4, 5]
+
+    def test_RateLimitedHandler_HandleBurst_ExcessRecordsSuppressedAndReported(self):
+        handler = UiLogHandler(rate_limit=1.0, rate_limit_burst=2)
+
+        for i in range(5):
+            handler.handle(create_record("line %d", (i,), name="foo", created=1000.0))
+        handler.handle(create_record("line %d", (5,), name="foo", created=1001.0))
+        handler.log_model.flush()
+
+        messages = [entry.message for entry in handler.log_model.list_model.history]
+        assert messages == ["line 0", "line 1", "3 lines of logger 'foo' suppressed by the UI rate limit", "line 5"]
@@ -0,0 +1,498 @@
+# Copyright (C) 2024 twyleg
+# fmt: off
+import copy
+import pickle
+from collections import defaultdict
+from typing import Any, List
+
+import pytest
+from PySide6.QtCore import Q_ARG, QMetaObject, QModelIndex, QObject, QUrl
+from PySide6.QtQml import QQmlComponent, QQmlEngine
+
+from fixtures import qt_app
+from simple_python_app_qt.property import (
+    EQUALITY, IDENTITY, INSERTED, ListChange, ListPropertyModel, Property, PropertyMap, PropertyMeta, deferred_notifications, notified_dict, notified_list,
+    suppressed_emit_counts
+)
+
+#
+# General naming convention for unit tests:
+#               test_INITIALSTATE_ACTION_EXPECTATION
+#
+
+
+class Model(QObject, metaclass=PropertyMeta):
+    always = Property(int)
+    equal = Property(int, compare=EQUALITY)
+    identical = Property(object, compare=IDENTITY)
+    close = Property(float, epsilon=0.1)
+    case_insensitive = Property(str, compare=lambda old, new: old.lower() == new.lower())
+    items = Property(list, compare=EQUALITY)
+    rows = Property(list, granular=True)
+    settings = Property(dict, keyed=True)
+    options = Property(dict)
+
+
+def record_emits(model: Model, name: str) -> List[Any]:
+    emits: List[Any] = []
+    getattr(model, f"_{name}_changed").connect(emits.append)
+    return emits
+
+
+class TestPropertyComparison:
+
+    def test_NoComparisonPolicy_SetSameValue_EmitsEveryTime(self):
+        model = Model()
+        emits = record_emits(model, "always")
+
+        model.always = 1  # type: ignore
+        model.always = 1  # type: ignore
+
+        assert emits == [1, 1]
+        assert suppressed_emit_counts(model) == {}
+
+    @pytest.mark.parametrize("name, first, unchanged, changed", [
+        ("equal", 1, 1, 2),
+        ("close", 1.0, 1.05, 1.2),
+        ("case_insensitive", "abc", "ABC", "abd"),
+        ("items", [1, 2], [1, 2], [1, 2, 3]),
+    ])
+    def test_ComparisonPolicy_SetUnchangedThenChangedValue_OnlyChangesEmitted(self, name, first, unchanged, changed):
+        model = Model()
+        emits = record_emits(model, name)
+
+        setattr(model, name, first)
+        setattr(model, name, unchanged)
+        setattr(model, name, changed)
+
+        assert emits == [first, changed]
+        assert getattr(model, name) == changed
+        assert suppressed_emit_counts(model) == {name: 1}
+
+    def test_IdentityPolicy_SetEqualButDifferentObject_Emitted(self):
+        model = Model()
+        emits = record_emits(model, "identical")
+        value = (1, [2])
+
+        model.identical = value  # type: ignore
+        model.identical = value  # type: ignore
+        model.identical = (1, [2])  # type: ignore
+
+        assert len(emits) == 2
+        assert suppressed_emit_counts(model) == {"identical": 1}
+
+    def test_EpsilonPolicy_SetSmallStepsRepeatedly_EmittedOnceDriftExceedsEpsilon(self):
+        model = Model()
+        emits = record_emits(model, "close")
+
+        for i in range(5):
+            model.close = i * 0.04  # type: ignore
+
+        assert emits == [0.0, 0.12]
+
+    def test_Property_InvalidComparisonPolicy_ValueErrorRaised(self):
+        with pytest.raises(ValueError):
+            Property(float, compare=EQUALITY, epsilon=0.1)
+        with pytest.raises(ValueError):
+            Property(float, compare="approximately")
+
+
+def record_all_emits(model: Model) -> List[Any]:
+    emits: List[Any] = []
+    for name in ["always", "equal", "items"]:
+        getattr(model, f"_{name}_changed").connect(lambda value, name=name: emits.append((name, value)))
+    return emits
+
+
+class TestDeferredNotifications:
+
+    def test_Batch_SetAndMutatePropertiesRepeatedly_OneEmitPerPropertyInDeclarationOrder(self):
+        model = Model()
+        model.items = []  # type: ignore
+        emits = record_all_emits(model)
+
+        with model.batch():  # type: ignore
+            model.items.append(1)  # type: ignore
+            model.equal = 1  # type: ignore
+            model.always = 1  # type: ignore
+            model.always = 2  # type: ignore
+            model.items.append(2)  # type: ignore
+            assert emits == []
+
+        assert emits == [("always", 2), ("equal", 1), ("items", [1, 2])]
+
+    def test_BatchWithComparisonPolicy_SetAndRestoreValue_NoEmit(self):
+        model = Model()
+        model.equal = 1  # type: ignore
+        emits = record_all_emits(model)
+
+        with model.batch():  # type: ignore
+            model.equal = 2  # type: ignore
+            model.equal = 1  # type: ignore
+
+        assert emits == []
+        assert suppressed_emit_counts(model) == {"equal": 1}
+
+    def test_NestedBatches_LeaveInnerBatch_EmittedOnlyWhenLeavingOuterBatch(self):
+        model = Model()
+        emits = record_all_emits(model)
+
+        with model.batch():  # type: ignore
+            with model.batch():  # type: ignore
+                model.always = 1  # type: ignore
+            assert emits == []
+
+        assert emits == [("always", 1)]
+
+    def test_DeferredNotificationsOfTwoModels_RaiseInBlock_ChangesEmittedInModelOrder(self):
+        first, second = Model(), Model()
+        emits: List[Any] = []
+        first._always_changed.connect(lambda value: emits.append(("first", value)))  # type: ignore
+        second._always_changed.connect(lambda value: emits.append(("second", value)))  # type: ignore
+
+        with pytest.raises(RuntimeError):
+            with deferred_notifications(first, second):
+                second.always = 2  # type: ignore
+                first.always = 1  # type: ignore
+                raise RuntimeError()
+
+        assert emits == [("first", 1), ("second", 2)]
+        first.always = 3  # type: ignore
+        assert emits[-1] == ("first", 3)
+
+    def test_BaseClassWithBatchMethod_CallBatch_InheritedMethodCalled(self):
+        class Base(QObject):
+            def batch(self):
+                return "inherited"
+
+        class Derived(Base, metaclass=PropertyMeta):
+            value = Property(int)
+
+        assert Derived().batch() == "inherited"
+
+
+class ModelMirror:
+    """Rebuilds the rows of a list model from its change signals only."""
+
+    def __init__(self, list_model: ListPropertyModel) -> None:
+        self.list_model = list_model
+        self.rows = [self.row(i) for i in range(list_model.rowCount())]
+        list_model.rowsInserted.connect(lambda parent, first, last: self.rows.__setitem__(slice(first, first), [self.row(i) for i in range(first, last + 1)]))
+        list_model.rowsRemoved.connect(lambda parent, first, last: self.rows.__delitem__(slice(first, last + 1)))
+        list_model.rowsMoved.connect(self.move)
+        list_model.dataChanged.connect(lambda first, last, roles: self.rows.__setitem__(slice(first.row(), last.row() + 1), [self.row(i) for i in range(first.row(), last.row() + 1)]))
+        list_model.modelReset.connect(lambda: self.rows.__setitem__(slice(None), [self.row(i) for i in range(list_model.rowCount())]))
+
+    def row(self, i: int) -> Any:
+        return self.list_model.data(self.list_model.index(i), ListPropertyModel.ItemRole)
+
+    def move(self, parent: QModelIndex, first: int, last: int, destination_parent: QModelIndex, destination: int) -> None:
+        block = self.rows[first : last + 1]
+        if destination > last:
+            self.rows[destination:destination] = block
+            del self.rows[first : last + 1]
+        else:
+            del self.rows[first : last + 1]
+            self.rows[destination:destination] = block
+
+
+class TestListPropertyModel:
+
+    @pytest.mark.parametrize("mutate", [
+        lambda rows: rows.append(10),
+        lambda rows: rows.extend([10, 11]),
+        lambda rows: rows.__iadd__([10]),
+        lambda rows: rows.__imul__(2),
+        lambda rows: rows.__imul__(0),
+        lambda rows: rows.insert(2, 10),
+        lambda rows: rows.insert(-100, 10),
+        lambda rows: rows.pop(),
+        lambda rows: rows.pop(1),
+        lambda rows: rows.remove(3),
+        lambda rows: rows.clear(),
+        lambda rows: rows.__delitem__(-1),
+        lambda rows: rows.__delitem__(slice(1, 3)),
+        lambda rows: rows.__delitem__(slice(None, None, 2)),
+        lambda rows: rows.__setitem__(2, 10),
+        lambda rows: rows.__setitem__(slice(1, 3), [10, 11]),
+        lambda rows: rows.__setitem__(slice(1, 3), [10]),
+        lambda rows: rows.move(1, 2, 5),
+        lambda rows: rows.move(3, 4, 0),
+        lambda rows: rows.reverse(),
+        lambda rows: rows.sort(reverse=True),
+    ])
+    def test_ListPropertyModel_MutateList_ModelSignalsReproduceList(self, qt_app, mutate):
+        model = Model()
+        model.rows = [0, 1, 2, 3, 4, 5]  # type: ignore
+        list_model = ListPropertyModel(model, "rows")
+        mirror = ModelMirror(list_model)
+
+        mutate(model.rows)  # type: ignore
+
+        assert mirror.rows == model.rows  # type: ignore
+
+    def test_GranularListOf100kItems_AppendItem_OnlySingleRowInserted(self, qt_app):
+        model = Model()
+        model.rows = list(range(100000))  # type: ignore
+        list_model = ListPropertyModel(model, "rows")
+        whole_list_emits = record_emits(model, "rows")
+        inserted = []
+        list_model.rowsInserted.connect(lambda parent, first, last: inserted.append((first, last)))
+
+        model.rows.append(100000)  # type: ignore
+
+        assert inserted == [(100000, 100000)]
+        assert whole_list_emits == []
+        assert list_model.rowCount() == 100001
+
+    def test_ListPropertyModel_SetProperty_ModelReset(self, qt_app):
+        model = Model()
+        model.rows = [1]  # type: ignore
+        list_model = ListPropertyModel(model, "rows")
+        old_rows = model.rows  # type: ignore
+        mirror = ModelMirror(list_model)
+
+        model.rows = [1, 2, 3]  # type: ignore
+        old_rows.append(4)
+
+        assert mirror.rows == [1, 2, 3]
+
+    @pytest.mark.parametrize("copy_list", [copy.copy, copy.deepcopy, lambda rows: pickle.loads(pickle.dumps(rows))])
+    def test_ListPropertyModel_CopyListAndMutateCopy_ModelUnchanged(self, qt_app, copy_list):
+        model = Model()
+        model.rows = [1, 2, 3]  # type: ignore
+        list_model = ListPropertyModel(model, "rows")
+        inserted = []
+        list_model.rowsInserted.connect(lambda parent, first, last: inserted.append((first, last)))
+
+        rows_copy = copy_list(model.rows)  # type: ignore
+        rows_copy.append(4)
+        model.rows.append(5)  # type: ignore
+
+        assert rows_copy == [1, 2, 3, 4] and not rows_copy.owned
+        assert inserted == [(3, 3)]
+        assert list_model.rowCount() == 4
+
+    def test_NotifiedList_InvalidMutation_NoChangeReported(self):
+        model = Model()
+        model.rows = [1]  # type: ignore
+        changes = []
+
+        class Listener:
+            list_about_to_change = changes.append
+            list_changed = changes.append
+
+        listener = Listener()
+        model.rows.listeners.add(listener)  # type: ignore
+        for mutate in [lambda: model.rows.pop(5), lambda: model.rows.remove(7), lambda: model.rows.move(0, 0, 1)]:  # type: ignore
+            with pytest.raises((IndexError, ValueError)):
+                mutate()
+        model.rows.append(2)  # type: ignore
+
+        assert changes == [ListChange(INSERTED, 1, 1)] * 2
+
+    def test_GranularProperty_DeclaredForDict_ValueErrorRaised(self):
+        with pytest.raises(ValueError):
+            Property(dict, granular=True)
+
+
+SETTINGS_CONSUMER_QML = b"""
+import QtQml
+QtObject {
+    property var foo: model.settings.foo
+    property var bar: model.settings.bar
+    property int fooChanges: 0
+    property int barChanges: 0
+    onFooChanged: fooChanges++
+    onBarChanged: barChanges++
+    function setBarFromQml(value) { model.settings.bar = value }
+}
+"""
+
+
+@pytest.fixture
+def settings_consumer(qt_app):
+    model = Model()
+    model.settings = {"foo": 1, "bar": [1, 2]}  # type: ignore
+    engine = QQmlEngine()
+    engine.rootContext().setContextProperty("model", model)
+    component = QQmlComponent(engine)
+    component.setData(SETTINGS_CONSUMER_QML, QUrl())
+    consumer = component.create()
+    assert consumer, component.errors()
+    consumer.setProperty("fooChanges", 0)
+    consumer.setProperty("barChanges", 0)
+    yield model, consumer
+    del consumer
+    del engine
+
+
+class TestKeyedDictProperty:
+
+    def test_KeyedProperty_UseAsDict_BehavesLikeDict(self):
+        model = Model()
+        model.settings = {"a": 1}  # type: ignore
+        settings = model.settings  # type: ignore
+
+        settings["b"] = [2]
+        settings.update(c=3)
+        assert settings.setdefault("a", 5) == 1
+        assert settings.pop("c") == 3
+        assert settings.pop("c", None) is None
+        del settings["a"]
+
+        assert isinstance(settings, PropertyMap)
+        assert settings == {"b": [2]}
+        assert dict(settings.items()) == {"b": [2]}
+        assert "a" not in settings and len(settings) == 1 and settings.get("a", 0) == 0
+
+    def test_QmlBindingsOnKeys_SetOneKey_OnlyBindingsOfThatKeyUpdated(self, settings_consumer):
+        model, consumer = settings_consumer
+
+        model.settings["foo"] = 2
+        model.settings["foo"] = 2
+        model.settings["baz"] = 3
+
+        assert consumer.property("foo") == 2
+        assert consumer.property("fooChanges") == 1
+        assert consumer.property("barChanges") == 0
+
+    def test_QmlBindingsOnKeys_SetWholeProperty_OnlyChangedKeysNotifiedAndMapKept(self, settings_consumer):
+        model, consumer = settings_consumer
+        settings = model.settings
+        emits = record_emits(model, "settings")
+
+        model.settings = {"foo": 1, "bar": [1, 2, 3]}  # type: ignore
+
+        assert model.settings is settings
+        assert emits == []
+        assert consumer.property("fooChanges") == 0
+        assert consumer.property("barChanges") == 1
+        assert consumer.property("bar") == [1, 2, 3]
+
+    def test_QmlBindingsOnKeys_SetKeysInBatch_QmlUpdatedOnceOnExit(self, settings_consumer):
+        model, consumer = settings_consumer
+        emits = record_emits(model, "settings")
+
+        with model.batch():  # type: ignore
+            model.settings["foo"] = 2
+            model.settings["foo"] = 3
+            model.settings["bar"] = "changed"
+            del model.settings["bar"]
+            model.settings["bar"] = [1, 2]
+            model.always = 1  # type: ignore
+            assert model.settings["foo"] == 3
+            assert consumer.property("foo") == 1 and consumer.property("fooChanges") == 0
+
+        assert consumer.property("foo") == 3
+        assert consumer.property("fooChanges") == 1
+        assert consumer.property("barChanges") == 0
+        assert emits == []
+
+    def test_QmlBindingsOnKeys_SetKeyFromQml_PythonSideUpdated(self, settings_consumer):
+        model, consumer = settings_consumer
+
+        QMetaObject.invokeMethod(consumer, "setBarFromQml", Q_ARG("QVariant", "from qml"))
+
+        assert model.settings["bar"] == "from qml"
+
+    def test_KeyedProperty_DeclaredForList_ValueErrorRaised(self):
+        with pytest.raises(ValueError):
+            Property(list, keyed=True)
+
+    def test_KeyedProperty_DeclaredWithComparisonPolicy_ValueErrorRaised(self):
+        with pytest.raises(ValueError):
+            Property(dict, keyed=True, compare=EQUALITY)
+        with pytest.raises(ValueError):
+            Property(dict, keyed=True, epsilon=0.1)
+
+    def test_KeyedPropertySet_AssignNone_MapEmptied(self, settings_consumer):
+        model, consumer = settings_consumer
+        settings = model.settings
+
+        model.settings = None  # type: ignore
+
+        assert model.settings is settings and len(settings) == 0
+        assert consumer.property("foo") is None
+
+    def test_KeyedProperty_AssignList_TypeErrorRaised(self):
+        model = Model()
+
+        with pytest.raises(TypeError):
+            model.settings = [1, 2]  # type: ignore
+
+
+class TestNotifiedContainerAdoption:
+
+    def test_PlainContainers_Assign_CopiedAndCallerMutationsNotReflected(self):
+        model = Model()
+        items = [1, 2]
+
+        model.items = items  # type: ignore
+        items.append(3)
+
+        assert model.items is not items and model.items == [1, 2]  # type: ignore
+
+    @pytest.mark.parametrize("name, create, mutate", [
+        ("items", lambda: notified_list([1, 2]), lambda value: value.append(3)),
+        ("options", lambda: notified_dict(a=1), lambda value: value.update(b=2)),
+    ])
+    def test_UnownedNotifiedContainer_Assign_AdoptedWithoutCopyAndNotifying(self, name, create, mutate):
+        model = Model()
+        value = create()
+        setattr(model, name, value)
+        emits = record_emits(model, name)
+
+        mutate(value)
+
+        assert getattr(model, name) is value
+        assert emits == [value]
+
+    def test_GranularProperty_AssignNotifiedList_AdoptedAndEmittedWithoutConversion(self):
+        model = Model()
+        emits = record_emits(model, "rows")
+        value = notified_list(range(10))
+
+        model.rows = value  # type: ignore
+
+        assert model.rows is value  # type: ignore
+        assert emits[0] is value
+
+    def test_ContainerOwnedByOtherProperty_Assign_Copied(self):
+        first, second = Model(), Model()
+        first.items = notified_list([1])  # type: ignore
+        emits = record_emits(first, "items")
+
+        second.items = first.items  # type: ignore
+        second.items.append(2)  # type: ignore
+
+        assert second.items is not first.items  # type: ignore
+        assert first.items == [1] and emits == []  # type: ignore
+
+    def test_UnassignedNotifiedDict_Mutate_NoError(self):
+        value = notified_dict(a=1)
+
+        value["b"] = 2
+
+        assert value == {"a": 1, "b": 2}
+
+    @pytest.mark.parametrize("copy_dict", [copy.copy, copy.deepcopy, lambda options: pickle.loads(pickle.dumps(options))])
+    def test_AssignedNotifiedDict_CopyAndMutateCopy_NoEmit(self, copy_dict):
+        model = Model()
+        model.options = {"a": 1}  # type: ignore
+        emits = record_emits(model, "options")
+
+        options_copy = copy_dict(model.options)  # type: ignore
+        options_copy["b"] = 2
+
+        assert options_copy == {"a": 1, "b": 2} and not options_copy.owned
+        assert emits == []
+
+    def test_DictSubclass_Assign_StoredWithItsType(self):
+        model = Model()
+        value = defaultdict(list)
+
+        model.options = value  # type: ignore
+        model.options["a"].append(1)  # type: ignore
+
+        assert model.options is value and value == {"a": [1]}  # type: ignore
@@ -1,16 +1,21 @@
 # Copyright (C) 2024 twyleg
 # fmt: off
 import argparse
+import logging
 import sys
 from pathlib import Path
 
+import pytest
+from PySide6.QtCore import QLoggingCategory
+
 from simple_python_app.generic_application import GenericApplication
 
 from fixtures import (
     valid_custom_logging_config,
     project_dir
 )
-from simple_python_app_qt.qml_application import QmlApplication
+from simple_python_app_qt.log_queue import QueueSinkHandler
+from simple_python_app_qt.qml_application import QmlApplication, apply_qt_logging_filter_rules, qt_logging_filter_rules
 
 #
 # General naming convention for unit tests:
@@ -42,6 +47,21 @@ class ValidFrontendApplication(BaseQmlTestApplication):
         )
 
 
+class ValidFrontendWithLogConsoleApplication(BaseQmlTestApplication):
+    def __init__(self):
+        super().__init__(
+            frontend_qml_file_path=FILE_DIR / "resources/frontends/valid_frontend_with_log_console.qml"
+        )
+
+
+class ValidFrontendQueuedLoggingApplication(BaseQmlTestApplication):
+    def __init__(self):
+        super().__init__(
+            frontend_qml_file_path=FILE_DIR / "resources/frontends/valid_frontend.qml",
+            queued_logging=True
+        )
+
+
 class InvalidFrontendApplication(BaseQmlTestApplication):
     def __init__(self):
         super().__init__(
@@ -74,6 +94,30 @@ class TestQmlApplication:
         test_app = ValidFrontendApplication()
         assert test_app.start(["--version"]) == 0
 
+    def test_QmlApplicationWithLogConsoleFrontend_StartApplication_ApplicationStartedAndClosedCleanly(
+            self,
+            caplog,
+            project_dir
+    ):
+        test_app = ValidFrontendWithLogConsoleApplication()
+        assert test_app.start() == 0
+        assert not test_app.log_model.redirect_to_prebuffer
+
+    def test_QmlApplicationWithQueuedLogging_StartApplication_LogQueueFlushedAndClosed(
+            self,
+            caplog,
+            project_dir
+    ):
+        test_app = ValidFrontendQueuedLoggingApplication()
+        assert test_app.start() == 0
+
+        queue_handler = next(handler for handler in logging.getLogger().handlers if isinstance(handler, QueueSinkHandler))
+        assert not queue_handler.running
+        assert queue_handler.queue.empty()
+
+        logging.getLogger().info("Logged after shutdown")
+        assert {type(sink) for sink in queue_handler.sinks} == {logging.StreamHandler, logging.FileHandler}
+
     def test_QmlApplicationWithInvalidFrontend_StartApplication_ErrorThrownAndExit(
             self,
             caplog,
@@ -89,3 +133,30 @@ class TestQmlApplication:
     ):
         test_app = NonExistingFrontendApplication()
         assert test_app.start() == -1
+
+
+class TestQtLoggingFilterRules:
+
+    @pytest.fixture
+    def qml_logger_level(self):
+        qml_logger = logging.getLogger("qml")
+        original_level = qml_logger.level
+        yield qml_logger.setLevel
+        qml_logger.setLevel(original_level)
+        QLoggingCategory.setFilterRules("")
+
+    def test_QmlLoggerAtDebug_CreateRules_NoMessageTypeDisabled(self, qml_logger_level):
+        qml_logger_level(logging.DEBUG)
+        assert qt_logging_filter_rules() == ""
+
+    def test_QmlLoggerAtWarning_ApplyRules_DebugAndInfoDisabledInQt(self, qml_logger_level):
+        qml_logger_level(logging.WARNING)
+
+        apply_qt_logging_filter_rules()
+
+        qml_category = QLoggingCategory("qml")
+        assert qt_logging_filter_rules() == "*.debug=false\n*.info=false"
+        assert not qml_category.isDebugEnabled()
+        assert not qml_category.isInfoEnabled()
+        assert qml_category.isWarningEnabled()
+        assert qml_category.isCriticalEnabled()